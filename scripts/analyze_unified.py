@@ -1,22 +1,23 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
 
+from corpus import cargar_corpus
+
 # Configura rutas
-input_file = "outputs/unified.csv"
 output_dir = "outputs"
 os.makedirs(output_dir, exist_ok=True)
 
-# Leer CSV
-df = pd.read_csv(input_file)
+# Leer solo las columnas necesarias del corpus
+df = cargar_corpus(["Authors", "Publication Year", "Publisher", "Publication Title", "Document Identifier"])
 
 # ——— Limpieza de columnas clave ———
 df["Authors"] = df["Authors"].fillna("")
-df["FirstAuthor"] = df["Authors"].apply(lambda x: x.split(";")[0].strip() if ";" in x else x.strip())
-df["Publication Year"] = pd.to_numeric(df["Publication Year"], errors="coerce")
-df["Publisher"] = df["Publisher"].fillna("Desconocido")
-df["Publication Title"] = df["Publication Title"].fillna("Desconocido")
-df["Document Identifier"] = df["Document Identifier"].fillna("Desconocido")
+df["FirstAuthor"] = df["Authors"].str.split(";", n=1).str[0].str.strip()
+for col in ["Publisher", "Publication Title", "Document Identifier"]:
+    # categóricas: "Desconocido" tiene que existir como categoría antes del fillna;
+    # se ordenan alfabéticamente para que el groupby salga en el mismo orden que antes
+    serie = df[col].cat.add_categories("Desconocido").fillna("Desconocido").cat.remove_unused_categories()
+    df[col] = serie.cat.reorder_categories(sorted(serie.cat.categories))
 
 # ——— Estadísticos principales ———
 top_authors = df["FirstAuthor"].value_counts().head(15)
@@ -25,7 +26,7 @@ top_publishers = df["Publisher"].value_counts().head(15)
 types_count = df["Document Identifier"].value_counts()
 
 # ——— Por tipo de documento y año ———
-by_type_year = df.groupby(["Document Identifier", "Publication Year"]).size().unstack(fill_value=0)
+by_type_year = df.groupby(["Document Identifier", "Publication Year"], observed=True).size().unstack(fill_value=0)
 
 # ——— Guardar a CSV ———
 top_authors.to_csv(os.path.join(output_dir, "top_authors.csv"))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_bib_stream.py
+
+Compara bib_stream (iter_bib / write_bib) con bibtexparser v1
+(load / BibTexWriter.write) sobre un export BibTeX sintético del tamaño
+indicado. Cada medición corre en un proceso aparte para que el pico de
+memoria (RSS) de una no contamine a las demás.
+
+Uso:
+    python bench_bib_stream.py            # ~300 MB
+    python bench_bib_stream.py --mb 50
+"""
+import os
+import time
+import random
+import argparse
+import resource
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from bib_stream import iter_bib, write_bib
+
+PALABRAS = (
+    "computational thinking learning students programming education assessment "
+    "skills primary school teachers robotics scratch model analysis study design "
+    "approach framework evaluation children game based course university data"
+).split()
+
+
+def generar(path, mb, semilla=42):
+    """Escribe entradas estilo IEEE hasta alcanzar ~`mb` megabytes; devuelve cuántas."""
+    rng = random.Random(semilla)
+    objetivo = mb * 1024 * 1024
+    n = 0
+    with open(path, 'w', encoding='utf-8') as fh:
+        while fh.tell() < objetivo:
+            n += 1
+            frase = lambda k: " ".join(rng.choice(PALABRAS) for _ in range(k))
+            fh.write(
+                f"@inproceedings{{ref{n},\n"
+                f"  title     = {{{frase(10).capitalize()}}},\n"
+                f"  author    = {{X. Zhang and H. Zou and {rng.choice('ABCDEFG')}. Li}},\n"
+                f"  year      = {{{rng.randint(2000, 2025)}}},\n"
+                f"  month     = {rng.choice(['jan', 'may', 'sep'])},\n"
+                f"  doi       = {{10.1109/EXAMPLE.{n}}},\n"
+                f"  abstract  = {{{frase(150)}.}},\n"
+                f"  keywords  = {{{';'.join(rng.sample(PALABRAS, 6))}}},\n"
+                f"  url       = {{https://ieeexplore.ieee.org/stamp/stamp.jsp?arnumber={n}}},\n"
+                f"}}\n\n")
+    return n
+
+
+def _medir(funcion, *args):
+    t0 = time.perf_counter()
+    resultado = funcion(*args)
+    seg = time.perf_counter() - t0
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return resultado, seg, rss_mb
+
+
+def leer_bibtexparser(path):
+    import bibtexparser
+    with open(path, encoding='utf-8') as fh:
+        return len(bibtexparser.load(fh).entries)
+
+def leer_bib_stream(path):
+    with open(path, encoding='utf-8') as fh:
+        return sum(1 for _ in iter_bib(fh))
+
+def copiar_bibtexparser(path, salida):
+    import bibtexparser
+    from bibtexparser.bwriter import BibTexWriter
+    with open(path, encoding='utf-8') as fh:
+        db = bibtexparser.load(fh)
+    with open(salida, 'w', encoding='utf-8') as fh:
+        fh.write(BibTexWriter().write(db))
+    return len(db.entries)
+
+def copiar_bib_stream(path, salida):
+    with open(path, encoding='utf-8') as fh, open(salida, 'w', encoding='utf-8') as out:
+        return write_bib(iter_bib(fh), out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mb', type=int, default=300, help="tamaño del export sintético en MB")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.bib')
+        salida = os.path.join(tmp, 'copia.bib')
+        n = generar(path, args.mb)
+        tam = os.path.getsize(path) / (1024 * 1024)
+        print(f"Export sintético: {n} entradas, {tam:.0f} MB\n")
+        print(f"{'prueba':<32} {'entradas':>9} {'segundos':>9} {'MB/s':>8} {'RSS MB':>8}")
+
+        pruebas = [
+            ("lectura  bibtexparser.load", leer_bibtexparser, path),
+            ("lectura  bib_stream.iter_bib", leer_bib_stream, path),
+            ("leer+escribir bibtexparser", copiar_bibtexparser, path, salida),
+            ("leer+escribir bib_stream", copiar_bib_stream, path, salida),
+        ]
+        for nombre, funcion, *fargs in pruebas:
+            # un proceso nuevo por prueba: ru_maxrss es el pico de esa prueba
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                entradas, seg, rss = pool.submit(_medir, funcion, *fargs).result()
+            print(f"{nombre:<32} {entradas:>9} {seg:>9.2f} {tam / seg:>8.1f} {rss:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_fuzzy_dedup.py
+
+Mide el rendimiento del modo --fuzzy de unify_entries.py sobre registros
+sintéticos: títulos aleatorios con un porcentaje de variantes casi iguales
+(puntuación, mayúsculas, separadores y erratas, como entre IEEE y
+ScienceDirect).
+
+Uso:
+    python bench_fuzzy_dedup.py                 # 10k, 100k y 1M registros
+    python bench_fuzzy_dedup.py 10000 50000     # tamaños a medida
+"""
+import sys
+import time
+import random
+
+from fuzzy_dedup import DetectorDuplicados
+
+TAMANOS   = [10_000, 100_000, 1_000_000]
+FRAC_DUP  = 0.1
+SEMILLA   = 42
+
+PALABRAS = (
+    "computational thinking learning students programming education assessment "
+    "skills primary school teachers robotics scratch model analysis study design "
+    "approach framework evaluation children game based course university data "
+    "algorithm problem solving creativity motivation curriculum blocks online "
+    "effects development mathematics science engineering technology review"
+).split()
+SILABAS = "ba ce di fo gu la me ni po ru sa te vi zo ka tre plo mun dex ior".split()
+APELLIDOS = "Zhang Garcia Smith Lopez Wang Kim Rossi Silva Muller Chen Tanaka Perez".split()
+
+
+def variante(titulo, rng):
+    """Copia casi igual de un título, como la exportaría otra base de datos."""
+    palabras = titulo.split()
+    cambio = rng.randrange(4)
+    if cambio == 0:
+        return titulo.upper()
+    if cambio == 1:
+        corte = rng.randrange(1, len(palabras))
+        return " ".join(palabras[:corte]) + ": " + " ".join(palabras[corte:])
+    if cambio == 2:
+        return titulo.replace(" ", " - ", 1) + "."
+    i = rng.randrange(len(palabras))
+    p = palabras[i]
+    palabras[i] = p[:-1] if len(p) > 3 else p + "s"
+    return " ".join(palabras)
+
+
+def vocabulario(rng, n=20_000):
+    """Palabras comunes del área más un vocabulario largo de términos específicos."""
+    raras = {"".join(rng.choice(SILABAS) for _ in range(rng.randint(2, 4))) for _ in range(n)}
+    return PALABRAS, sorted(raras)
+
+
+def generar(n, rng):
+    """n registros con ~FRAC_DUP de duplicados aproximados. Devuelve (entradas, n_dups)."""
+    comunes, raras = vocabulario(rng)
+    entradas = []
+    n_dups = 0
+    for i in range(n):
+        if entradas and rng.random() < FRAC_DUP:
+            base = entradas[rng.randrange(len(entradas))]
+            entradas.append({
+                'ENTRYTYPE': 'article', 'ID': f'dup{i}',
+                'title': variante(base['title'], rng), 'author': base['author'],
+            })
+            n_dups += 1
+        else:
+            titulo = " ".join(rng.choice(comunes if rng.random() < 0.6 else raras)
+                              for _ in range(rng.randint(6, 14)))
+            autores = " and ".join(f"{chr(65 + rng.randrange(26))}. {rng.choice(APELLIDOS)}"
+                                   for _ in range(rng.randint(1, 4)))
+            entradas.append({'ENTRYTYPE': 'article', 'ID': f'ref{i}',
+                             'title': titulo.capitalize(), 'author': autores})
+    return entradas, n_dups
+
+
+def main():
+    tamanos = [int(a) for a in sys.argv[1:]] or TAMANOS
+    print(f"{'registros':>10} {'segundos':>9} {'reg/s':>10} {'duplicados':>11} {'inyectados':>11}")
+    for n in tamanos:
+        entradas, n_dups = generar(n, random.Random(SEMILLA))
+        detector = DetectorDuplicados(fuzzy=True)
+        t0 = time.perf_counter()
+        _, duplicados = detector.procesar(entradas)
+        seg = time.perf_counter() - t0
+        print(f"{n:>10} {seg:>9.2f} {n / seg:>10.0f} {len(duplicados):>11} {n_dups:>11}")
+
+
+if __name__ == '__main__':
+    main()
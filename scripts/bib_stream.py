@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bib_stream.py
+
+Lector y escritor en streaming de BibTeX y RIS para el camino crítico de
+unify_entries.py, en lugar de bibtexparser v1 y rispy.
+
+Cubre el subconjunto que emiten IEEE Xplore y ScienceDirect: entradas
+@tipo{ID, campo = {valor}, ...} con valores entre llaves, comillas o sin
+delimitar, @string, concatenación con '#' y meses abreviados. Las entradas
+tienen la misma forma que las de bibtexparser (`ENTRYTYPE`, `ID` y campos
+en minúsculas) y se procesan de una en una, sin cargar el archivo entero.
+"""
+import re
+
+MESES = {
+    'jan': 'January', 'feb': 'February', 'mar': 'March', 'apr': 'April',
+    'may': 'May', 'jun': 'June', 'jul': 'July', 'aug': 'August',
+    'sep': 'September', 'oct': 'October', 'nov': 'November', 'dec': 'December',
+}
+
+# Tipos RIS → tipos BibTeX
+TIPOS_RIS = {
+    'JOUR': 'article', 'JFULL': 'article', 'MGZN': 'article', 'EJOUR': 'article',
+    'CONF': 'inproceedings', 'CPAPER': 'inproceedings',
+    'BOOK': 'book', 'EBOOK': 'book', 'CHAP': 'incollection', 'ECHAP': 'incollection',
+    'THES': 'phdthesis', 'RPRT': 'techreport', 'GEN': 'misc',
+}
+
+_LLAVES = re.compile(r'[{}]')
+_COMILLA_O_LLAVE = re.compile(r'["{}]')
+_NOMBRE = re.compile(r'\s*([^\s=,{}"#]+)\s*=\s*')
+_CABECERA = re.compile(r'@\s*([A-Za-z]+)\s*\{')
+_SANGRIA = re.compile(r'\n[ \t]+')
+_RIS_LINEA = re.compile(r'^([A-Z][A-Z0-9])  -(?: (.*))?$')
+
+
+class ErrorBib(ValueError):
+    pass
+
+
+# === LECTURA BIBTEX ===
+def _bloques(fh):
+    """
+    Texto de cada bloque @...{...} del archivo, acumulando líneas hasta cerrar
+    llaves. Un bloque sin cerrar al final del archivo se descarta, como en
+    bibtexparser.
+    """
+    bloque, nivel, abierto = [], 0, False
+    for linea in fh:
+        if not bloque:
+            if not linea.lstrip().startswith('@'):
+                continue
+            nivel, abierto = 0, False
+        bloque.append(linea)
+        nivel += linea.count('{') - linea.count('}')
+        abierto = abierto or '{' in linea
+        if abierto and nivel <= 0:
+            yield ''.join(bloque)
+            bloque = []
+
+
+def _valor_simple(texto, p, strings):
+    """Lee un valor desde texto[p]; devuelve (valor, posición siguiente)."""
+    c = texto[p]
+    if c == '{':
+        nivel = 0
+        for m in _LLAVES.finditer(texto, p):
+            nivel += 1 if m.group() == '{' else -1
+            if nivel == 0:
+                return texto[p + 1:m.start()], m.end()
+        raise ErrorBib("llave sin cerrar")
+    if c == '"':
+        nivel = 0
+        for m in _COMILLA_O_LLAVE.finditer(texto, p + 1):
+            g = m.group()
+            if g == '"' and nivel == 0 and texto[m.start() - 1] != '\\':
+                return texto[p + 1:m.start()], m.end()
+            if g == '{':
+                nivel += 1
+            elif g == '}':
+                nivel -= 1
+        raise ErrorBib("comillas sin cerrar")
+    fin = p
+    while fin < len(texto) and texto[fin] not in ',#} \t\r\n':
+        fin += 1
+    token = texto[p:fin]
+    clave = token.lower()
+    if clave in strings:
+        return strings[clave], fin
+    return MESES.get(clave, token), fin
+
+
+def _valor(texto, p, strings):
+    """Valor completo, incluida la concatenación con '#'."""
+    partes = []
+    while True:
+        valor, p = _valor_simple(texto, p, strings)
+        partes.append(valor)
+        while p < len(texto) and texto[p] in ' \t\r\n':
+            p += 1
+        if p < len(texto) and texto[p] == '#':
+            p += 1
+            while p < len(texto) and texto[p] in ' \t\r\n':
+                p += 1
+            continue
+        valor = ''.join(partes)
+        return _SANGRIA.sub('\n', valor.strip()), p
+
+
+def _campos(texto, p, strings):
+    campos = {}
+    n = len(texto)
+    while p < n:
+        m = _NOMBRE.match(texto, p)
+        if not m:
+            break
+        valor, p = _valor(texto, m.end(), strings)
+        campos[m.group(1).lower()] = valor
+        while p < n and texto[p] in ', \t\r\n':
+            p += 1
+    return campos
+
+
+def iter_bib(fh):
+    """
+    Itera las entradas de un archivo BibTeX abierto (`fh`) como diccionarios
+    con la forma de bibtexparser. Las definiciones @string se aplican a las
+    entradas posteriores; @comment y @preamble se ignoran.
+    """
+    strings = {}
+    for bloque in _bloques(fh):
+        m = _CABECERA.match(bloque.lstrip())
+        if not m:
+            continue
+        tipo = m.group(1).lower()
+        texto = bloque.lstrip()
+        cuerpo = m.end()
+        if tipo in ('comment', 'preamble'):
+            continue
+        if tipo == 'string':
+            strings.update(_campos(texto, cuerpo, strings))
+            continue
+        coma = texto.find(',', cuerpo)
+        if coma < 0:
+            continue
+        entry = _campos(texto, coma + 1, strings)
+        entry['ENTRYTYPE'] = tipo
+        entry['ID'] = texto[cuerpo:coma].strip()
+        yield entry
+
+
+# === LECTURA RIS ===
+def _ris_a_bib(campos):
+    tipo = campos.get('TY', [''])[0].strip()
+    autores = campos.get('AU', []) + campos.get('A1', [])
+    titulo = (campos.get('TI') or campos.get('T1') or [''])[0]
+    abstract = (campos.get('AB') or campos.get('N2') or [''])[0]
+    return {
+        'ENTRYTYPE': TIPOS_RIS.get(tipo.upper(), tipo.lower() or 'article'),
+        'ID'       : campos.get('ID', [''])[0],
+        'title'    : titulo,
+        'author'   : ' and '.join(autores),
+        'year'     : (campos.get('PY') or campos.get('Y1') or [''])[0].split('/')[0],
+        'abstract' : abstract,
+        'doi'      : campos.get('DO', [''])[0],
+    }
+
+
+def iter_ris(fh):
+    """
+    Itera los registros de un archivo RIS ya convertidos a entradas BibTeX
+    (las mismas claves que producía load_ris con rispy).
+    """
+    campos, ultima = {}, None
+    for linea in fh:
+        linea = linea.rstrip('\r\n').lstrip('\ufeff')
+        m = _RIS_LINEA.match(linea)
+        if not m:
+            if ultima and linea.strip():
+                # línea de continuación del campo anterior
+                campos[ultima][-1] += ' ' + linea.strip()
+            continue
+        tag, valor = m.group(1), (m.group(2) or '').strip()
+        if tag == 'ER':
+            if campos:
+                yield _ris_a_bib(campos)
+            campos, ultima = {}, None
+            continue
+        campos.setdefault(tag, []).append(valor)
+        ultima = tag
+    if campos:
+        yield _ris_a_bib(campos)
+
+
+# === ESCRITURA ===
+def formatear_entrada(entry):
+    """Misma salida que BibTexWriter de bibtexparser v1 (campos en orden alfabético)."""
+    partes = ['@', entry['ENTRYTYPE'], '{', entry['ID']]
+    for campo in sorted(entry):
+        if campo in ('ENTRYTYPE', 'ID'):
+            continue
+        partes += [',\n ', campo, ' = {', str(entry[campo]), '}']
+    partes.append('\n}\n')
+    return ''.join(partes)
+
+
+def write_bib(entries, fh):
+    """Escribe las entradas de una en una en `fh`; devuelve cuántas escribió."""
+    n = 0
+    for entry in entries:
+        fh.write(formatear_entrada(entry))
+        fh.write('\n')
+        n += 1
+    return n
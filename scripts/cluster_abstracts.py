@@ -1,159 +1,150 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import re
-from sklearn.feature_extraction.text import TfidfVectorizer
+import argparse
 from sklearn.metrics import pairwise_distances
-from scipy.cluster.hierarchy import dendrogram, linkage, fcluster
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from collections import defaultdict
-import nltk
-
-nltk.download('stopwords')
-nltk.download('wordnet')
+from scipy.cluster.hierarchy import linkage, fcluster
+
+from corpus import cargar_corpus
+from categorias import CATEGORIAS  # puedes ampliarlas si lo deseas
+from scalable_clustering import ClusteringEscalable, COMPONENTES, MICROCLUSTERS
+from coherence import (incidencia_categorias, tabla_coherencia, lift, metricas,
+                       evaluar_configuraciones)
+from dendrogram_render import dibujar_dendrograma, exportar_arbol, P_FUSIONES
+from model_selection import barrido_k, mejor_k, rango_k, valor_k
+from text_preprocessing import preprocesar_corpus, CACHE_TOKENS
+from feature_store import AlmacenFeatures, DIR_FEATURES
+
+# === ARGUMENTOS ===
+parser = argparse.ArgumentParser(description="Clustering jerárquico de abstracts y coherencia con CATEGORIAS.")
+parser.add_argument("--modo", choices=["clasico", "escalable"], default="clasico",
+                    help="clasico: primeros 100 abstracts y matriz de distancias; "
+                         "escalable: todo el corpus con LSA y Ward en memoria lineal")
+parser.add_argument("--componentes", type=int, default=COMPONENTES,
+                    help="dimensiones LSA (modo escalable)")
+parser.add_argument("--precluster", choices=["auto", "ninguno", "minibatch", "birch"], default="auto",
+                    help="pre-clustering antes del linkage (modo escalable; auto = minibatch si hay muchos abstracts)")
+parser.add_argument("--microclusters", type=int, default=MICROCLUSTERS,
+                    help="micro-clusters del pre-clustering minibatch")
+parser.add_argument("--k", type=valor_k, default=5,
+                    help="clusters para la tabla de coherencia, o 'auto' para elegirlo por silhouette en --ks")
+parser.add_argument("--ks", type=rango_k, default="2-10",
+                    help="rango de k (p. ej. 2-10) para la selección de k y la comparación de pureza y NMI")
+parser.add_argument("--p", type=int, default=P_FUSIONES,
+                    help="fusiones que se dibujan en los dendrogramas cuando hay demasiadas hojas para rotularlas")
+parser.add_argument("--mostrar", action="store_true",
+                    help="abrir las figuras de coherencia en una ventana (por defecto solo se guardan, backend Agg)")
+parser.add_argument("--workers", type=int, default=None,
+                    help="procesos para el preprocesamiento y la incidencia de categorías (por defecto, uno por CPU)")
+parser.add_argument("--sin-cache", action="store_true",
+                    help=f"no leer ni escribir los tokens de {CACHE_TOKENS} ni las features de {DIR_FEATURES}")
+args = parser.parse_args()
+if not args.mostrar:
+    plt.switch_backend("Agg")   # sin ventanas: apto para ejecuciones por lotes
 
 # === CARGA DE DATOS ===
-df = pd.read_csv("outputs/unified.csv")
-df.columns = df.columns.str.strip().str.lower()
-
-# Asegura que exista la columna correcta
-if "abstract" not in df.columns:
-    raise ValueError("La columna 'abstract' no se encuentra en el archivo CSV.")
-
-# Usa solo los primeros 100 abstracts no nulos
-abstracts = df["abstract"].dropna().head(100).tolist()
-titles = df["document title"].dropna().head(100).tolist()
-
-# === CATEGORÍAS (puedes ampliarlas si lo deseas) ===
-CATEGORIAS = {
-    "Habilidades": [
-        "Abstraction", "Algorithm", "Algorithmic thinking", "Coding", "Collaboration",
-        "Cooperation", "Creativity", "Critical thinking", "Debug", "Decomposition",
-        "Evaluation", "Generalization", "Logic", "Logical thinking", "Modularity",
-        "Patterns recognition", "Problem solving", "Programming"
-    ],
-    "Conceptos Computacionales": [
-        "Conditionals", "Control structures", "Directions", "Events", "Funtions", "Loops",
-        "Modular structure", "Parallelism", "Sequences", "Software/hardware", "Variables"
-    ],
-    "Actitudes": [
-        "Emotional", "Engagement", "Motivation", "Perceptions", "Persistence", "Self-efficacy",
-        "Self-perceived"
-    ],
-    "Propiedades psicometricas": [
-        "Classical Test Theory", "Confirmatory Factor Analysis", "Exploratory Factor Analysis",
-        "Item Response Theory", "Reliability", "Structural Equation Model", "Validity"
-    ],
-    "Herramientas de evaluacion": [
-        "Beginners Computational Thinking test", "Coding Attitudes Survey", "Collaborative Computing Observation Instrument",
-        "Competent Computational Thinking test", "Computational thinking skills test", "Computational concepts",
-        "Computational Thinking Assessment for Chinese Elementary Students", "Computational Thinking Challenge",
-        "Computational Thinking Levels Scale", "Computational Thinking Scale", "Computational Thinking Skill Levels Scale",
-        "Computational Thinking Test", "Computational Thinking Test for Elementary School Students",
-        "Computational Thinking Test for Lower Primary", "Computational thinking-skill tasks on numbers and arithmetic",
-        "Computerized Adaptive Programming Concepts Test", "CT Scale", "Elementary Student Coding Attitudes Survey",
-        "General self-efficacy scale", "ICT competency test", "Instrument of computational identity",
-        "KBIT fluid intelligence subtest", "Mastery of computational concepts Test and an Algorithmic Test",
-        "Multidimensional 21st Century Skills Scale", "Self-efficacy scale", "STEM learning attitude scale",
-        "The computational thinking scale"
-    ],
-    "Diseno de investigacion": [
-        "No experimental", "Experimental", "Longitudinal research", "Mixed methods", "Post-test",
-        "Pre-test", "Quasi-experiments"
-    ],
-    "Nivel de escolaridad": [
-        "Upper elementary education", "Primary school", "Early childhood education", "Secondary school",
-        "High school", "University"
-    ],
-    "Medio": [
-        "Block programming", "Mobile application", "Pair programming", "Plugged activities",
-        "Programming", "Robotics", "Spreadsheet", "STEM", "Unplugged activities"
-    ],
-    "Estrategia": [
-        "Construct-by-self mind mapping", "Construct-on-scaffold mind mapping", "Design-based learning",
-        "Evidence-centred design approach", "Gamification", "Reverse engineering pedagogy",
-        "Technology-enhanced learning", "Collaborative learning", "Cooperative learning",
-        "Flipped classroom", "Game-based learning", "Inquiry-based learning", "Personalized learning",
-        "Problem-based learning", "Project-based learning", "Universal design for learning"
-    ],
-    "Herramienta": [
-        "Alice", "Arduino", "Scratch", "ScratchJr", "Blockly Games", "Code.org", "Codecombat",
-        "CSUnplugged", "Robot Turtles", "Hello Ruby", "Kodable", "LightbotJr", "KIBO robots",
-        "BEE BOT", "CUBETTO", "Minecraft", "Agent Sheets", "Mimo", "Py", "SpaceChem"
-    ]
-}
-
-# === PREPROCESAMIENTO ===
-stop_words = set(stopwords.words('english'))
-lemmatizer = WordNetLemmatizer()
+df = cargar_corpus(["Abstract", "Document Title"])
+df = df.dropna(subset=["Abstract"])
+if args.modo == "clasico":
+    # Usa solo los primeros 100 abstracts no nulos
+    df = df.head(100)
 
-def preprocess(text):
-    text = text.lower()
-    text = re.sub(r'[^a-z\s]', '', text)
-    tokens = text.split()
-    tokens = [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words]
-    return ' '.join(tokens)
+abstracts = df["Abstract"].tolist()
+titles = df["Document Title"].fillna("").tolist()
 
-abstracts_clean = [preprocess(abs_) for abs_ in abstracts]
+# === PREPROCESAMIENTO ===
+abstracts_clean = preprocesar_corpus(abstracts, cache=None if args.sin_cache else CACHE_TOKENS,
+                                     workers=args.workers)
+features = AlmacenFeatures(None if args.sin_cache else DIR_FEATURES)
+filas = features.agregar(abstracts_clean)
 
-# === TF-IDF Y MATRIZ DE DISTANCIA EUCLIDIANA ===
-vectorizer = TfidfVectorizer()
-X = vectorizer.fit_transform(abstracts_clean)
-distance_matrix = pairwise_distances(X, metric='euclidean')
+# === TF-IDF ===
+X = features.tfidf(filas)
 
 # === CLUSTERING JERÁRQUICO ===
-linkage_ward = linkage(distance_matrix, method='ward')
-linkage_avg = linkage(distance_matrix, method='average')
-
-# === FUNCIÓN: DIBUJAR DENDROGRAMA ===
-def plot_dendrogram(linkage_matrix, title):
-    plt.figure(figsize=(16, 10))
-    dendrogram(
-        linkage_matrix,
-        labels=titles,
-        leaf_rotation=90,
-        leaf_font_size=8,
-        truncate_mode="none"
-    )
-    plt.title(title)
-    plt.xlabel("Documentos")
-    plt.ylabel("Distancia")
-    plt.subplots_adjust(bottom=0.3)
-    plt.tight_layout()
-    plt.savefig(f"outputs/{title}.png", dpi=300, bbox_inches='tight')
-    plt.show()
-
-# === VISUALIZACIONES ===
-plot_dendrogram(linkage_ward, "Dendrograma - Método Ward")
-plot_dendrogram(linkage_avg, "Dendrograma - Método Average")
+if args.modo == "clasico":
+    # matriz de distancia euclidiana completa (n × n)
+    distance_matrix = pairwise_distances(X, metric='euclidean')
+    linkage_ward = linkage(distance_matrix, method='ward')
+    linkage_avg = linkage(distance_matrix, method='average')
+    asignacion = np.arange(len(abstracts))
+else:
+    # LSA + Ward sobre los vectores, sin matriz n × n
+    modelo = ClusteringEscalable(args.componentes, args.precluster, args.microclusters).ajustar(X)
+    print(f"→ {len(abstracts)} abstracts, {len(modelo.hojas)} hojas (pre-clustering: {modelo.metodo_precluster})")
+    linkage_ward = modelo.linkage("ward")
+    try:
+        linkage_avg = modelo.linkage("average")
+    except MemoryError as e:
+        # average necesita pdist sobre las hojas: con demasiadas se sigue solo con Ward
+        print(f"⚠ Se omite el método Average: {e}")
+        linkage_avg = None
+    asignacion = modelo.asignacion
+
+# === DENDROGRAMAS ===
+# hojas con nombre solo si cada hoja es un abstract (sin pre-clustering)
+nombres_hojas = titles if len(linkage_ward) + 1 == len(titles) else None
+docs_por_hoja = np.bincount(asignacion, minlength=len(linkage_ward) + 1)
+
+def plot_dendrogram(linkage_matrix, title, metodo):
+    dibujar_dendrograma(linkage_matrix, f"outputs/{title}.png", title, nombres_hojas, docs_por_hoja, p=args.p)
+    exportar_arbol(linkage_matrix, f"outputs/arbol_{metodo}", nombres_hojas, docs_por_hoja)
+
+linkages = {"ward": linkage_ward}
+if linkage_avg is not None:
+    linkages["average"] = linkage_avg
+
+plot_dendrogram(linkage_ward, "Dendrograma - Método Ward", "ward")
+if linkage_avg is not None:
+    plot_dendrogram(linkage_avg, "Dendrograma - Método Average", "average")
+print("→ Árboles completos en " + ", ".join(f"outputs/arbol_{m}.nwk / .json" for m in linkages))
+
+# === SELECCIÓN DE k ===
+k_por_metodo = {metodo: args.k for metodo in linkages}
+if args.k == "auto":
+    # coordenadas para puntuar: LSA en modo escalable, TF-IDF en el clásico
+    vectores = modelo.Z if args.modo == "escalable" else X.toarray()
+    for metodo, L in linkages.items():
+        puntuaciones = barrido_k(L, vectores, args.ks, asignacion, workers=args.workers)
+        puntuaciones.to_csv(f"outputs/seleccion_k_{metodo}.csv", index=False)
+        k_por_metodo[metodo] = mejor_k(puntuaciones)
+        print(f"=== Selección de k ({metodo}): k = {k_por_metodo[metodo]} ===")
+        print(puntuaciones.round(3).to_string(index=False))
 
 # === EVALUACIÓN DE COHERENCIA ===
-def evaluar_coherencia(linkage_matrix, k_clusters=5):
-    etiquetas = fcluster(linkage_matrix, k_clusters, criterion='maxclust')
-    df_cluster = pd.DataFrame({"cluster": etiquetas, "abstract": abstracts_clean})
-
-    coherencia = defaultdict(lambda: defaultdict(int))
-    for _, row in df_cluster.iterrows():
-        cluster = row["cluster"]
-        for cat, palabras in CATEGORIAS.items():
-            for palabra in palabras:
-                if palabra.lower() in row["abstract"]:
-                    coherencia[cluster][cat] += 1
-
-    df_coherencia = pd.DataFrame(coherencia).fillna(0).astype(int)
-    sns.heatmap(df_coherencia, annot=True, cmap="Blues")
+# incidencia abstracts × categorías, una sola vez para todos los cortes
+incidencia, nombres_categorias = incidencia_categorias(abstracts, CATEGORIAS, args.workers)
+
+def evaluar_coherencia(linkage_matrix, k_clusters, metodo):
+    etiquetas = fcluster(linkage_matrix, k_clusters, criterion='maxclust')[asignacion]
+    df_coherencia = tabla_coherencia(incidencia, nombres_categorias, etiquetas)
+    m = metricas(incidencia, etiquetas)
+    print(f"Pureza: {m['pureza']:.3f}  NMI: {m['nmi']:.3f}  ({m['documentos']} abstracts con alguna categoría)")
+    print("Lift por categoría y cluster:")
+    print(lift(incidencia, nombres_categorias, etiquetas).round(2).to_string())
+
+    plt.figure()
+    sns.heatmap(df_coherencia, annot=True, fmt="d", cmap="Blues")
     plt.title("Coherencia por categoría vs cluster")
     plt.ylabel("Categoría")
     plt.xlabel("Cluster")
     plt.tight_layout()
-    plt.show()
+    plt.savefig(f"outputs/coherencia_{metodo}.png", dpi=150)
+    if args.mostrar:
+        plt.show()
+    plt.close()
 
     return df_coherencia
 
 print("=== Coherencia con método Ward ===")
-evaluar_coherencia(linkage_ward)
+evaluar_coherencia(linkage_ward, k_por_metodo["ward"], "ward")
+
+if linkage_avg is not None:
+    print("=== Coherencia con método Average ===")
+    evaluar_coherencia(linkage_avg, k_por_metodo["average"], "average")
 
-print("=== Coherencia con método Average ===")
-evaluar_coherencia(linkage_avg)
+# === COMPARACIÓN DE CONFIGURACIONES ===
+configuraciones = evaluar_configuraciones(linkages, args.ks, incidencia, asignacion)
+configuraciones.to_csv("outputs/coherencia_configuraciones.csv", index=False)
+print("=== Pureza y NMI por método y k ===")
+print(configuraciones.round(3).to_string(index=False))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cluster_export.py
+
+Exportación de los documentos de cada cluster en una sola pasada.
+
+Cada método se agrupa con un único groupby (una pasada sobre el
+DataFrame, no un filtro completo por cluster) y la salida se escribe de
+una de tres formas:
+
+  - csv:        un CSV por (método, cluster), como antes, escritos en
+                paralelo por un pool de hilos.
+  - parquet:    un dataset Parquet particionado por metodo=/cluster=
+                (requiere pyarrow).
+  - manifiesto: solo los ids de fila del corpus de cada cluster en un
+                JSON, sin duplicar los registros en disco.
+"""
+import os
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional: solo lo necesita el formato parquet
+    pa = pq = None
+
+FORMATOS = ("csv", "parquet", "manifiesto")
+HILOS = 8
+
+
+def grupos(df, metodos):
+    """(método, cluster, sub-DataFrame) con un groupby por método."""
+    for metodo in metodos:
+        for cluster_id, subset in df.groupby(f"cluster_{metodo}", sort=True):
+            yield metodo, cluster_id, subset
+
+
+def exportar_csv(df, metodos, directorio, hilos=HILOS):
+    """cluster_<método>_<id>.csv por cluster; la escritura se reparte entre hilos. Devuelve las rutas."""
+    rutas, futuros = [], []
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        for metodo, cluster_id, subset in grupos(df, metodos):
+            rutas.append(os.path.join(directorio, f"cluster_{metodo}_{cluster_id}.csv"))
+            futuros.append(pool.submit(subset.to_csv, rutas[-1], index=False))
+        for f in futuros:
+            f.result()
+    return rutas
+
+
+def exportar_parquet(df, metodos, directorio):
+    """
+    Dataset Parquet en `directorio` particionado por metodo=/cluster=. Se
+    reescribe completo en cada llamada.
+    """
+    if pq is None:
+        raise ImportError("pyarrow no está instalado: usa el formato csv o manifiesto")
+    columnas = [c for c in df.columns if not c.startswith("cluster_")]
+    partes = []
+    for metodo in metodos:
+        parte = df[columnas].assign(metodo=metodo, cluster=df[f"cluster_{metodo}"].to_numpy())
+        partes.append(pa.Table.from_pandas(parte, preserve_index=False))
+    shutil.rmtree(directorio, ignore_errors=True)
+    pq.write_to_dataset(pa.concat_tables(partes, promote_options="default"), directorio,
+                        partition_cols=["metodo", "cluster"])
+    return directorio
+
+
+def exportar_manifiesto(df, metodos, ruta):
+    """
+    JSON {método: {cluster: [filas]}} con el índice de fila del corpus
+    (df.index) de cada documento. Escritura atómica.
+    """
+    posiciones = df.index.to_numpy()
+    manifiesto = {}
+    for metodo in metodos:
+        indices = df.groupby(f"cluster_{metodo}").indices   # posiciones en df de cada cluster
+        manifiesto[metodo] = {str(c): posiciones[indices[c]].tolist() for c in sorted(indices)}
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifiesto, fh)
+    os.replace(tmp, ruta)
+    return ruta
+
+
+def exportar_clusters(df, metodos, directorio, formato="csv", hilos=HILOS):
+    """Exporta por cluster en `formato` (ver FORMATOS) dentro de `directorio`. Devuelve la ruta principal."""
+    if formato == "csv":
+        rutas = exportar_csv(df, metodos, directorio, hilos)
+        return f"{directorio} ({len(rutas)} CSVs)"
+    if formato == "parquet":
+        return exportar_parquet(df, metodos, os.path.join(directorio, "por_cluster"))
+    if formato == "manifiesto":
+        return exportar_manifiesto(df, metodos, os.path.join(directorio, "manifiesto_clusters.json"))
+    raise ValueError(f"Formato de exportación desconocido: {formato}")
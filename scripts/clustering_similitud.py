@@ -1,17 +1,75 @@
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from scipy.spatial.distance import pdist, squareform
-from scipy.cluster.hierarchy import linkage, dendrogram, fcluster
+import matplotlib
+matplotlib.use("Agg")   # solo se guardan figuras
+from scipy.cluster.hierarchy import linkage, fcluster
+from scipy import sparse
 import os
+import argparse
+
+from corpus import cargar_corpus
+from sparse_similarity import distancias_jaccard, knn_coseno, K_VECINOS
+from scalable_clustering import reducir_lsa, ward_lineal, ward_conectividad
+from text_preprocessing import preprocesar_corpus, CACHE_TOKENS
+from feature_store import AlmacenFeatures, DIR_FEATURES
+from cluster_export import exportar_clusters, FORMATOS
+from dendrogram_render import dibujar_dendrograma, exportar_arbol, P_FUSIONES
+from model_selection import barrido_k, mejor_k, rango_k, valor_k
+
+MAX_DENSO = 5000   # abstracts hasta los que --coseno auto usa Ward sin restricciones
+
+# === ARGUMENTOS ===
+parser = argparse.ArgumentParser(description="Clusters de abstracts por TF-IDF + coseno y por Jaccard.")
+parser.add_argument("--coseno", choices=["auto", "denso", "knn"], default="auto",
+                    help="Ward sobre los vectores LSA (normalizados: distancia euclidiana ≈ coseno); "
+                         "denso: sin restricciones; knn: solo fusiona abstracts unidos en el grafo de "
+                         f"vecinos más similares (auto: denso hasta {MAX_DENSO} abstracts)")
+parser.add_argument("--vecinos", type=int, default=K_VECINOS,
+                    help="vecinos por abstract en el grafo kNN")
+parser.add_argument("--k", type=valor_k, default=10,
+                    help="clusters por método, o 'auto' para elegirlo por silhouette en --ks")
+parser.add_argument("--ks", type=rango_k, default="2-20",
+                    help="rango de k (p. ej. 2-20) que se prueba con --k auto")
+parser.add_argument("--por-cluster", choices=FORMATOS, default="csv",
+                    help="exportación por cluster: un CSV por cluster, un dataset Parquet particionado "
+                         "por método/cluster, o solo un manifiesto JSON con los ids de fila")
+parser.add_argument("--p", type=int, default=P_FUSIONES,
+                    help="fusiones que se dibujan en los dendrogramas (el árbol completo va a .nwk/.json)")
+parser.add_argument("--workers", type=int, default=None,
+                    help="procesos para el preprocesamiento, el grafo kNN y la selección de k (por defecto, uno por CPU)")
+parser.add_argument("--sin-cache", action="store_true",
+                    help=f"no leer ni escribir los tokens de {CACHE_TOKENS} ni las features de {DIR_FEATURES}")
+args = parser.parse_args()
 
 # === CARGA DE DATOS ===
-df = pd.read_csv("outputs/unified.csv")
-df.columns = df.columns.str.strip().str.lower()
-df = df.dropna(subset=["abstract"])
-abstracts = df["abstract"].tolist()
+df = cargar_corpus()
+df = df.dropna(subset=["Abstract"])
+abstracts = df["Abstract"].tolist()
+
+# === PREPROCESAMIENTO (compartido con cluster_abstracts.py) ===
+abstracts_clean = preprocesar_corpus(abstracts, cache=None if args.sin_cache else CACHE_TOKENS,
+                                     workers=args.workers)
+features = AlmacenFeatures(None if args.sin_cache else DIR_FEATURES)
+filas = features.agregar(abstracts_clean)
+
+# === FUNCIÓN: NÚMERO DE CLUSTERS ===
+def elegir_k(linkage_matrix, method):
+    """args.k, o con --k auto el mejor k de args.ks puntuado sobre los vectores LSA."""
+    if args.k != "auto":
+        return args.k
+    puntuaciones = barrido_k(linkage_matrix, vectores_lsa(), args.ks, workers=args.workers)
+    puntuaciones.to_csv(f"{output_dir}/seleccion_k_{method}.csv", index=False)
+    k = mejor_k(puntuaciones)
+    print(f"=== Selección de k ({method}): k = {k} ===")
+    print(puntuaciones.round(3).to_string(index=False))
+    return k
+
+_lsa = None
+
+def vectores_lsa():
+    global _lsa
+    if _lsa is None:
+        _lsa, _ = reducir_lsa(tfidf_matrix)
+    return _lsa
 
 # === CARPETA DE SALIDA ===
 output_dir = "outputs/clusters"
@@ -19,20 +77,29 @@ os.makedirs(output_dir, exist_ok=True)
 
 # === TF-IDF + COSENO ===
 print("Calculando clusters con TF-IDF + Coseno...")
-tfidf = TfidfVectorizer(stop_words="english")
-tfidf_matrix = tfidf.fit_transform(abstracts)
-cosine_sim_matrix = cosine_similarity(tfidf_matrix)
-linkage_tfidf = linkage(1 - cosine_sim_matrix, method="ward")
-clusters_tfidf = fcluster(linkage_tfidf, t=10, criterion="maxclust")
+tfidf_matrix = features.tfidf(filas)
+modo_coseno = args.coseno
+if modo_coseno == "auto":
+    modo_coseno = "denso" if len(abstracts) <= MAX_DENSO else "knn"
+# en ambos modos Ward corre sobre los vectores LSA; knn solo añade la restricción
+# de conectividad (la matriz n × n de 1 - coseno no son observaciones para Ward)
+if modo_coseno == "denso":
+    linkage_tfidf = ward_lineal(vectores_lsa())
+else:
+    # grafo kNN disperso (sirve también para buscar artículos similares)
+    grafo_knn = knn_coseno(tfidf_matrix, k=args.vecinos, workers=args.workers)
+    sparse.save_npz(f"{output_dir}/knn_coseno.npz", grafo_knn)
+    print(f"Grafo kNN guardado en: {output_dir}/knn_coseno.npz ({grafo_knn.nnz} aristas)")
+    linkage_tfidf = ward_conectividad(vectores_lsa(), grafo_knn)
+clusters_tfidf = fcluster(linkage_tfidf, t=elegir_k(linkage_tfidf, "tfidf"), criterion="maxclust")
 df["cluster_tfidf"] = clusters_tfidf
 
 # === BINARIO + JACCARD ===
 print("Calculando clusters con Jaccard...")
-vectorizer = CountVectorizer(stop_words="english", binary=True)
-binary_matrix = vectorizer.fit_transform(abstracts)
-jaccard_dist = pdist(binary_matrix.toarray(), metric="jaccard")
+binary_matrix = features.binaria(filas)
+jaccard_dist = distancias_jaccard(binary_matrix)
 linkage_jaccard = linkage(jaccard_dist, method="ward")
-clusters_jaccard = fcluster(linkage_jaccard, t=10, criterion="maxclust")
+clusters_jaccard = fcluster(linkage_jaccard, t=elegir_k(linkage_jaccard, "jaccard"), criterion="maxclust")
 df["cluster_jaccard"] = clusters_jaccard
 
 # === EXPORTA RESULTADO GLOBAL ===
@@ -41,29 +108,16 @@ print("Guardado archivo general: clusters_tfidf.csv")
 
 # === EXPORTA POR CLUSTER ===
 print("Exportando archivos por cluster...")
-
-for method in ["tfidf", "jaccard"]:
-    col = f"cluster_{method}"
-    for cluster_id in sorted(df[col].unique()):
-        subset = df[df[col] == cluster_id]
-        filename = f"{output_dir}/cluster_{method}_{cluster_id}.csv"
-        subset.to_csv(filename, index=False)
-
-print(f"Archivos exportados por cluster en: {output_dir}")
+destino = exportar_clusters(df, ["tfidf", "jaccard"], output_dir, args.por_cluster)
+print(f"Archivos exportados por cluster en: {destino}")
 
 # === DENDROGRAMAS ===
-plt.figure(figsize=(12, 6))
-dendrogram(linkage_tfidf, labels=clusters_tfidf, orientation='top', distance_sort='descending', no_labels=True)
-plt.title("Dendrograma - TF-IDF + Cosine Similarity")
-plt.tight_layout()
-plt.savefig("outputs/clusters/dendrograma_tfidf_coseno.png")
-plt.close()
-
-plt.figure(figsize=(12, 6))
-dendrogram(linkage_jaccard, labels=clusters_jaccard, orientation='top', distance_sort='descending', no_labels=True)
-plt.title("Dendrograma - CountVectorizer + Jaccard Distance")
-plt.tight_layout()
-plt.savefig("outputs/clusters/dendrograma_jaccard.png")
-plt.close()
+# últimas --p fusiones con el tamaño de cada nodo; el árbol completo se exporta aparte
+dibujar_dendrograma(linkage_tfidf, f"{output_dir}/dendrograma_tfidf_coseno.png",
+                    "Dendrograma - TF-IDF + Cosine Similarity", p=args.p)
+dibujar_dendrograma(linkage_jaccard, f"{output_dir}/dendrograma_jaccard.png",
+                    "Dendrograma - CountVectorizer + Jaccard Distance", p=args.p)
+exportar_arbol(linkage_tfidf, f"{output_dir}/arbol_tfidf")
+exportar_arbol(linkage_jaccard, f"{output_dir}/arbol_jaccard")
 
 print("¡Dendrogramas y CSVs por cluster generados exitosamente!")
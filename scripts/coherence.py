@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coherence.py
+
+Coherencia entre clusters y CATEGORIAS, vectorizada.
+
+La matriz de incidencia documentos × categorías (cuántos términos
+distintos de cada categoría aparecen en cada abstract) se calcula una sola
+vez con MatcherPalabras. Para cada corte (método de linkage, k) basta una
+suma dispersa agrupada por etiqueta, así que evaluar una configuración
+cuesta milisegundos. Además de la tabla cluster × categoría se reportan
+pureza, NMI y lift por cluster y categoría.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.cluster.hierarchy import fcluster
+from sklearn.metrics import normalized_mutual_info_score
+
+from keyword_matcher import MatcherPalabras
+
+
+def incidencia_categorias(textos, categorias, workers=None):
+    """
+    CSR documentos × categorías: número de términos distintos de cada
+    categoría presentes en cada texto (coincidencia de palabra completa).
+    Devuelve (matriz, nombres de las categorías).
+    """
+    matcher = MatcherPalabras(categorias)
+    X = matcher.incidencia_paralelo(textos, workers)
+    X.data[:] = 1
+    nombres = list(categorias)
+    cat_de_termino = np.array([nombres.index(cat) for cat, _ in matcher.terminos])
+    M = sparse.csr_matrix((np.ones(len(cat_de_termino), dtype=np.int32),
+                           (np.arange(len(cat_de_termino)), cat_de_termino)),
+                          shape=(len(cat_de_termino), len(nombres)))
+    return (X @ M).tocsr(), nombres
+
+
+def suma_por_cluster(D, etiquetas):
+    """(clusters, matriz clusters × columnas de D) sumando las filas de cada cluster."""
+    clusters, codigos = np.unique(etiquetas, return_inverse=True)
+    G = sparse.csr_matrix((np.ones(len(codigos), dtype=np.int32), (codigos, np.arange(len(codigos)))),
+                          shape=(len(clusters), len(codigos)))
+    return clusters, np.asarray((G @ D).todense())
+
+
+def tabla_coherencia(D, nombres, etiquetas):
+    """DataFrame categoría × cluster con la suma de la incidencia de sus documentos."""
+    clusters, suma = suma_por_cluster(D, etiquetas)
+    return pd.DataFrame(suma.T, index=nombres, columns=clusters)
+
+
+def lift(D, nombres, etiquetas):
+    """
+    Lift categoría × cluster: P(categoría | cluster) / P(categoría), con la
+    presencia (al menos un término) de cada categoría en cada documento.
+    > 1 indica que la categoría está sobrerrepresentada en el cluster.
+    """
+    P = (D > 0).astype(np.int32)
+    clusters, presentes = suma_por_cluster(P, etiquetas)
+    tamanos = np.bincount(np.unique(etiquetas, return_inverse=True)[1]).astype(np.float64)
+    global_ = np.asarray(P.sum(axis=0)).ravel() / P.shape[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        valores = (presentes / tamanos[:, None]) / global_[None, :]
+    return pd.DataFrame(np.nan_to_num(valores).T, index=nombres, columns=clusters)
+
+
+def metricas(D, etiquetas):
+    """
+    Pureza y NMI de los clusters frente a la categoría dominante de cada
+    documento (la de más términos). Los documentos sin ninguna categoría
+    no cuentan.
+    """
+    con_cat = np.asarray(D.sum(axis=1)).ravel() > 0
+    if not con_cat.any():
+        return {"pureza": np.nan, "nmi": np.nan, "documentos": 0}
+    dominante = np.asarray(D[con_cat].argmax(axis=1)).ravel()
+    etiquetas = np.asarray(etiquetas)[con_cat]
+    _, codigos = np.unique(etiquetas, return_inverse=True)
+    tabla = np.zeros((codigos.max() + 1, D.shape[1]), dtype=np.int64)
+    np.add.at(tabla, (codigos, dominante), 1)
+    return {
+        "pureza": tabla.max(axis=1).sum() / len(dominante),
+        "nmi": normalized_mutual_info_score(dominante, etiquetas),
+        "documentos": int(con_cat.sum()),
+    }
+
+
+def evaluar_configuraciones(linkages, ks, D, asignacion=None):
+    """
+    Métricas de todas las combinaciones {método: linkage} × ks. `asignacion`
+    lleva cada documento a su hoja del linkage (None = una hoja por
+    documento). Devuelve un DataFrame con una fila por (método, k).
+    """
+    filas = []
+    for metodo, L in linkages.items():
+        for k in ks:
+            etiquetas = fcluster(L, k, criterion="maxclust")
+            if asignacion is not None:
+                etiquetas = etiquetas[asignacion]
+            filas.append({"metodo": metodo, "k": k, "clusters": len(np.unique(etiquetas)),
+                          **metricas(D, etiquetas)})
+    return pd.DataFrame(filas)
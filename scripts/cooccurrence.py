@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cooccurrence.py
+
+Co-ocurrencia de términos a partir de una matriz de incidencia dispersa
+documentos × términos (la de MatcherPalabras.incidencia).
+
+La co-ocurrencia ponderada es XᵀX con X binaria: la diagonal da en cuántos
+documentos aparece cada término y cada celda fuera de ella en cuántos
+aparecen juntos. Los pesos pueden normalizarse con association strength o
+PMI para que los términos muy frecuentes no dominen la red, y las aristas
+se filtran por umbral antes de construir el grafo.
+"""
+import numpy as np
+import pandas as pd
+import networkx as nx
+from scipy import sparse
+
+PESOS = ("conteo", "asociacion", "pmi", "npmi")
+
+
+def binarizar(X):
+    """Copia de X con 1 donde hay al menos una aparición."""
+    X = sparse.csr_matrix(X, dtype=np.int32, copy=True)
+    X.data[:] = 1
+    X.eliminate_zeros()
+    return X
+
+def agrupar_columnas(X, etiquetas):
+    """
+    Suma las columnas de X que comparten etiqueta (un mismo término en
+    varias categorías). Devuelve (X agrupada, etiquetas únicas en orden de aparición).
+    """
+    unicas = list(dict.fromkeys(etiquetas))
+    if len(unicas) == len(etiquetas):
+        return X, unicas
+    posicion = {e: i for i, e in enumerate(unicas)}
+    filas = np.arange(len(etiquetas))
+    cols = np.array([posicion[e] for e in etiquetas])
+    M = sparse.csr_matrix((np.ones(len(etiquetas), dtype=X.dtype), (filas, cols)),
+                          shape=(len(etiquetas), len(unicas)))
+    return (X @ M).tocsr(), unicas
+
+
+def coocurrencia(X):
+    """XᵀX sobre la versión binaria de X: matriz términos × términos dispersa."""
+    B = binarizar(X)
+    return (B.T @ B).tocsr()
+
+def aristas(C, n_docs, peso="conteo", umbral=None, min_conteo=1):
+    """
+    Pares de términos (i < j) que co-ocurren, como DataFrame con columnas
+    i, j, conteo y peso. `peso` es uno de PESOS:
+
+      conteo      documentos en los que aparecen juntos
+      asociacion  N·cᵢⱼ / (cᵢ·cⱼ) (association strength; 1 = independencia)
+      pmi         log de la asociación
+      npmi        pmi / -log(cᵢⱼ / N), entre -1 y 1
+
+    Se descartan los pares con menos de `min_conteo` documentos y, si se da
+    `umbral`, los de peso menor.
+    """
+    if peso not in PESOS:
+        raise ValueError(f"peso debe ser uno de {PESOS}")
+    frec = C.diagonal().astype(np.float64)
+    sup = sparse.triu(C, k=1).tocoo()
+    mascara = sup.data >= min_conteo
+    i, j = sup.row[mascara], sup.col[mascara]
+    c = sup.data[mascara].astype(np.float64)
+
+    if peso == "conteo":
+        w = c
+    else:
+        asociacion = n_docs * c / (frec[i] * frec[j])
+        if peso == "asociacion":
+            w = asociacion
+        elif peso == "pmi":
+            w = np.log(asociacion)
+        else:
+            p = c / n_docs
+            with np.errstate(divide="ignore", invalid="ignore"):
+                w = np.where(p < 1, np.log(asociacion) / -np.log(p), 1.0)
+
+    tabla = pd.DataFrame({"i": i, "j": j, "conteo": c.astype(np.int64), "peso": w})
+    if umbral is not None:
+        tabla = tabla[tabla["peso"] >= umbral]
+    return tabla.sort_values("peso", ascending=False, ignore_index=True)
+
+
+def construir_grafo(tabla, etiquetas, frecuencias, atributos=None):
+    """
+    Grafo ponderado a partir de aristas(): nodos con la etiqueta del término,
+    su frecuencia documental y los atributos extra dados ({etiqueta: {...}}).
+    """
+    G = nx.Graph()
+    for idx, etiqueta in enumerate(etiquetas):
+        if frecuencias[idx] > 0:
+            G.add_node(etiqueta, frecuencia=int(frecuencias[idx]), **(atributos or {}).get(etiqueta, {}))
+    nombres = np.asarray(etiquetas, dtype=object)
+    G.add_weighted_edges_from(zip(nombres[tabla["i"]], nombres[tabla["j"]], tabla["peso"].astype(float)))
+    nx.set_edge_attributes(G, {
+        (a, b): int(n) for a, b, n in zip(nombres[tabla["i"]], nombres[tabla["j"]], tabla["conteo"])
+    }, "conteo")
+    return G
+
+def exportar_aristas(tabla, etiquetas, path):
+    """Lista de aristas en CSV (origen, destino, conteo, peso)."""
+    nombres = np.asarray(etiquetas, dtype=object)
+    pd.DataFrame({
+        "origen": nombres[tabla["i"]],
+        "destino": nombres[tabla["j"]],
+        "conteo": tabla["conteo"],
+        "peso": tabla["peso"],
+    }).to_csv(path, index=False)
+
+def exportar_graphml(G, path):
+    nx.write_graphml(G, path)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+corpus.py
+
+Cargador único del corpus unificado para los scripts de análisis.
+
+Lee outputs/unified.parquet (lo escribe merge_csvs.py) con solo las columnas
+pedidas y memory-mapped; las columnas salen con los nombres y tipos de
+corpus_schema.py (Publisher, Publication Title y Document Identifier como
+categóricas). Si no hay Parquet o pyarrow no está instalado, lee las mismas
+columnas de outputs/unified.csv.
+"""
+import os
+import pandas as pd
+
+from corpus_schema import COLUMNAS, tipar
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional: se usa el CSV
+    pa = pq = None
+
+CORPUS_PARQUET = "outputs/unified.parquet"
+CORPUS_CSV     = "outputs/unified.csv"
+
+
+def cargar_corpus(columnas=None, parquet=CORPUS_PARQUET, csv=CORPUS_CSV):
+    """
+    DataFrame del corpus con `columnas` (nombres canónicos; None = todas).
+    Una columna pedida que no existe en el esquema produce KeyError.
+    """
+    columnas = list(COLUMNAS if columnas is None else columnas)
+    faltan = [c for c in columnas if c not in COLUMNAS]
+    if faltan:
+        raise KeyError(f"Columnas fuera del esquema del corpus: {faltan}")
+
+    if pq is not None and os.path.exists(parquet):
+        tabla = pq.read_table(parquet, columns=columnas, memory_map=True)
+        return tabla.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype(), pa.string(): pd.StringDtype()}.get)
+
+    df = pd.read_csv(csv, usecols=lambda c: c in columnas, dtype=str)
+    return tipar(df.reindex(columns=columnas))
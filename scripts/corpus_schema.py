@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+corpus_schema.py
+
+Esquema canónico del corpus unificado (outputs/unified.csv y
+outputs/unified.parquet).
+
+Las columnas siguen el export CSV de IEEE Xplore, que es el que usan los
+scripts de análisis. Los exports de ScienceDirect/Scopus traen otros nombres
+para los mismos datos; ALIAS los traduce al nombre canónico y las columnas
+que no están en el esquema se descartan (mapa_columnas las devuelve para
+que merge_csvs.py avise), así todos los archivos producen el mismo
+conjunto de columnas con los mismos tipos.
+"""
+import pandas as pd
+
+# Columnas canónicas, en orden, y su tipo (las no listadas en TIPOS son texto)
+COLUMNAS = [
+    "Document Title", "Authors", "Author Affiliations", "Publication Title",
+    "Date Added To Xplore", "Publication Year", "Volume", "Issue",
+    "Start Page", "End Page", "Abstract", "ISSN", "ISBNs", "DOI",
+    "Funding Information", "PDF Link", "Author Keywords", "IEEE Terms",
+    "Mesh_Terms", "Article Citation Count", "Patent Citation Count",
+    "Reference Count", "License", "Online Date", "Issue Date",
+    "Meeting Date", "Publisher", "Document Identifier",
+]
+
+TIPOS = {
+    "Publication Year": "Int64",
+    "Article Citation Count": "Int64",
+    "Patent Citation Count": "Int64",
+    "Reference Count": "Int64",
+}
+
+# Columnas con pocos valores distintos: categóricas en pandas y
+# dictionary-encoded en Parquet
+CATEGORICAS = ["Publisher", "Publication Title", "Document Identifier"]
+
+# Nombres alternativos (en minúsculas) → nombre canónico
+ALIAS = {
+    "title": "Document Title",
+    "article title": "Document Title",
+    "author": "Authors",
+    "author full names": "Authors",
+    "affiliations": "Author Affiliations",
+    "source title": "Publication Title",
+    "journal": "Publication Title",
+    "journal title": "Publication Title",
+    "publication title": "Publication Title",
+    "year": "Publication Year",
+    "page start": "Start Page",
+    "page end": "End Page",
+    "isbn": "ISBNs",
+    "link": "PDF Link",
+    "url": "PDF Link",
+    "keywords": "Author Keywords",
+    "index keywords": "IEEE Terms",
+    "cited by": "Article Citation Count",
+    "references count": "Reference Count",
+    "document type": "Document Identifier",
+    "funding details": "Funding Information",
+}
+
+_CANONICAS = {c.lower(): c for c in COLUMNAS}
+
+
+def nombre_canonico(columna):
+    """Nombre canónico de una columna de cualquier export, o None si no está en el esquema."""
+    clave = str(columna).strip().lower()
+    return _CANONICAS.get(clave) or ALIAS.get(clave)
+
+
+def mapa_columnas(columnas):
+    """
+    {columna original: canónica} para las columnas reconocidas y la lista
+    de las descartadas. Si dos columnas caen en la misma canónica gana la
+    primera que coincide exactamente con el nombre canónico.
+    """
+    mapa, descartadas = {}, []
+    ordenadas = sorted(columnas, key=lambda c: str(c).strip().lower() not in _CANONICAS)
+    for col in ordenadas:
+        canonica = nombre_canonico(col)
+        if canonica is None or canonica in mapa.values():
+            descartadas.append(col)
+        else:
+            mapa[col] = canonica
+    return mapa, descartadas
+
+
+def a_esquema(df, mapa=None):
+    """
+    Devuelve df con exactamente COLUMNAS, en orden y con los tipos del
+    esquema. Espera columnas leídas como texto (dtype=str).
+    """
+    if mapa is None:
+        mapa, _ = mapa_columnas(df.columns)
+    df = df[list(mapa)].rename(columns=mapa).reindex(columns=COLUMNAS)
+    return tipar(df, categoricas=False)
+
+
+def tipar(df, categoricas=True):
+    """Aplica los tipos del esquema a las columnas canónicas presentes en df."""
+    for col in df.columns:
+        if col in TIPOS:
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype(TIPOS[col])
+        elif categoricas and col in CATEGORICAS:
+            df[col] = df[col].astype("category")
+        else:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def esquema_arrow():
+    """Esquema pyarrow equivalente, para escribir el corpus en Parquet."""
+    import pyarrow as pa
+    campos = []
+    for col in COLUMNAS:
+        if col in TIPOS:
+            tipo = pa.int64()
+        elif col in CATEGORICAS:
+            tipo = pa.dictionary(pa.int32(), pa.string())
+        else:
+            tipo = pa.string()
+        campos.append(pa.field(col, tipo))
+    return pa.schema(campos)
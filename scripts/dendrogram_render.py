@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+dendrogram_render.py
+
+Dendrogramas que cuestan lo mismo con 100 abstracts que con 100.000.
+
+Solo se dibujan las últimas `p` fusiones del linkage; cada nodo
+contraído se rotula con el número de documentos que contiene en lugar de
+dibujar sus hojas. Con pocas hojas y nombres se dibuja el árbol completo
+rotulado. El árbol entero se exporta aparte en Newick y en JSON (lista
+plana de nodos) para verlo en herramientas externas (iTOL, Dendroscope,
+d3). Nada de esto es recursivo, así que no hay límite de profundidad.
+
+Las funciones solo guardan figuras; no llaman a plt.show(), así que
+funcionan con el backend no interactivo Agg.
+"""
+import os
+import json
+
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.cluster.hierarchy import dendrogram
+
+P_FUSIONES = 30     # fusiones que se dibujan en modo truncado
+MAX_ROTULADAS = 100 # hasta aquí se dibujan todas las hojas con su nombre
+DPI = 150
+
+
+def tamanos_nodos(L, docs_por_hoja=None):
+    """
+    Documentos bajo cada nodo del linkage (hojas 0..n-1, fusiones n..2n-2).
+    `docs_por_hoja` permite hojas que agrupan varios documentos (micro-clusters).
+    """
+    n = len(L) + 1
+    tam = np.ones(2 * n - 1, dtype=np.int64)
+    if docs_por_hoja is not None:
+        tam[:n] = docs_por_hoja
+    for i, (a, b) in enumerate(L[:, :2].astype(np.int64)):
+        tam[n + i] = tam[a] + tam[b]
+    return tam
+
+
+def recortar_linkage(L, p, docs_por_hoja=None):
+    """
+    Linkage con solo las últimas p - 1 fusiones de L: sus hojas son los p
+    nodos que quedan por debajo (contraídos). Devuelve (linkage recortado,
+    documentos de cada hoja nueva). No recorre los subárboles contraídos.
+    """
+    n = len(L) + 1
+    p = max(2, min(p, n))
+    tam = tamanos_nodos(L, docs_por_hoja)
+    arriba = L[n - p:]
+    hijos = arriba[:, :2].astype(np.int64)
+    fusionados = np.arange(2 * n - p, 2 * n - 1)
+    hojas = np.setdiff1d(hijos.ravel(), fusionados)
+    nuevo = {int(h): i for i, h in enumerate(hojas)}
+    nuevo.update({int(f): p + j for j, f in enumerate(fusionados)})
+    recortado = np.column_stack([
+        [nuevo[int(a)] for a in hijos[:, 0]],
+        [nuevo[int(b)] for b in hijos[:, 1]],
+        arriba[:, 2],
+        np.zeros(p - 1),
+    ]).astype(np.float64)
+    recortado[:, 3] = tamanos_nodos(recortado)[p:]   # scipy espera hojas, no documentos
+    return recortado, tam[hojas]
+
+
+def dibujar_dendrograma(L, ruta, titulo, nombres=None, docs_por_hoja=None,
+                        p=P_FUSIONES, dpi=DPI):
+    """
+    Guarda el dendrograma de L en `ruta`. Con `nombres` y como mucho
+    MAX_ROTULADAS hojas se dibuja completo; si no, las últimas `p` fusiones
+    con el número de documentos de cada nodo.
+    """
+    n = len(L) + 1
+    fig, ax = plt.subplots(figsize=(14, 7))
+    if nombres is not None and n <= MAX_ROTULADAS:
+        dendrogram(L, labels=list(nombres), leaf_rotation=90, leaf_font_size=7, ax=ax)
+        ax.set_xlabel("Documentos")
+    else:
+        # se dibuja un linkage de p hojas, no el completo truncado por scipy (que lo recorre entero)
+        recortado, docs = recortar_linkage(L, p, docs_por_hoja)
+        dendrogram(recortado, labels=[str(d) for d in docs],
+                   leaf_rotation=90, leaf_font_size=9, ax=ax)
+        ax.set_xlabel(f"Documentos por nodo ({min(p, n)} nodos superiores de un árbol de {n} hojas)")
+    ax.set_title(titulo)
+    ax.set_ylabel("Distancia")
+    fig.tight_layout()
+    fig.savefig(ruta, dpi=dpi)
+    plt.close(fig)
+    return ruta
+
+
+# === EXPORTACIÓN DEL ÁRBOL COMPLETO ===
+def _nombre_newick(nombre):
+    return "'" + str(nombre).replace("'", "''") + "'"
+
+def exportar_newick(L, ruta, nombres=None):
+    """Árbol completo en formato Newick, con longitudes de rama = diferencia de alturas."""
+    n = len(L) + 1
+    nombres = [f"hoja_{i}" for i in range(n)] if nombres is None else list(nombres)
+    altura = np.concatenate([np.zeros(n), L[:, 2]])
+    hijos = L[:, :2].astype(np.int64)
+    rama = np.zeros(2 * n - 1)
+    for i, par in enumerate(hijos):
+        rama[par] = altura[n + i] - altura[par]
+
+    # recorrido con pila explícita: en la pila hay nodos o trozos de texto ya hechos
+    raiz = 2 * n - 2
+    salida, pila = [], [raiz]
+    while pila:
+        item = pila.pop()
+        if isinstance(item, str):
+            salida.append(item)
+            continue
+        sufijo = "" if item == raiz else f":{rama[item]:.6g}"
+        if item < n:
+            salida.append(_nombre_newick(nombres[item]) + sufijo)
+        else:
+            a, b = hijos[item - n]
+            salida.append("(")
+            pila.extend([")" + sufijo, int(b), ",", int(a)])
+
+    with open(ruta, "w", encoding="utf-8") as fh:
+        fh.write("".join(salida) + ";\n")
+    return ruta
+
+def exportar_json(L, ruta, nombres=None, docs_por_hoja=None):
+    """
+    Árbol completo como lista plana de nodos
+    {"id", "hijos", "distancia", "documentos"[, "nombre"]}; la raíz es el último.
+    """
+    n = len(L) + 1
+    tam = tamanos_nodos(L, docs_por_hoja)
+    nodos = []
+    for i in range(n):
+        nodo = {"id": i, "hijos": [], "distancia": 0.0, "documentos": int(tam[i])}
+        if nombres is not None:
+            nodo["nombre"] = str(nombres[i])
+        nodos.append(nodo)
+    for i, (a, b, d, _) in enumerate(L):
+        nodos.append({"id": n + i, "hijos": [int(a), int(b)], "distancia": float(d),
+                      "documentos": int(tam[n + i])})
+    with open(ruta, "w", encoding="utf-8") as fh:
+        json.dump({"hojas": n, "raiz": 2 * n - 2, "nodos": nodos}, fh, ensure_ascii=False)
+    return ruta
+
+def exportar_arbol(L, base, nombres=None, docs_por_hoja=None):
+    """Escribe <base>.nwk y <base>.json. Devuelve las dos rutas."""
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    return (exportar_newick(L, base + ".nwk", nombres),
+            exportar_json(L, base + ".json", nombres, docs_por_hoja))
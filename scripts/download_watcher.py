@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+download_watcher.py
+
+Vigila una carpeta de descargas y avisa en cuanto un archivo queda
+completo, sin sondear con glob.
+
+En Linux usa inotify (vía ctypes, sin dependencias): Chrome escribe en
+<nombre>.crdownload y al terminar lo renombra (IN_MOVED_TO); otras
+descargas se detectan al cerrarse el archivo (IN_CLOSE_WRITE). En otros
+sistemas, o si inotify no está disponible, un hilo revisa la carpeta cada
+`sondeo` segundos y da por completo un archivo cuando su tamaño deja de
+cambiar.
+
+Cada descarga se pide ANTES de pulsar el botón (pedir()); los archivos
+completos se reparten en orden de llegada al pedido pendiente más antiguo
+cuyo patrón coincide, así cada archivo se asocia con la página que lo
+pidió aunque haya otras descargas en la misma carpeta. entregar() lo
+renombra de forma atómica (os.replace) a su nombre final.
+"""
+import os
+import time
+import errno
+import shutil
+import ctypes
+import ctypes.util
+import select
+import struct
+import fnmatch
+import threading
+from collections import deque
+
+# — inotify (linux/inotify.h) —
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+_EVENTO = struct.Struct("iIII")   # wd, mask, cookie, len
+
+INCOMPLETOS = (".crdownload", ".part", ".tmp")
+SONDEO = 0.2   # segundos, solo sin inotify
+
+
+def _libc_inotify():
+    """libc con inotify o None (macOS, Windows, contenedores sin soporte)."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch   # noqa: B018 — falla si no existen
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class Pedido:
+    """Una descarga esperada: el primer archivo completo que cumpla `patron` tras crearse."""
+
+    def __init__(self, patron, vigilante=None):
+        self.patron = patron
+        self.vigilante = vigilante
+        self.ruta = None
+        self.listo = threading.Event()
+
+    def esperar(self, timeout):
+        """Ruta del archivo completo, o None si no llegó en `timeout` segundos."""
+        return self.ruta if self.listo.wait(timeout) else None
+
+
+class VigilanteDescargas:
+    """Vigila `directorio` en un hilo; usar pedir() → clic → esperar() → entregar()."""
+
+    def __init__(self, directorio, sondeo=SONDEO):
+        self.directorio = os.path.abspath(directorio)
+        os.makedirs(self.directorio, exist_ok=True)
+        self.sondeo = sondeo
+        self.candado = threading.Lock()
+        self.pedidos = deque()
+        self.vistos = {f for f in os.listdir(self.directorio) if self._completo(f)}
+        self.parar = threading.Event()
+        self.fd = None
+        libc = _libc_inotify()
+        if libc is not None:
+            fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+            if fd >= 0 and libc.inotify_add_watch(fd, self.directorio.encode(),
+                                                  IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE) >= 0:
+                self.fd = fd
+            elif fd >= 0:
+                os.close(fd)
+        self.modo = "inotify" if self.fd is not None else "sondeo"
+        objetivo = self._leer_inotify if self.fd is not None else self._sondear
+        self.hilo = threading.Thread(target=objetivo, daemon=True, name=f"vigilante-{os.path.basename(directorio)}")
+        self.hilo.start()
+
+    @staticmethod
+    def _completo(nombre):
+        return not nombre.endswith(INCOMPLETOS) and not nombre.startswith(".")
+
+    def pedir(self, patron="*"):
+        """Registra una descarga esperada. Llamar antes de pulsar el botón que la inicia."""
+        pedido = Pedido(patron, self)
+        with self.candado:
+            self.pedidos.append(pedido)
+        return pedido
+
+    def cancelar(self, pedido):
+        with self.candado:
+            if pedido in self.pedidos:
+                self.pedidos.remove(pedido)
+
+    def entregar(self, pedido, destino):
+        """Renombra el archivo del pedido a `destino` (atómico en el mismo disco) y lo devuelve."""
+        if os.path.dirname(destino) == "":
+            destino = os.path.join(self.directorio, destino)
+        with self.candado:   # el renombrado genera un IN_MOVED_TO que no es una descarga nueva
+            self.vistos.add(os.path.basename(destino))
+        try:
+            os.replace(pedido.ruta, destino)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            tmp = destino + ".tmp"   # otro disco: copiar y renombrar allí
+            shutil.copyfile(pedido.ruta, tmp)
+            os.replace(tmp, destino)
+            os.remove(pedido.ruta)
+        self._olvidar(os.path.basename(pedido.ruta))   # la próxima descarga puede llamarse igual
+        return destino
+
+    def _llego(self, nombre):
+        """Asigna un archivo completo al pedido pendiente más antiguo que lo acepte."""
+        if not self._completo(nombre):
+            return
+        ruta = os.path.join(self.directorio, nombre)
+        with self.candado:
+            if nombre in self.vistos or not os.path.isfile(ruta):
+                return
+            self.vistos.add(nombre)
+            for pedido in self.pedidos:
+                if fnmatch.fnmatch(nombre, pedido.patron):
+                    self.pedidos.remove(pedido)
+                    pedido.ruta = ruta
+                    pedido.listo.set()
+                    return
+        # sin pedido (p. ej. un archivo copiado a mano): se ignora
+
+    def _olvidar(self, nombre):
+        """Un archivo que se renombró o borró puede volver a llegar con el mismo nombre."""
+        with self.candado:
+            self.vistos.discard(nombre)
+
+    def _leer_inotify(self):
+        try:
+            while not self.parar.is_set():
+                if not select.select([self.fd], [], [], 0.5)[0]:
+                    continue
+                try:
+                    datos = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                p = 0
+                while p < len(datos):
+                    _, mascara, _, largo = _EVENTO.unpack_from(datos, p)
+                    nombre = datos[p + _EVENTO.size:p + _EVENTO.size + largo].rstrip(b"\0")
+                    p += _EVENTO.size + largo
+                    if mascara & IN_Q_OVERFLOW:   # se perdieron eventos: revisar la carpeta
+                        for f in sorted(os.listdir(self.directorio)):
+                            self._llego(f)
+                    elif mascara & (IN_MOVED_FROM | IN_DELETE):
+                        self._olvidar(os.fsdecode(nombre))
+                    elif nombre:
+                        self._llego(os.fsdecode(nombre))
+        finally:
+            os.close(self.fd)
+
+    def _sondear(self):
+        tamanos = {}
+        while not self.parar.wait(self.sondeo):
+            actuales = set()
+            for entrada in os.scandir(self.directorio):
+                actuales.add(entrada.name)
+                if entrada.name in self.vistos or not self._completo(entrada.name) or not entrada.is_file():
+                    continue
+                if os.path.exists(entrada.path + ".crdownload"):
+                    continue
+                tamano = entrada.stat().st_size
+                if tamanos.get(entrada.name) == tamano:
+                    self._llego(entrada.name)
+                tamanos[entrada.name] = tamano
+            with self.candado:
+                self.vistos &= actuales
+
+    def cerrar(self):
+        self.parar.set()
+        self.hilo.join(timeout=2)
+
+
+if __name__ == "__main__":
+    # prueba rápida: dos "descargas" solapadas, cada una llega a su pedido
+    import tempfile
+    carpeta = tempfile.mkdtemp(prefix="vigilante_")
+    v = VigilanteDescargas(carpeta)
+    zip_pedido, csv_pedido = v.pedir("*.zip"), v.pedir("*.csv")
+
+    def descargar(nombre, demora):
+        time.sleep(demora)
+        with open(os.path.join(carpeta, nombre + ".crdownload"), "wb") as fh:
+            fh.write(b"x" * 1000)
+        os.replace(os.path.join(carpeta, nombre + ".crdownload"), os.path.join(carpeta, nombre))
+
+    t0 = time.perf_counter()
+    for nombre, demora in (("export.csv", 0.1), ("bulk-download.zip", 0.3)):
+        threading.Thread(target=descargar, args=(nombre, demora)).start()
+    for pedido, destino in ((zip_pedido, "ieee_page_1.zip"), (csv_pedido, "ieee_page_1.csv")):
+        pedido.esperar(5)
+        print(f"✔ {os.path.basename(pedido.ruta)} → {destino} "
+              f"({time.perf_counter() - t0:.2f}s, {v.modo})")
+        v.entregar(pedido, destino)
+    v.cerrar()
+    print(sorted(os.listdir(carpeta)))
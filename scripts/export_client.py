@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+export_client.py
+
+Exportación de páginas de resultados por HTTP, sin pulsar "seleccionar
+todo → exportar → CSV" en el navegador.
+
+Tras el login con Selenium se copian las cookies de la sesión a un
+cliente asíncrono que pide las exportaciones de varias páginas a la vez:
+
+  - pool de conexiones keep-alive con un máximo de `conexiones`
+    simultáneas al mismo host,
+  - límite de tasa (peticiones por segundo, cubo de fichas),
+  - reintentos con backoff exponencial y jitter ante 429/5xx y errores de
+    red, respetando Retry-After,
+  - 401/403 se informan como SesionCaducada para volver a iniciar sesión.
+
+Cada exportación se escribe directamente en data/ de forma atómica.
+Solo usa la biblioteca estándar (asyncio + http.client en hilos).
+
+Ejecutado directamente se prueba contra el servidor de exportación falso
+de scrape_fixtures:
+
+    python export_client.py --paginas 1-20 --conexiones 4 --fallos 0.2
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import http.client
+from urllib.parse import urlsplit, urlencode
+
+CONEXIONES = 4
+POR_SEGUNDO = 4.0
+REINTENTOS = 5
+ESPERA_BASE = 0.5     # segundos; se dobla en cada reintento
+ESPERA_MAX = 30.0
+TIMEOUT = 60
+REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+class SesionCaducada(Exception):
+    """El servidor rechazó las cookies (401/403): hay que volver a iniciar sesión."""
+
+
+def cabecera_cookies(cookies, host):
+    """Cabecera Cookie con las cookies (formato de Selenium/CDP) que aplican a `host`."""
+    partes = []
+    for c in cookies:
+        dominio = c.get("domain", "").lstrip(".")
+        if not dominio or host == dominio or host.endswith("." + dominio):
+            partes.append(f"{c['name']}={c['value']}")
+    return "; ".join(partes)
+
+
+def cookies_driver(driver):
+    """Cookies de todos los dominios del navegador autenticado (vía CDP, incluidas las httpOnly)."""
+    return driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+
+
+# === LÍMITE DE TASA ===
+class LimiteTasa:
+    """Cubo de fichas: como mucho `por_segundo` peticiones por segundo (ráfagas de `rafaga`)."""
+
+    def __init__(self, por_segundo=POR_SEGUNDO, rafaga=1):
+        self.intervalo = 1.0 / por_segundo if por_segundo else 0.0
+        self.rafaga = rafaga
+        self.fichas = rafaga
+        self.ultimo = time.monotonic()
+        self.candado = asyncio.Lock()
+
+    async def esperar(self):
+        if not self.intervalo:
+            return
+        async with self.candado:
+            ahora = time.monotonic()
+            self.fichas = min(self.rafaga, self.fichas + (ahora - self.ultimo) / self.intervalo)
+            self.ultimo = ahora
+            if self.fichas < 1:
+                await asyncio.sleep((1 - self.fichas) * self.intervalo)
+                self.fichas = 1
+                self.ultimo = time.monotonic()
+            self.fichas -= 1
+
+
+# === CLIENTE ===
+class ClienteExport:
+    """
+    Cliente HTTP asíncrono para un host (`base`, p. ej. https://ieeexplore.ieee.org)
+    con las cookies de la sesión. Usar dentro de un bucle asyncio y cerrar con cerrar().
+    """
+
+    def __init__(self, base, cookies=(), conexiones=CONEXIONES, por_segundo=POR_SEGUNDO,
+                 reintentos=REINTENTOS, cabeceras=None, timeout=TIMEOUT):
+        partes = urlsplit(base)
+        self.https = partes.scheme == "https"
+        self.host = partes.hostname
+        self.puerto = partes.port
+        self.timeout = timeout
+        self.reintentos = reintentos
+        self.cabeceras = {"User-Agent": "Mozilla/5.0", "Accept": "*/*", "Connection": "keep-alive",
+                          **(cabeceras or {})}
+        cookie = cabecera_cookies(cookies, self.host)
+        if cookie:
+            self.cabeceras["Cookie"] = cookie
+        self.limite = LimiteTasa(por_segundo, rafaga=conexiones)
+        self.libres = asyncio.Queue()
+        for _ in range(conexiones):
+            self.libres.put_nowait(None)   # las conexiones se abren al primer uso
+        self.conexiones = conexiones
+        self.estadisticas = {"peticiones": 0, "reintentos": 0, "bytes": 0}
+
+    def _nueva_conexion(self):
+        clase = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return clase(self.host, self.puerto, timeout=self.timeout)
+
+    def _pedir(self, conexion, ruta):
+        """Petición bloqueante (corre en un hilo). Devuelve (conexión, estado, cabeceras, cuerpo)."""
+        if conexion is None:
+            conexion = self._nueva_conexion()
+        conexion.request("GET", ruta, headers=self.cabeceras)
+        respuesta = conexion.getresponse()
+        cuerpo = respuesta.read()
+        if respuesta.will_close:
+            conexion.close()
+            conexion = None
+        return conexion, respuesta.status, dict(respuesta.getheaders()), cuerpo
+
+    async def obtener(self, ruta, params=None):
+        """Cuerpo de GET ruta?params, con reintentos. Lanza SesionCaducada o RuntimeError."""
+        if params:
+            ruta = f"{ruta}?{urlencode(params)}"
+        for intento in range(self.reintentos + 1):
+            await self.limite.esperar()
+            conexion = await self.libres.get()
+            espera = None
+            try:
+                self.estadisticas["peticiones"] += 1
+                conexion, estado, cabeceras, cuerpo = await asyncio.to_thread(self._pedir, conexion, ruta)
+                if estado in (401, 403):
+                    raise SesionCaducada(f"{estado} en {ruta}")
+                if estado == 200:
+                    self.estadisticas["bytes"] += len(cuerpo)
+                    return cuerpo
+                if estado not in REINTENTABLES:
+                    raise RuntimeError(f"HTTP {estado} en {ruta}")
+                motivo = f"HTTP {estado}"
+                if cabeceras.get("Retry-After", "").isdigit():
+                    espera = float(cabeceras["Retry-After"])
+            except (OSError, http.client.HTTPException) as e:
+                if conexion is not None:
+                    conexion.close()
+                conexion = None
+                motivo = type(e).__name__
+            finally:
+                self.libres.put_nowait(conexion)
+
+            if intento == self.reintentos:
+                raise RuntimeError(f"{ruta}: {motivo} tras {self.reintentos} reintentos")
+            if espera is None:
+                espera = min(ESPERA_MAX, ESPERA_BASE * 2 ** intento) * random.uniform(0.5, 1.0)
+            self.estadisticas["reintentos"] += 1
+            await asyncio.sleep(espera)
+
+    async def descargar(self, ruta, params, destino):
+        """Guarda la respuesta en `destino` (escritura atómica). Devuelve la ruta."""
+        cuerpo = await self.obtener(ruta, params)
+        os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+        tmp = destino + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(cuerpo)
+        os.replace(tmp, destino)
+        return destino
+
+    async def exportar_paginas(self, paginas, url_export, destino_de):
+        """
+        Descarga en paralelo la exportación de cada página. `url_export(p)`
+        da (ruta, params) y `destino_de(p)` el archivo de salida. Devuelve
+        {página: ruta o excepción}; SesionCaducada se propaga.
+        """
+        async def una(p):
+            ruta, params = url_export(p)
+            return await self.descargar(ruta, params, destino_de(p))
+
+        resultados = await asyncio.gather(*(una(p) for p in paginas), return_exceptions=True)
+        for r in resultados:
+            if isinstance(r, SesionCaducada):
+                raise r
+        return dict(zip(paginas, resultados))
+
+    async def cerrar(self):
+        while not self.libres.empty():
+            conexion = self.libres.get_nowait()
+            if conexion is not None:
+                conexion.close()
+
+
+def exportar(base, cookies, paginas, url_export, destino_de, **opciones):
+    """Versión síncrona de ClienteExport.exportar_paginas. Devuelve (resultados, estadísticas)."""
+    async def correr():
+        cliente = ClienteExport(base, cookies, **opciones)
+        try:
+            return await cliente.exportar_paginas(paginas, url_export, destino_de), cliente.estadisticas
+        finally:
+            await cliente.cerrar()
+    return asyncio.run(correr())
+
+
+# === PROGRAMA PRINCIPAL: prueba contra el servidor de exportación falso ===
+if __name__ == "__main__":
+    import tempfile
+    from scrape_fixtures import servir_export, COOKIE_EXPORT
+
+    parser = argparse.ArgumentParser(description="Exporta páginas por HTTP contra el servidor de exportación falso.")
+    parser.add_argument("--paginas", default="1-20", help="rango de páginas, p. ej. 1-20")
+    parser.add_argument("--conexiones", type=int, default=CONEXIONES, help="conexiones simultáneas máximas")
+    parser.add_argument("--por-segundo", type=float, default=20.0, help="peticiones por segundo")
+    parser.add_argument("--fallos", type=float, default=0.2, help="fracción de respuestas 429/503 del servidor")
+    parser.add_argument("--lat", type=int, default=200, help="latencia máxima del servidor (ms)")
+    args = parser.parse_args()
+
+    desde, _, hasta = args.paginas.partition("-")
+    paginas = list(range(int(desde), int(hasta or desde) + 1))
+    servidor, url_base = servir_export(paginas=paginas[-1], fallos=args.fallos, lat=args.lat)
+    salida = tempfile.mkdtemp(prefix="export_mock_")
+    t0 = time.perf_counter()
+    resultados, estadisticas = exportar(
+        url_base, [COOKIE_EXPORT], paginas,
+        lambda p: ("/export", {"pageNumber": p}),
+        lambda p: os.path.join(salida, f"ieee_page_{p}.csv"),
+        conexiones=args.conexiones, por_segundo=args.por_segundo)
+    segundos = time.perf_counter() - t0
+    servidor.shutdown()
+
+    errores = {p: r for p, r in resultados.items() if isinstance(r, Exception)}
+    bien = len(paginas) - len(errores)
+    print(f"✔ {bien}/{len(paginas)} páginas en {segundos:.2f}s ({bien / segundos * 60:.0f} páginas/min) → {salida}")
+    print(f"  peticiones: {estadisticas['peticiones']} ({estadisticas['reintentos']} reintentos), "
+          f"conexiones abiertas: {len(servidor.conexiones)}, simultáneas máx.: {servidor.max_simultaneas}")
+    for p, e in errores.items():
+        print(f"  ❌ página {p}: {e}")
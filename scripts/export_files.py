@@ -1,7 +1,15 @@
 import os
 import glob
+import hashlib
+import argparse
+import numpy as np
 import pandas as pd
 
+from key_index import IndiceClaves
+
+INDEX_FN = "outputs/export_index.sqlite"
+LOTE_ESCRITURA = 5000   # entradas BibTeX por cada f.write
+
 # 1) Columnas esperadas
 COL_TITLE   = "Document Title"
 COL_AUTHORS = "Authors"
@@ -9,66 +17,116 @@ COL_ABSTRACT= "Abstract"
 COL_PDF     = "PDF Link"
 COL_TERMS   = "IEEE Terms"
 COL_DATE    = "Online Date"
+COLUMNAS    = [COL_TITLE, COL_AUTHORS, COL_ABSTRACT, COL_PDF, COL_TERMS, COL_DATE]
 
 # 2) Funciones de exportación
-def export_bib(df, out_path):
-    with open(out_path, "w", encoding="utf-8") as f:
-        for i, row in df.iterrows():
-            key     = f"ref{i+1}"
-            title   = str(row[COL_TITLE])
-            authors = " and ".join(a.strip() for a in str(row[COL_AUTHORS]).split(";") if a.strip())
-            year    = str(row[COL_DATE])[:4]
-            abstract= str(row[COL_ABSTRACT]).replace("\n", " ")
-            pdf     = str(row[COL_PDF])
-            terms   = str(row[COL_TERMS])
-
-            f.write(f"@article{{{key},\n")
-            f.write(f"  title     = {{{title}}},\n")
-            f.write(f"  author    = {{{authors}}},\n")
-            f.write(f"  year      = {{{year}}},\n")
-            f.write(f"  abstract  = {{{abstract}}},\n")
-            f.write(f"  keywords  = {{{terms}}},\n")
-            f.write(f"  url       = {{{pdf}}},\n")
-            f.write("}\n\n")
-
-# 3) Bucle principal
+def export_bib(df, out_path, modo="w"):
+    """
+    Escribe df como BibTeX (modo 'a' para añadir). Como antes, la clave
+    refN es la fila N del CSV de origen (índice de df + 1), también al leer
+    por trozos. Los bloques se arman columna a columna y se escriben en
+    lotes de LOTE_ESCRITURA entradas.
+    """
+    n = len(df)
+    col = lambda c: df[c].astype(str).to_numpy(dtype=object)
+    authors = (df[COL_AUTHORS].astype(str)
+               .str.replace(r"^[\s;]+|[\s;]+$", "", regex=True)
+               .str.replace(r"\s*;[\s;]*", " and ", regex=True)
+               .to_numpy(dtype=object))
+    year     = df[COL_DATE].astype(str).str[:4].to_numpy(dtype=object)
+    abstract = df[COL_ABSTRACT].astype(str).str.replace("\n", " ", regex=False).to_numpy(dtype=object)
+    keys     = ("ref" + (df.index + 1).astype(str)).to_numpy(dtype=object)
+
+    bloques = ("@article{" + keys
+               + ",\n  title     = {" + col(COL_TITLE)
+               + "},\n  author    = {" + authors
+               + "},\n  year      = {" + year
+               + "},\n  abstract  = {" + abstract
+               + "},\n  keywords  = {" + col(COL_TERMS)
+               + "},\n  url       = {" + col(COL_PDF)
+               + "},\n}\n\n") if n else []
+
+    with open(out_path, modo, encoding="utf-8", buffering=1 << 20) as f:
+        for i in range(0, n, LOTE_ESCRITURA):
+            f.write("".join(bloques[i:i + LOTE_ESCRITURA]))
+
+def filas_nuevas(df, csv_path, indice, apariciones):
+    """
+    Máscara de las filas de `df` que no se habían visto en este archivo.
+    La huella de cada fila es su hash de pandas más el número de aparición,
+    que `apariciones` (hash → veces) arrastra entre trozos del mismo CSV.
+    """
+    h = pd.util.hash_pandas_object(df, index=False)
+    previas = h.map(apariciones).fillna(0).astype(np.int64)
+    ocurrencia = previas + h.groupby(h).cumcount() + 1
+    for valor, veces in h.value_counts().items():
+        apariciones[valor] = apariciones.get(valor, 0) + veces
+
+    prefijo = hashlib.sha1(os.path.abspath(csv_path).encode("utf-8")).hexdigest()[:16]
+    huellas = (prefijo + ":" + ocurrencia.astype(str) + ":" + h.astype(str)).tolist()
+    nuevas = indice.huellas_nuevas(huellas)
+    return np.fromiter((x in nuevas for x in huellas), dtype=bool, count=len(huellas))
+
+def procesar_trozo(df, csv_path, indice, modo, apariciones):
+    """Dedup por título normalizado y exportación de un DataFrame (archivo o trozo)."""
+    nuevos = df[filas_nuevas(df, csv_path, indice, apariciones)]
+    titulos = nuevos[COL_TITLE].astype(str).str.strip().str.lower()
+    vistos = indice.buscar_varias(titulos.unique())
+    es_dup = titulos.duplicated() | titulos.isin(vistos)
+
+    df_unique, df_duplicates = nuevos[~es_dup], nuevos[es_dup]
+    indice.guardar_claves(titulos[~es_dup])
+    export_bib(df_unique, "outputs/unified.bib", modo)
+    export_bib(df_duplicates, "outputs/duplicates.bib", modo)
+    indice.sumar("unicos", len(df_unique))
+    indice.sumar("duplicados", len(df_duplicates))
+    return len(nuevos)
+
+# 3) Bucle principal (incremental: solo CSV nuevos o modificados)
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta los CSV de data/ a BibTeX sin duplicados.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="ignora el índice y vuelve a exportar todo desde cero")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="lee cada CSV en trozos de N filas (para archivos que no caben en memoria)")
+    args = parser.parse_args()
+
     os.makedirs("outputs", exist_ok=True)
     csv_files = glob.glob("data/*.csv")
     if not csv_files:
         print("⚠ No encontré ningún CSV en data/. Pon tus archivos allí.")
         exit()
 
-    unique_titles = set()
-    unique_entries = []
-    duplicate_entries = []
+    indice = IndiceClaves(INDEX_FN, {"modo": "titulo", "huella": "hash_pandas"})
+    if args.rebuild or not all(os.path.exists(p) for p in ("outputs/unified.bib", "outputs/duplicates.bib")):
+        indice.reiniciar()
+    modo = "w" if indice.nuevo else "a"
 
-    for csv_path in csv_files:
+    for csv_path, firma in indice.pendientes(csv_files):
         name = os.path.basename(csv_path)
         print(f"→ Procesando {name} ...")
-        df = pd.read_csv(csv_path).fillna('')
-
-        missing = [c for c in [COL_TITLE, COL_AUTHORS, COL_ABSTRACT, COL_PDF, COL_TERMS, COL_DATE] if c not in df.columns]
+        columnas = pd.read_csv(csv_path, nrows=0).columns
+        missing = [c for c in COLUMNAS if c not in columnas]
         if missing:
             print(f"  ❌ Faltan columnas en {name}: {missing}, omitiendo este archivo.")
+            # se marca con 0 registros para no releerlo (ni avisar) hasta que cambie
+            indice.marcar_procesado(csv_path, firma, 0)
+            indice.commit()
             continue
 
-        for _, row in df.iterrows():
-            title = str(row[COL_TITLE]).strip().lower()
-            if title in unique_titles:
-                duplicate_entries.append(row)
-            else:
-                unique_titles.add(title)
-                unique_entries.append(row)
-
-    # Crear DataFrames
-    df_unique = pd.DataFrame(unique_entries)
-    df_duplicates = pd.DataFrame(duplicate_entries)
+        # todo como texto: mismas huellas leyendo el archivo entero o por trozos
+        lector = pd.read_csv(csv_path, dtype=str, chunksize=args.chunksize)
+        trozos = lector if args.chunksize else [lector]
+        apariciones = {}
+        registros = 0
+        for df in trozos:
+            registros += procesar_trozo(df.fillna(''), csv_path, indice, modo, apariciones)
+            modo = "a"
 
-    # Exportar
-    export_bib(df_unique, "outputs/unified.bib")
-    export_bib(df_duplicates, "outputs/duplicates.bib")
+        indice.marcar_procesado(csv_path, firma, registros)
+        indice.commit()
 
-    print(f"✔ Unificados: {len(df_unique)} artículos")
-    print(f"✔ Duplicados: {len(df_duplicates)} artículos")
+    print(f"✔ Unificados: {indice.contador('unicos')} artículos")
+    print(f"✔ Duplicados: {indice.contador('duplicados')} artículos")
     print("✔ Archivos generados en outputs/: unified.bib y duplicates.bib")
+    indice.close()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+feature_store.py
+
+Almacén persistente de la matriz documentos × términos de los abstracts
+ya preprocesados (text_preprocessing), compartido por cluster_abstracts.py
+y clustering_similitud.py.
+
+Guarda en outputs/features/ los conteos de términos como fragmentos CSR
+(.npz), el vocabulario y la huella de cada fila. Cuando llegan abstracts
+nuevos solo se tokenizan esos: se añade un fragmento con sus filas y los
+términos nuevos se agregan al final del vocabulario, sin rehacer lo
+anterior. Las vistas TF-IDF, binaria y de conteos se calculan al pedirlas
+sobre las filas solicitadas, con el IDF de esas filas; la TF-IDF coincide
+con la de TfidfVectorizer() ajustado sobre los mismos textos (salvo por
+columnas de términos ausentes, que quedan a cero).
+"""
+import os
+import json
+import hashlib
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+DIR_FEATURES = "outputs/features"
+
+_analizar = CountVectorizer().build_analyzer()
+
+
+def huella_texto(texto):
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+class AlmacenFeatures:
+    """
+    Conteos de términos por documento. Con `directorio=None` todo vive en
+    memoria y no se guarda nada.
+    """
+
+    def __init__(self, directorio=DIR_FEATURES):
+        self.directorio = directorio
+        self.vocabulario = []
+        self.columnas = {}
+        self.huellas = []
+        self.filas = {}
+        self.fragmentos = []
+        self.nombres = []
+        self._apilada = None
+        if directorio and os.path.exists(os.path.join(directorio, "indice.json")):
+            self._cargar()
+
+    # --- persistencia ---
+    def _cargar(self):
+        with open(os.path.join(self.directorio, "indice.json"), encoding="utf-8") as fh:
+            indice = json.load(fh)
+        self.vocabulario = indice["vocabulario"]
+        self.huellas = indice["huellas"]
+        self.columnas = {t: j for j, t in enumerate(self.vocabulario)}
+        self.filas = {h: i for i, h in enumerate(self.huellas)}
+        for nombre in indice["fragmentos"]:
+            self.fragmentos.append(sparse.load_npz(os.path.join(self.directorio, nombre)))
+            self.nombres.append(nombre)
+
+    def _guardar(self, nuevo):
+        """Escribe solo el fragmento nuevo y reemplaza el índice de forma atómica."""
+        os.makedirs(self.directorio, exist_ok=True)
+        nombre = f"conteos_{len(self.nombres):05d}.npz"
+        sparse.save_npz(os.path.join(self.directorio, nombre), nuevo, compressed=False)
+        self.nombres.append(nombre)
+        indice = {"vocabulario": self.vocabulario, "huellas": self.huellas, "fragmentos": self.nombres}
+        tmp = os.path.join(self.directorio, "indice.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(indice, fh)
+        os.replace(tmp, os.path.join(self.directorio, "indice.json"))
+
+    # --- altas ---
+    def agregar(self, textos):
+        """
+        Índices de fila de cada texto (preprocesado) en el almacén, en orden.
+        Los textos que no estaban se tokenizan y se añaden como un fragmento nuevo.
+        """
+        huellas = [huella_texto(t) for t in textos]
+        nuevos = {}
+        for h, t in zip(huellas, textos):
+            if h not in self.filas and h not in nuevos:
+                nuevos[h] = t
+
+        if nuevos:
+            indptr, indices, datos = [0], [], []
+            for t in nuevos.values():
+                conteo = {}
+                for tok in _analizar(t):
+                    j = self.columnas.get(tok)
+                    if j is None:
+                        j = self.columnas[tok] = len(self.vocabulario)
+                        self.vocabulario.append(tok)
+                    conteo[j] = conteo.get(j, 0) + 1
+                indices.extend(conteo.keys())
+                datos.extend(conteo.values())
+                indptr.append(len(indices))
+            fragmento = sparse.csr_matrix(
+                (np.array(datos, dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+                shape=(len(nuevos), len(self.vocabulario)))
+            fragmento.sort_indices()
+            for h in nuevos:
+                self.filas[h] = len(self.huellas)
+                self.huellas.append(h)
+            self.fragmentos.append(fragmento)
+            self._apilada = None
+            if self.directorio:
+                self._guardar(fragmento)
+            print(f"→ Features: {len(nuevos)} abstracts nuevos, vocabulario de {len(self.vocabulario)} términos")
+
+        return np.array([self.filas[h] for h in huellas], dtype=np.int64)
+
+    # --- vistas ---
+    def _todas(self):
+        """Conteos de todas las filas, con el ancho actual del vocabulario."""
+        if self._apilada is None:
+            m = len(self.vocabulario)
+            partes = [sparse.csr_matrix((0, m), dtype=np.int32)]
+            for f in self.fragmentos:
+                f = f.tocsr()
+                f.resize((f.shape[0], m))   # los fragmentos antiguos no tienen las columnas nuevas
+                partes.append(f)
+            self._apilada = sparse.vstack(partes, format="csr")
+        return self._apilada
+
+    def conteos(self, filas):
+        return self._todas()[filas]
+
+    def binaria(self, filas):
+        X = self.conteos(filas)
+        X.data[:] = 1
+        return X
+
+    def tfidf(self, filas):
+        """TF-IDF (idf suavizado y norma l2, como TfidfVectorizer) con el IDF de estas filas."""
+        X = self.conteos(filas).astype(np.float64)
+        n = X.shape[0]
+        df = np.bincount(X.indices, minlength=X.shape[1])
+        idf = np.log((1 + n) / (1 + df)) + 1
+        return normalize(X @ sparse.diags(idf))
@@ -0,0 +1,75 @@
+// Utilidades de las páginas de prueba: construyen el DOM en las mismas
+// rutas XPath que usan los scrapers, simulan latencia y generan descargas.
+
+const PARAMS = new URLSearchParams(location.search);
+const PAGINA = parseInt(PARAMS.get('page') || '1');
+const PAGINAS = parseInt(PARAMS.get('paginas') || '3');
+const LAT = parseInt(PARAMS.get('lat') || '300');
+
+// Ejecuta f tras una latencia aleatoria de hasta LAT ms.
+function demora(f) {
+  setTimeout(f, Math.random() * LAT);
+}
+
+// Hijo `paso` ("div", "div[5]", "xpl-root") de `padre`, creando los que falten.
+function hijo(padre, paso) {
+  const m = paso.match(/^([\w-]+)(?:\[(\d+)\])?$/);
+  const etiqueta = m[1], indice = m[2] ? parseInt(m[2]) : 1;
+  const iguales = Array.from(padre.children).filter(e => e.localName === etiqueta);
+  while (iguales.length < indice) {
+    const e = document.createElement(etiqueta);
+    padre.appendChild(e);
+    iguales.push(e);
+  }
+  return iguales[indice - 1];
+}
+
+// Elemento en la ruta XPath absoluta "/html/body/...", creando lo que falte.
+function ruta(xpath) {
+  let nodo = document.documentElement;
+  for (const paso of xpath.replace(/^\/html/, '').split('/').filter(Boolean)) {
+    nodo = hijo(nodo, paso);
+  }
+  return nodo;
+}
+
+// Navega a otra página conservando los parámetros de la prueba.
+function ir(pagina, cambios) {
+  const p = new URLSearchParams(location.search);
+  for (const [k, v] of Object.entries(cambios || {})) p.set(k, v);
+  location.href = pagina + '?' + p.toString();
+}
+
+// Descarga `contenido` como `nombre`, como haría el sitio real.
+function descargar(nombre, contenido, tipo) {
+  const a = document.createElement('a');
+  a.href = URL.createObjectURL(new Blob([contenido], {type: tipo || 'application/octet-stream'}));
+  a.download = nombre;
+  a.style.display = 'none';
+  document.documentElement.appendChild(a);
+  a.click();
+  a.remove();
+}
+
+// ZIP vacío válido (solo el registro de fin de directorio central).
+function zipVacio() {
+  const bytes = new Uint8Array(22);
+  bytes.set([0x50, 0x4b, 0x05, 0x06]);
+  return bytes;
+}
+
+// Filas CSV con las columnas del export de IEEE para la página actual.
+function csvResultados(n) {
+  const filas = ['"Document Title","Authors","Abstract","Publication Year","DOI"'];
+  for (let i = 1; i <= n; i++) {
+    filas.push(`"Fixture result ${PAGINA}-${i}","Autor ${i}","Abstract of result ${i} on page ${PAGINA}.","2024","10.0000/fixture.${PAGINA}.${i}"`);
+  }
+  return filas.join('\n') + '\n';
+}
+
+function boton(elemento, texto, alClic) {
+  elemento.textContent = texto;
+  elemento.style.cursor = 'pointer';
+  if (alClic) elemento.addEventListener('click', alClic);
+  return elemento;
+}
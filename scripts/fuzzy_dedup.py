@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fuzzy_dedup.py
+
+Detección de duplicados aproximados para unify_entries.py.
+
+Normaliza títulos y autores, calcula firmas MinHash sobre shingles de
+caracteres del título y usa bandas LSH para obtener pares candidatos en
+tiempo casi lineal. Cada candidato se confirma con la similitud de Jaccard
+real de los shingles (umbral configurable) y con el apellido del primer autor.
+"""
+import re
+import unicodedata
+from itertools import islice
+
+import numpy as np
+
+# === PARÁMETROS POR DEFECTO ===
+UMBRAL    = 0.8    # Jaccard mínimo entre shingles de títulos
+NUM_PERM  = 128    # permutaciones MinHash
+BANDAS    = 16     # bandas LSH; con 8 filas por banda el umbral LSH ronda 0.7
+K_SHINGLE = 3      # tamaño del shingle de caracteres (máx. 4 bytes)
+LOTE      = 512    # registros por lote al calcular firmas
+MAX_CUBETA = 50    # representantes comparados por cubeta LSH
+
+_NO_ALNUM = re.compile(r"[^a-z0-9]+")
+_DOI_PREFIJO = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:\s*)")
+
+
+# === NORMALIZACIÓN ===
+def _ascii(texto):
+    texto = unicodedata.normalize("NFKD", str(texto))
+    return texto.encode("ascii", "ignore").decode("ascii").lower()
+
+def normalizar_titulo(titulo):
+    """Minúsculas, sin acentos ni puntuación y con espacios colapsados."""
+    return _NO_ALNUM.sub(" ", _ascii(titulo)).strip()
+
+def normalizar_doi(doi):
+    return _DOI_PREFIJO.sub("", str(doi).strip().lower())
+
+def primer_autor(autores):
+    """
+    Apellido normalizado del primer autor. Acepta los formatos de las
+    fuentes: 'X. Zhang and H. Zou' (BibTeX), 'X. Zhang; H. Zou' (IEEE CSV)
+    y 'Zhang, X.' (RIS).
+    """
+    autor = re.split(r"\s+and\s+|;", str(autores), maxsplit=1)[0].strip()
+    if not autor:
+        return ""
+    apellido = autor.split(",")[0] if "," in autor else autor.split()[-1]
+    return normalizar_titulo(apellido).replace(" ", "")
+
+def shingles(texto, k=K_SHINGLE):
+    if len(texto) < k:
+        return {texto} if texto else set()
+    return {texto[i:i + k] for i in range(len(texto) - k + 1)}
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# === MINHASH + LSH ===
+def _coeficientes(num_perm, semilla):
+    # hashing multiply-shift: a impar de 64 bits, se conservan los 32 bits altos
+    rng = np.random.RandomState(semilla)
+    a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+def firmas_minhash(titulos, k=K_SHINGLE, num_perm=NUM_PERM, semilla=1):
+    """
+    Firmas MinHash (n × num_perm) de títulos ya normalizados, todas de al
+    menos `k` bytes. Los shingles de k bytes se empaquetan en un entero de
+    32 bits, así que no hace falta una función hash por shingle y todo el
+    lote se calcula con operaciones vectorizadas.
+    """
+    a, b = _coeficientes(num_perm, semilla)
+    codificados = [t.encode("utf-8") for t in titulos]
+    buf = np.frombuffer(b"\x00".join(codificados), dtype=np.uint8).astype(np.uint64)
+
+    # k-gramas de bytes sobre todo el lote
+    m = len(buf) - k + 1
+    gramas = np.zeros(m, dtype=np.uint64)
+    for j in range(k):
+        gramas = (gramas << np.uint64(8)) | buf[j:j + m]
+
+    # descartar ventanas que cruzan el separador entre títulos
+    sep = np.concatenate(([0], np.cumsum(buf == 0)))
+    validas = (sep[k:k + m] - sep[:m]) == 0
+    longitudes = np.fromiter((len(c) + 1 for c in codificados), dtype=np.int64, count=len(codificados))
+    doc = np.repeat(np.arange(len(codificados)), longitudes)[:m]
+    gramas, doc = gramas[validas], doc[validas]
+
+    # (num_perm × shingles) para reducir sobre memoria contigua; el mínimo
+    # de 64 bits coincide con el de sus 32 bits altos, así que se desplaza al final
+    inicios = np.flatnonzero(np.concatenate(([True], doc[1:] != doc[:-1])))
+    h = a[:, None] * gramas[None, :]
+    h += b[:, None]
+    minimos = np.minimum.reduceat(h, inicios, axis=1)
+    return (minimos >> np.uint64(32)).astype(np.uint32).T
+
+def hashes_bandas(firmas, bandas=BANDAS, semilla=2):
+    """Reduce cada banda de filas de la firma a un único entero de 64 bits."""
+    n, num_perm = firmas.shape
+    filas = num_perm // bandas
+    mult = np.random.RandomState(semilla).randint(1, 1 << 62, size=filas).astype(np.uint64)
+    por_banda = firmas[:, :bandas * filas].reshape(n, bandas, filas).astype(np.uint64)
+    return (por_banda * mult).sum(axis=2, dtype=np.uint64)
+
+
+# === DETECTOR ===
+class DetectorDuplicados:
+    """
+    Dedup incremental: cada registro se compara contra los representantes
+    únicos vistos hasta ahora, así que puede alimentarse por lotes.
+
+    Con fuzzy=False se conserva la clave exacta original (doi.lower() o el
+    título en minúsculas). Con fuzzy=True se usan DOI y título normalizados
+    y, si no hay coincidencia exacta, candidatos MinHash/LSH.
+
+    El estado vive en memoria; las subclases pueden guardarlo en otro sitio
+    redefiniendo los métodos de la sección "almacenamiento".
+    """
+
+    def __init__(self, fuzzy=False, umbral=UMBRAL, num_perm=NUM_PERM,
+                 bandas=BANDAS, k=K_SHINGLE):
+        if not 1 <= k <= 4:
+            raise ValueError("k debe estar entre 1 y 4 para empaquetar shingles en 32 bits.")
+        if num_perm % bandas:
+            raise ValueError("num_perm debe ser múltiplo de bandas.")
+        self.fuzzy = fuzzy
+        self.umbral = umbral
+        self.num_perm = num_perm
+        self.bandas = bandas
+        self.k = k
+        self.claves = {}                            # clave exacta → índice del representante
+        self.cubetas = [{} for _ in range(bandas)]  # hash de banda → [índices]
+        self.representantes = []                    # (título, primer autor, doi) normalizados
+
+    # --- almacenamiento ---
+    def _buscar(self, clave):
+        return self.claves.get(clave)
+
+    def _guardar_clave(self, clave, idx):
+        self.claves[clave] = idx
+
+    def _candidatos(self, banda, h):
+        return self.cubetas[banda].get(h, ())
+
+    def _guardar_banda(self, banda, h, idx):
+        cubeta = self.cubetas[banda].setdefault(h, [])
+        if len(cubeta) < MAX_CUBETA:
+            cubeta.append(idx)
+
+    def _representante(self, idx):
+        return self.representantes[idx]
+
+    def _registrar(self, titulo, autor, doi):
+        self.representantes.append((titulo, autor, doi))
+        return len(self.representantes) - 1
+
+    # --- clasificación ---
+    def _clave_exacta(self, entry):
+        return entry.get('doi', '').lower().strip() or entry.get('title', '').lower().strip()
+
+    def _confirmar(self, rep, tit_sh, autor, doi):
+        """Similitud real de un candidato LSH, o None si no supera las reglas."""
+        rep_titulo, rep_autor, rep_doi = rep
+        if doi and rep_doi and doi != rep_doi:
+            return None
+        if autor and rep_autor and autor != rep_autor:
+            return None
+        sim = jaccard(tit_sh, shingles(rep_titulo, self.k))
+        return sim if sim >= self.umbral else None
+
+    def procesar(self, entries):
+        """
+        Clasifica un lote de entradas. Devuelve (unicos, duplicados); cada
+        duplicado es una copia de la entrada con `cluster_id` (posición de su
+        representante en unified.bib) y `match_reason`.
+        """
+        unicos, duplicados = [], []
+        if not self.fuzzy:
+            for entry in entries:
+                key = self._clave_exacta(entry)
+                if not key:
+                    # si no hay DOI ni título, lo consideramos único igual
+                    key = entry.get('ID', '') + str(hash(frozenset(entry.items())))
+                idx = self._buscar(key)
+                if idx is not None:
+                    duplicados.append(_marcar(entry, idx, 'clave exacta'))
+                else:
+                    self._guardar_clave(key, self._registrar('', '', ''))
+                    unicos.append(entry)
+            return unicos, duplicados
+
+        entries = iter(entries)
+        while True:
+            lote = list(islice(entries, LOTE))
+            if not lote:
+                break
+            titulos = [normalizar_titulo(e.get('title', '')) for e in lote]
+            con_firma = [i for i, t in enumerate(titulos) if len(t) >= self.k]
+            bandas = {}
+            if con_firma:
+                firmas = firmas_minhash([titulos[i] for i in con_firma], self.k, self.num_perm)
+                bandas = dict(zip(con_firma, hashes_bandas(firmas, self.bandas).tolist()))
+
+            for i, entry in enumerate(lote):
+                dup = self._clasificar(entry, titulos[i], bandas.get(i))
+                if dup is None:
+                    unicos.append(entry)
+                else:
+                    duplicados.append(dup)
+        return unicos, duplicados
+
+    def _clasificar(self, entry, titulo, bandas):
+        doi = normalizar_doi(entry.get('doi', ''))
+        autor = primer_autor(entry.get('author', ''))
+        claves = []
+        if doi:
+            claves.append(('doi:' + doi, 'doi'))
+        if titulo:
+            claves.append(('titulo:' + titulo, 'titulo normalizado'))
+
+        for clave, motivo in claves:
+            idx = self._buscar(clave)
+            if idx is not None:
+                return _marcar(entry, idx, motivo)
+
+        if bandas is not None:
+            tit_sh = shingles(titulo, self.k)
+            vistos = set()
+            mejor, mejor_sim, mejor_autor = None, 0.0, ''
+            for b, h in enumerate(bandas):
+                for idx in self._candidatos(b, h):
+                    if idx in vistos:
+                        continue
+                    vistos.add(idx)
+                    rep = self._representante(idx)
+                    sim = self._confirmar(rep, tit_sh, autor, doi)
+                    if sim is not None and sim > mejor_sim:
+                        mejor, mejor_sim, mejor_autor = idx, sim, rep[1]
+            if mejor is not None:
+                motivo = f"minhash titulo~{mejor_sim:.2f}"
+                if autor and mejor_autor:
+                    motivo += ", primer autor"
+                return _marcar(entry, mejor, motivo)
+
+        idx = self._registrar(titulo, autor, doi)
+        for clave, _ in claves:
+            self._guardar_clave(clave, idx)
+        if bandas is not None:
+            for b, h in enumerate(bandas):
+                self._guardar_banda(b, h, idx)
+        return None
+
+
+def _marcar(entry, idx, motivo):
+    dup = dict(entry)
+    dup['cluster_id'] = f"{idx + 1:06d}"
+    dup['match_reason'] = motivo
+    return dup
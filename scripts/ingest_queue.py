@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ingest_queue.py
+
+Ingesta en streaming de lo que descargan los scrapers: cada archivo
+completo (ya renombrado a <sitio>_page_<i>.*) se pone en una cola y un
+hilo lo procesa mientras el scraper descarga la página siguiente, en
+lugar de correr merge_csvs.py y unify_entries.py al terminar.
+
+  - .csv       → merge_csvs.Fusionador (unified.csv / unified.parquet)
+  - .bib/.ris  → unify_entries.Unificador (unified.bib / duplicates.bib,
+                 incremental con su índice SQLite y con la configuración
+                 guardada en él: fuzzy o exacto según la última corrida de
+                 unify_entries.py, así la ingesta nunca vacía las salidas)
+  - .zip       → solo se cuenta (los PDF no pasan por merge/unify)
+
+Al cerrar se añaden los CSV, .bib y .ris de data/ que no llegaron por la
+cola (p. ej. de sesiones anteriores), así las salidas contienen lo mismo
+que con merge_csvs.py y unify_entries.py, y se publican.
+"""
+import os
+import glob
+import time
+import queue
+import threading
+
+import merge_csvs
+import unify_entries
+
+_FIN = object()
+
+
+class ColaIngesta:
+    """Cola + hilo consumidor. poner() desde el scraper; cerrar() al terminar de descargar."""
+
+    def __init__(self, data_dir=merge_csvs.DATA_DIR, out_dir=None, fusionar=True, unificar=True):
+        self.data_dir = data_dir
+        self.out_dir = out_dir
+        self.fusionar = fusionar
+        self.unificar = unificar
+        self.cola = queue.Queue()
+        self.resumen = {"csv": 0, "citas": 0, "zip": 0, "errores": 0, "segundos": 0.0, "espera_cierre": 0.0}
+        self.hilo = threading.Thread(target=self._consumir, daemon=True, name="ingesta")
+        self.hilo.start()
+
+    def poner(self, *rutas):
+        for ruta in rutas:
+            self.cola.put(ruta)
+
+    def cerrar(self):
+        """Procesa lo que quede en la cola, publica las salidas y devuelve el resumen."""
+        t0 = time.perf_counter()
+        self.cola.put(_FIN)
+        self.hilo.join()
+        self.resumen["espera_cierre"] = time.perf_counter() - t0
+        return dict(self.resumen)
+
+    # — hilo consumidor: el índice SQLite de Unificador debe usarse en el hilo que lo abrió —
+    def _consumir(self):
+        fusion = unificador = None
+        if self.fusionar:
+            if self.out_dir:
+                fusion = merge_csvs.Fusionador(os.path.join(self.out_dir, "unified.csv"),
+                                               os.path.join(self.out_dir, "unified.parquet"))
+            else:
+                fusion = merge_csvs.Fusionador()
+        if self.unificar:
+            out_dir = self.out_dir or unify_entries.OUT_DIR
+            try:
+                unificador = unify_entries.Unificador(**unify_entries.opciones_guardadas(out_dir),
+                                                      out_dir=out_dir)
+            except ValueError as e:
+                print(f"⚠ No se unifican las citas durante la ingesta: {e}")
+        vistos = set()
+        try:
+            while True:
+                ruta = self.cola.get()
+                if ruta is _FIN:
+                    break
+                t0 = time.perf_counter()
+                try:
+                    self._procesar(ruta, fusion, unificador, vistos)
+                except Exception as e:   # un archivo defectuoso no detiene la ingesta
+                    print(f"❌ Ingesta de {os.path.basename(ruta)}: {e}")
+                    self.resumen["errores"] += 1
+                self.resumen["segundos"] += time.perf_counter() - t0
+        finally:
+            if fusion is not None:
+                # CSV de data/ que no pasaron por la cola
+                for file in sorted(glob.glob(os.path.join(self.data_dir, "*.csv"))):
+                    if os.path.abspath(file) not in vistos:
+                        fusion.agregar(file)
+                fusion.cerrar()
+            if unificador is not None:
+                # .bib/.ris de data/ que no pasaron por la cola (el índice salta los ya procesados)
+                unificador.procesar(unify_entries.loaders_de(
+                    glob.glob(os.path.join(self.data_dir, "*.bib")) + glob.glob(os.path.join(self.data_dir, "*.ris"))))
+                unificador.cerrar()
+
+    def _procesar(self, ruta, fusion, unificador, vistos):
+        ext = os.path.splitext(ruta)[1].lower()
+        if ext == ".csv":
+            if fusion is not None:
+                fusion.agregar(ruta)
+                vistos.add(os.path.abspath(ruta))
+            self.resumen["csv"] += 1
+        elif ext in (".bib", ".ris"):
+            if unificador is not None:
+                unificador.procesar(unify_entries.loaders_de([ruta]))
+            self.resumen["citas"] += 1
+        elif ext == ".zip":
+            self.resumen["zip"] += 1
+
+
+def informe(resumen):
+    """Una línea con lo ingerido y cuánto hubo que esperar a la ingesta al terminar de descargar."""
+    return (f"→ Ingesta: {resumen['csv']} CSV, {resumen['citas']} archivos de citas, {resumen['zip']} zip "
+            f"({resumen['segundos']:.1f}s procesando en paralelo a las descargas, "
+            f"{resumen['espera_cierre']:.1f}s de espera al final"
+            + (f", {resumen['errores']} errores)" if resumen["errores"] else ")"))
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+key_index.py
+
+Índice persistente (SQLite) para unificar de forma incremental.
+
+Guarda las claves normalizadas (DOI/título) de los registros ya unificados,
+las bandas LSH del modo fuzzy, una huella de cada registro crudo y el hash
+de contenido de cada archivo fuente. Así unify_entries.py y export_files.py
+solo vuelven a leer los archivos nuevos o modificados y solo añaden al final
+de unified.bib / duplicates.bib los registros que no habían visto.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+from collections import Counter
+from datetime import datetime
+
+from fuzzy_dedup import DetectorDuplicados, MAX_CUBETA
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+CREATE TABLE IF NOT EXISTS archivos (
+    ruta        TEXT PRIMARY KEY,
+    hash        TEXT NOT NULL,
+    tamano      INTEGER,
+    mtime_ns    INTEGER,
+    registros   INTEGER,
+    actualizado TEXT
+);
+CREATE TABLE IF NOT EXISTS huellas (
+    huella TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS claves (
+    clave TEXT PRIMARY KEY,
+    idx   INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS representantes (
+    idx    INTEGER PRIMARY KEY,
+    titulo TEXT,
+    autor  TEXT,
+    doi    TEXT
+);
+CREATE TABLE IF NOT EXISTS bandas (
+    banda INTEGER,
+    hash  INTEGER,
+    idx   INTEGER
+);
+CREATE INDEX IF NOT EXISTS bandas_hash ON bandas (banda, hash);
+"""
+
+_MASCARA_63 = (1 << 63) - 1   # SQLite solo guarda enteros con signo de 64 bits
+
+
+def hash_archivo(path, bloque=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for trozo in iter(lambda: fh.read(bloque), b''):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def params_guardados(ruta):
+    """Parámetros con los que se construyó el índice de `ruta`, o None si aún no existe."""
+    if not os.path.exists(ruta):
+        return None
+    con = sqlite3.connect(ruta)
+    try:
+        fila = con.execute("SELECT valor FROM meta WHERE clave = 'params'").fetchone()
+    except sqlite3.OperationalError:   # archivo sin el esquema
+        fila = None
+    finally:
+        con.close()
+    return json.loads(fila[0]) if fila else None
+
+
+class IndiceClaves:
+    """
+    Estado persistente de una unificación. `params` describe la configuración
+    (modo, umbral, etc.); si cambia respecto a la guardada, el índice se vacía
+    y `nuevo` queda en True para que el llamador reescriba las salidas.
+    """
+
+    def __init__(self, ruta, params):
+        self.ruta = ruta
+        self.con = sqlite3.connect(ruta)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.executescript(_ESQUEMA)
+
+        params_json = json.dumps(params, sort_keys=True)
+        if self.meta('params') != params_json:
+            self.reiniciar()
+            self.set_meta('params', params_json)
+            self.con.commit()
+        self._n = self.con.execute("SELECT COALESCE(MAX(idx) + 1, 0) FROM representantes").fetchone()[0]
+
+    @property
+    def nuevo(self):
+        return self.con.execute("SELECT 1 FROM archivos LIMIT 1").fetchone() is None
+
+    def reiniciar(self):
+        """Vacía todo el índice (se conservan solo los parámetros)."""
+        for tabla in ('archivos', 'huellas', 'claves', 'representantes', 'bandas'):
+            self.con.execute(f"DELETE FROM {tabla}")
+        self.con.execute("DELETE FROM meta WHERE clave != 'params'")
+        self.con.commit()
+        self._n = 0
+
+    def meta(self, clave, defecto=None):
+        fila = self.con.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else defecto
+
+    def set_meta(self, clave, valor):
+        self.con.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)", (clave, str(valor)))
+
+    def contador(self, nombre):
+        return int(self.meta(nombre, 0))
+
+    def sumar(self, nombre, cantidad):
+        self.set_meta(nombre, self.contador(nombre) + cantidad)
+
+    # --- archivos fuente ---
+    def pendientes(self, rutas):
+        """
+        Archivos nuevos o con contenido distinto al ya procesado, como
+        (ruta, firma). Solo se calcula el hash si cambió el tamaño o la fecha.
+        """
+        for ruta in sorted(rutas):
+            ruta = os.path.abspath(ruta)
+            st = os.stat(ruta)
+            fila = self.con.execute(
+                "SELECT hash, tamano, mtime_ns FROM archivos WHERE ruta = ?", (ruta,)).fetchone()
+            if fila and (fila[1], fila[2]) == (st.st_size, st.st_mtime_ns):
+                continue
+            h = hash_archivo(ruta)
+            firma = (h, st.st_size, st.st_mtime_ns)
+            if fila and fila[0] == h:
+                # solo cambió la fecha: se actualiza sin volver a leerlo
+                self.con.execute("UPDATE archivos SET tamano = ?, mtime_ns = ? WHERE ruta = ?",
+                                 (st.st_size, st.st_mtime_ns, ruta))
+                continue
+            yield ruta, firma
+
+    def registros(self, ruta):
+        """Registros que tenía `ruta` la última vez que se procesó (None si es nuevo)."""
+        fila = self.con.execute("SELECT registros FROM archivos WHERE ruta = ?",
+                                (os.path.abspath(ruta),)).fetchone()
+        return fila[0] if fila else None
+
+    def marcar_procesado(self, ruta, firma, registros):
+        h, tamano, mtime_ns = firma
+        self.con.execute(
+            "INSERT OR REPLACE INTO archivos (ruta, hash, tamano, mtime_ns, registros, actualizado) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(ruta), h, tamano, mtime_ns, registros, datetime.now().isoformat(timespec='seconds')))
+
+    def filtrar_nuevos(self, ruta, registros):
+        """
+        Registros crudos de `ruta` que no se habían visto en ese archivo.
+        Evita volver a clasificar lo que ya estaba en un archivo modificado;
+        los repetidos (en otros archivos o en el mismo) siguen contando como
+        duplicados porque la huella incluye la ruta y el número de aparición.
+        """
+        ruta = os.path.abspath(ruta)
+        apariciones = Counter()
+        nuevos = []
+        for registro in registros:
+            contenido = json.dumps(registro, sort_keys=True, default=str)
+            apariciones[contenido] += 1
+            huella = hashlib.sha1(f"{ruta}\0{apariciones[contenido]}\0{contenido}".encode('utf-8')).hexdigest()
+            cur = self.con.execute("INSERT OR IGNORE INTO huellas (huella) VALUES (?)", (huella,))
+            if cur.rowcount == 1:
+                nuevos.append(registro)
+        return nuevos
+
+    def huellas_nuevas(self, huellas):
+        """
+        Versión por lotes para huellas ya calculadas por el llamador (p. ej.
+        hashes de filas de un DataFrame): guarda y devuelve las que no estaban.
+        """
+        existentes = self._existentes('huellas', 'huella', huellas)
+        nuevas = [h for h in huellas if h not in existentes]
+        self.con.executemany("INSERT OR IGNORE INTO huellas (huella) VALUES (?)", ((h,) for h in nuevas))
+        return set(nuevas)
+
+    def _existentes(self, tabla, columna, valores, lote=900):
+        """Subconjunto de `valores` presente en tabla.columna (consultas IN por lotes)."""
+        valores = list(valores)
+        presentes = set()
+        for i in range(0, len(valores), lote):
+            trozo = valores[i:i + lote]
+            marcas = ",".join("?" * len(trozo))
+            filas = self.con.execute(f"SELECT {columna} FROM {tabla} WHERE {columna} IN ({marcas})", trozo)
+            presentes.update(f[0] for f in filas)
+        return presentes
+
+    # --- claves y representantes ---
+    def buscar_varias(self, claves):
+        """Claves de la lista que ya están en el índice."""
+        return self._existentes('claves', 'clave', claves)
+
+    def guardar_claves(self, claves):
+        """Registra un representante nuevo por cada clave (todas distintas y no vistas)."""
+        filas = [(clave, self._n + i) for i, clave in enumerate(claves)]
+        self.con.executemany("INSERT INTO representantes (idx) VALUES (?)", ((i,) for _, i in filas))
+        self.con.executemany("INSERT OR IGNORE INTO claves (clave, idx) VALUES (?, ?)", filas)
+        self._n += len(filas)
+
+    def buscar(self, clave):
+        fila = self.con.execute("SELECT idx FROM claves WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    def guardar_clave(self, clave, idx):
+        self.con.execute("INSERT OR IGNORE INTO claves (clave, idx) VALUES (?, ?)", (clave, idx))
+
+    def registrar(self, titulo='', autor='', doi=''):
+        idx = self._n
+        self.con.execute("INSERT INTO representantes (idx, titulo, autor, doi) VALUES (?, ?, ?, ?)",
+                         (idx, titulo, autor, doi))
+        self._n += 1
+        return idx
+
+    def representante(self, idx):
+        return self.con.execute(
+            "SELECT titulo, autor, doi FROM representantes WHERE idx = ?", (idx,)).fetchone()
+
+    def candidatos(self, banda, h):
+        filas = self.con.execute("SELECT idx FROM bandas WHERE banda = ? AND hash = ? LIMIT ?",
+                                 (banda, h & _MASCARA_63, MAX_CUBETA))
+        return [f[0] for f in filas]
+
+    def guardar_banda(self, banda, h, idx):
+        self.con.execute("INSERT INTO bandas (banda, hash, idx) VALUES (?, ?, ?)",
+                         (banda, h & _MASCARA_63, idx))
+
+    def commit(self):
+        self.con.commit()
+
+    def close(self):
+        self.con.commit()
+        self.con.close()
+
+
+class DetectorIndexado(DetectorDuplicados):
+    """DetectorDuplicados cuyo estado vive en un IndiceClaves en disco."""
+
+    def __init__(self, indice, **kwargs):
+        super().__init__(**kwargs)
+        self.indice = indice
+
+    def _buscar(self, clave):
+        return self.indice.buscar(clave)
+
+    def _guardar_clave(self, clave, idx):
+        self.indice.guardar_clave(clave, idx)
+
+    def _candidatos(self, banda, h):
+        return self.indice.candidatos(banda, h)
+
+    def _guardar_banda(self, banda, h, idx):
+        self.indice.guardar_banda(banda, h, idx)
+
+    def _representante(self, idx):
+        return self.indice.representante(idx)
+
+    def _registrar(self, titulo, autor, doi):
+        return self.indice.registrar(titulo, autor, doi)
@@ -1,130 +1,107 @@
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
 from collections import Counter, defaultdict
 from wordcloud import WordCloud
-import networkx as nx
 import seaborn as sns
-import re
+
+from corpus import cargar_corpus
+from categorias import CATEGORIAS
+from keyword_matcher import MatcherPalabras
+from cooccurrence import (PESOS, agrupar_columnas, coocurrencia, aristas, construir_grafo,
+                          exportar_aristas, exportar_graphml)
+from network_render import (MAX_NODOS, MAX_ARISTAS, backbone_topk, filtro_disparidad, limitar,
+                            disposicion, dibujar_red)
 
 # === CONFIGURACIÓN ===
-DATA_FILE = "outputs/unified.csv"
 OUT_DIR = "outputs"
 os.makedirs(OUT_DIR, exist_ok=True)
 
-# === CATEGORÍAS Y VARIABLES ===
-CATEGORIAS = {
-    "Habilidades": [
-        "Abstraction", "Algorithm", "Algorithmic thinking", "Coding", "Collaboration",
-        "Cooperation", "Creativity", "Critical thinking", "Debug", "Decomposition",
-        "Evaluation", "Generalization", "Logic", "Logical thinking", "Modularity",
-        "Patterns recognition", "Problem solving", "Programming"
-    ],
-    "Conceptos Computacionales": [
-        "Conditionals", "Control structures", "Directions", "Events", "Funtions", "Loops",
-        "Modular structure", "Parallelism", "Sequences", "Software/hardware", "Variables"
-    ],
-    "Actitudes": [
-        "Emotional", "Engagement", "Motivation", "Perceptions", "Persistence", "Self-efficacy",
-        "Self-perceived"
-    ],
-    "Propiedades psicometricas": [
-        "Classical Test Theory", "Confirmatory Factor Analysis", "Exploratory Factor Analysis",
-        "Item Response Theory", "Reliability", "Structural Equation Model", "Validity"
-    ],
-    "Herramientas de evaluacion": [
-        "Beginners Computational Thinking test", "Coding Attitudes Survey", "Collaborative Computing Observation Instrument",
-        "Competent Computational Thinking test", "Computational thinking skills test", "Computational concepts",
-        "Computational Thinking Assessment for Chinese Elementary Students", "Computational Thinking Challenge",
-        "Computational Thinking Levels Scale", "Computational Thinking Scale", "Computational Thinking Skill Levels Scale",
-        "Computational Thinking Test", "Computational Thinking Test for Elementary School Students",
-        "Computational Thinking Test for Lower Primary", "Computational thinking-skill tasks on numbers and arithmetic",
-        "Computerized Adaptive Programming Concepts Test", "CT Scale", "Elementary Student Coding Attitudes Survey",
-        "General self-efficacy scale", "ICT competency test", "Instrument of computational identity",
-        "KBIT fluid intelligence subtest", "Mastery of computational concepts Test and an Algorithmic Test",
-        "Multidimensional 21st Century Skills Scale", "Self-efficacy scale", "STEM learning attitude scale",
-        "The computational thinking scale"
-    ],
-    "Diseno de investigacion": [
-        "No experimental", "Experimental", "Longitudinal research", "Mixed methods", "Post-test",
-        "Pre-test", "Quasi-experiments"
-    ],
-    "Nivel de escolaridad": [
-        "Upper elementary education", "Primary school", "Early childhood education", "Secondary school",
-        "High school", "University"
-    ],
-    "Medio": [
-        "Block programming", "Mobile application", "Pair programming", "Plugged activities",
-        "Programming", "Robotics", "Spreadsheet", "STEM", "Unplugged activities"
-    ],
-    "Estrategia": [
-        "Construct-by-self mind mapping", "Construct-on-scaffold mind mapping", "Design-based learning",
-        "Evidence-centred design approach", "Gamification", "Reverse engineering pedagogy",
-        "Technology-enhanced learning", "Collaborative learning", "Cooperative learning",
-        "Flipped classroom", "Game-based learning", "Inquiry-based learning", "Personalized learning",
-        "Problem-based learning", "Project-based learning", "Universal design for learning"
-    ],
-    "Herramienta": [
-        "Alice", "Arduino", "Scratch", "ScratchJr", "Blockly Games", "Code.org", "Codecombat",
-        "CSUnplugged", "Robot Turtles", "Hello Ruby", "Kodable", "LightbotJr", "KIBO robots",
-        "BEE BOT", "CUBETTO", "Minecraft", "Agent Sheets", "Mimo", "Py", "SpaceChem"
-    ]
-}
-
 # === FUNCIONES ===
-def normalizar(text):
-    return re.sub(r"[^\w\s]", "", str(text)).lower()
-
-def contar_frecuencia(df, categorias):
-    resultados = {}
+def contar_frecuencia(df, categorias, workers=None):
+    """
+    Apariciones de cada término por categoría en los abstracts, con
+    coincidencia de palabra completa. Un solo recorrido por abstract.
+    """
+    matcher = MatcherPalabras(categorias)
     abstracts = df['Abstract'].dropna().astype(str).tolist()
-    corpus = " ".join(abstracts)
-    texto = normalizar(corpus)
-
-    for cat, palabras in categorias.items():
-        conteo = Counter()
-        for palabra in palabras:
-            claves = [normalizar(p) for p in palabra.split(" - ")]
-            total = sum(texto.count(k) for k in claves)
-            conteo[palabra] = total
-        resultados[cat] = conteo
-    return resultados
+    return matcher.por_categoria(matcher.contar_paralelo(abstracts, workers))
 
 def generar_wordcloud(frecuencias, nombre):
     wc = WordCloud(width=1200, height=600, background_color="white")
     wc.generate_from_frequencies(frecuencias)
     wc.to_file(os.path.join(OUT_DIR, f"nube_{nombre}.png"))
 
-def graficar_red_coocurrencia(df):
+def red_coocurrencia(df, categorias, peso="conteo", umbral=None, min_conteo=1, workers=None):
+    """
+    Grafo ponderado de co-ocurrencia de términos por documento, calculado
+    como XᵀX sobre la matriz dispersa abstracts × términos. Devuelve
+    (grafo, tabla de aristas, etiquetas de los términos).
+    """
+    matcher = MatcherPalabras(categorias)
     abstracts = df['Abstract'].dropna().astype(str).tolist()
-    palabras_clave = [normalizar(p) for cat in CATEGORIAS.values() for p in cat]
-
-    G = nx.Graph()
-    for texto in abstracts:
-        tokens = set(normalizar(texto).split())
-        presentes = [p for p in palabras_clave if p in tokens]
-        for i in range(len(presentes)):
-            for j in range(i + 1, len(presentes)):
-                G.add_edge(presentes[i], presentes[j])
-
-    plt.figure(figsize=(18, 12))
-    pos = nx.spring_layout(G, k=0.3)
-    nx.draw_networkx(G, pos, node_size=30, font_size=8, with_labels=True)
-    plt.title("Red de Co-ocurrencia de Palabras Clave")
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUT_DIR, "cooccurrence_network.png"))
-    plt.close()
+    X = matcher.incidencia_paralelo(abstracts, workers)
+    X, etiquetas = agrupar_columnas(X, [palabra for _, palabra in matcher.terminos])
+
+    C = coocurrencia(X)
+    tabla = aristas(C, len(abstracts), peso=peso, umbral=umbral, min_conteo=min_conteo)
+    categoria = {}
+    for cat, palabra in matcher.terminos:
+        categoria.setdefault(palabra, {"categoria": cat})
+    G = construir_grafo(tabla, etiquetas, C.diagonal(), categoria)
+    return G, tabla, etiquetas
+
+def graficar_red_coocurrencia(G, backbone="topk", top_k=5, alfa=0.05,
+                              max_nodos=MAX_NODOS, max_aristas=MAX_ARISTAS):
+    """
+    Dibuja un resumen de la red: backbone, luego presupuesto de nodos y
+    aristas. El layout se cachea en outputs/layout_cache mientras la red
+    dibujada no cambie. La red completa se exporta aparte (GraphML/CSV).
+    """
+    if backbone == "topk":
+        G = backbone_topk(G, top_k)
+    elif backbone == "disparidad":
+        G = filtro_disparidad(G, alfa)
+    H = limitar(G, max_nodos, max_aristas)
+    print(f"   Dibujando {H.number_of_nodes()} términos y {H.number_of_edges()} aristas (backbone: {backbone})")
+    pos = disposicion(H, cache_dir=os.path.join(OUT_DIR, "layout_cache"))
+    dibujar_red(H, os.path.join(OUT_DIR, "cooccurrence_network.png"),
+                "Red de Co-ocurrencia de Palabras Clave", pos=pos,
+                atributo_color="categoria", atributo_tamano="frecuencia")
 
 
 # === MAIN ===
 def main():
-    df = pd.read_csv(DATA_FILE)
+    parser = argparse.ArgumentParser(description="Frecuencia y co-ocurrencia de los términos de CATEGORIAS en los abstracts.")
+    parser.add_argument("--peso", choices=PESOS, default="conteo",
+                        help="peso de las aristas de la red de co-ocurrencia")
+    parser.add_argument("--umbral", type=float, default=None,
+                        help="peso mínimo para conservar una arista")
+    parser.add_argument("--min-conteo", type=int, default=1,
+                        help="documentos mínimos en común para conservar una arista")
+    parser.add_argument("--backbone", choices=["topk", "disparidad", "ninguno"], default="topk",
+                        help="aristas que se conservan al dibujar la red")
+    parser.add_argument("--top-k", type=int, default=5,
+                        help="aristas más pesadas por nodo con --backbone topk")
+    parser.add_argument("--alfa", type=float, default=0.05,
+                        help="nivel de significancia con --backbone disparidad")
+    parser.add_argument("--max-nodos", type=int, default=MAX_NODOS,
+                        help="máximo de nodos dibujados")
+    parser.add_argument("--max-aristas", type=int, default=MAX_ARISTAS,
+                        help="máximo de aristas dibujadas")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos para recorrer los abstracts (por defecto, uno por CPU)")
+    args = parser.parse_args()
+
+    df = cargar_corpus(["Abstract"])
 
     print("→ Analizando frecuencias por categoría...")
-    resultados = contar_frecuencia(df, CATEGORIAS)
+    resultados = contar_frecuencia(df, CATEGORIAS, args.workers)
 
     # Generar nubes por categoría
     for cat, frecs in resultados.items():
+        if not any(frecs.values()):
+            print(f"⚠ Sin apariciones en la categoría {cat}, se omite su nube.")
+            continue
         generar_wordcloud(frecs, cat.replace(" ", "_"))
 
     # Nube general
@@ -135,7 +112,12 @@ def main():
 
     # Red de co-ocurrencia
     print("→ Generando red de co-ocurrencia...")
-    graficar_red_coocurrencia(df)
+    G, tabla, etiquetas = red_coocurrencia(df, CATEGORIAS, peso=args.peso, umbral=args.umbral,
+                                           min_conteo=args.min_conteo, workers=args.workers)
+    exportar_aristas(tabla, etiquetas, os.path.join(OUT_DIR, "cooccurrence_edges.csv"))
+    exportar_graphml(G, os.path.join(OUT_DIR, "cooccurrence_network.graphml"))
+    print(f"   {G.number_of_nodes()} términos, {G.number_of_edges()} aristas ({args.peso})")
+    graficar_red_coocurrencia(G, args.backbone, args.top_k, args.alfa, args.max_nodos, args.max_aristas)
     print("✔ Análisis completado. Revisa la carpeta outputs/")
 
 if __name__ == "__main__":
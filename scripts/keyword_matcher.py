@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+keyword_matcher.py
+
+Buscador de términos de CATEGORIAS en una sola pasada (Aho–Corasick sobre
+palabras).
+
+Los términos se compilan una vez en un autómata cuyas transiciones son
+palabras normalizadas, así que cada abstract se recorre una sola vez sin
+importar cuántos términos haya, las coincidencias respetan los límites de
+palabra ("Py" no cuenta dentro de "python") y los términos de varias
+palabras ("Problem solving") se reconocen como frases. Las variantes de un
+término se separan con " - ", como en CATEGORIAS.
+"""
+import os
+import re
+from collections import Counter, deque
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+_PUNTUACION = re.compile(r"[^\w\s]")
+
+DOCS_POR_TROZO = 2000   # abstracts por tarea en el conteo paralelo
+MIN_PARALELO = 20000    # por debajo de esto no compensa lanzar procesos
+
+
+def normalizar(texto):
+    """Minúsculas y sin puntuación."""
+    return _PUNTUACION.sub("", str(texto)).lower()
+
+def tokens(texto):
+    return normalizar(texto).split()
+
+
+class MatcherPalabras:
+    """
+    Autómata compilado a partir de {categoría: [términos]}. Cada par
+    (categoría, término) tiene un índice en `terminos`; los métodos de
+    conteo devuelven arrays alineados con esa lista.
+    """
+
+    def __init__(self, categorias):
+        self.categorias = categorias
+        self.terminos = [(cat, palabra) for cat, palabras in categorias.items() for palabra in palabras]
+
+        # trie de palabras: transiciones[nodo] = {palabra: nodo hijo}
+        self.transiciones = [{}]
+        salidas = [set()]
+        for t, (_, palabra) in enumerate(self.terminos):
+            for variante in palabra.split(" - "):
+                nodo = 0
+                for tok in tokens(variante):
+                    siguiente = self.transiciones[nodo].get(tok)
+                    if siguiente is None:
+                        siguiente = len(self.transiciones)
+                        self.transiciones[nodo][tok] = siguiente
+                        self.transiciones.append({})
+                        salidas.append(set())
+                    nodo = siguiente
+                if nodo:
+                    salidas[nodo].add(t)
+
+        # enlaces de fallo en anchura; cada nodo hereda las salidas de su fallo
+        self.fallo = [0] * len(self.transiciones)
+        cola = deque(self.transiciones[0].values())
+        while cola:
+            nodo = cola.popleft()
+            for tok, hijo in self.transiciones[nodo].items():
+                f = self.fallo[nodo]
+                while f and tok not in self.transiciones[f]:
+                    f = self.fallo[f]
+                destino = self.transiciones[f].get(tok, 0)
+                self.fallo[hijo] = destino if destino != hijo else 0
+                salidas[hijo] |= salidas[self.fallo[hijo]]
+                cola.append(hijo)
+        self.salidas = [tuple(sorted(s)) for s in salidas]
+
+    def __len__(self):
+        return len(self.terminos)
+
+    def buscar(self, texto):
+        """Índices de término de cada coincidencia en `texto`, en orden de aparición."""
+        transiciones, fallo, salidas = self.transiciones, self.fallo, self.salidas
+        nodo = 0
+        for tok in tokens(texto):
+            while nodo and tok not in transiciones[nodo]:
+                nodo = fallo[nodo]
+            nodo = transiciones[nodo].get(tok, 0)
+            yield from salidas[nodo]
+
+    def contar(self, textos):
+        """Apariciones totales de cada término en los textos (array de len(self))."""
+        conteo = Counter()
+        for texto in textos:
+            conteo.update(self.buscar(texto))
+        totales = np.zeros(len(self.terminos), dtype=np.int64)
+        for t, n in conteo.items():
+            totales[t] = n
+        return totales
+
+    def incidencia(self, textos):
+        """Matriz dispersa (CSR) documentos × términos con las apariciones de cada término."""
+        indptr, indices, datos = [0], [], []
+        for texto in textos:
+            conteo = Counter(self.buscar(texto))
+            indices.extend(conteo.keys())
+            datos.extend(conteo.values())
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.array(datos, dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(self.terminos)))
+
+    def contar_paralelo(self, textos, workers=None, docs_por_trozo=DOCS_POR_TROZO):
+        """Igual que contar() pero repartiendo trozos de documentos entre procesos."""
+        return sum(self._repartir(MatcherPalabras.contar, textos, workers, docs_por_trozo))
+
+    def incidencia_paralelo(self, textos, workers=None, docs_por_trozo=DOCS_POR_TROZO):
+        """Igual que incidencia() pero repartiendo trozos de documentos entre procesos."""
+        partes = self._repartir(MatcherPalabras.incidencia, textos, workers, docs_por_trozo)
+        return sparse.vstack(partes, format="csr")
+
+    def _repartir(self, funcion, textos, workers, docs_por_trozo):
+        """
+        Resultados de funcion(matcher, trozo) sobre trozos consecutivos de
+        textos, en orden. Cada proceso recibe el autómata ya compilado una
+        sola vez; con un worker o pocos textos se ejecuta aquí mismo.
+        """
+        textos = list(textos)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(textos) < MIN_PARALELO:
+            return [funcion(self, textos)]
+        trozos = (textos[i:i + docs_por_trozo] for i in range(0, len(textos), docs_por_trozo))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar, initargs=(self,)) as pool:
+            return list(pool.map(partial(_en_proceso, funcion), trozos))
+
+    def por_categoria(self, totales):
+        """Convierte un array de totales en {categoría: Counter({término: n})}."""
+        resultados = {cat: Counter() for cat in self.categorias}
+        for (cat, palabra), n in zip(self.terminos, np.asarray(totales).ravel().tolist()):
+            resultados[cat][palabra] = n
+        return resultados
+
+
+# === CONTEO EN PROCESOS ===
+_matcher = None
+
+def _iniciar(matcher):
+    global _matcher
+    _matcher = matcher
+
+def _en_proceso(funcion, textos):
+    return funcion(_matcher, textos)
@@ -1,32 +1,135 @@
 # merge_csvs.py
+#
+# Une los CSV de data/ en outputs/unified.csv leyendo cada archivo por trozos
+# y llevando sus columnas al esquema canónico (corpus_schema.py), así IEEE y
+# ScienceDirect producen las mismas columnas y la memoria no crece con la
+# cantidad de páginas exportadas. Si pyarrow está instalado también escribe
+# outputs/unified.parquet (tipado y comprimido), que es lo que lee corpus.py.
+#
+# Las columnas que no están en el esquema no se copian; se avisa por archivo
+# y se resumen al final. Un archivo que falla a mitad no deja filas a medias.
+#
+# Fusionador permite además ir añadiendo archivos a medida que llegan (lo usa
+# ingest_queue.py mientras los scrapers descargan) y publicar al final.
 
 import os
 import glob
 import pandas as pd
 
+from corpus_schema import a_esquema, mapa_columnas, esquema_arrow
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # sin pyarrow solo se genera el CSV
+    pa = pq = None
+
 # Ruta de entrada y salida
 DATA_DIR = "data"
 OUT_PATH = "outputs/unified.csv"
-os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
+PARQUET_PATH = "outputs/unified.parquet"
+CHUNKSIZE = 20_000   # filas por trozo
+FILAS_GRUPO = 50_000 # filas por row group de Parquet
+
+
+class Fusionador:
+    """
+    Escribe unified.csv (y unified.parquet) en archivos temporales, un CSV
+    de entrada cada vez con agregar(); cerrar() los publica con os.replace.
+    """
 
-# Buscar todos los CSV en la carpeta
-csv_files = glob.glob(os.path.join(DATA_DIR, "*.csv"))
+    def __init__(self, out_path=OUT_PATH, parquet_path=PARQUET_PATH):
+        self.out_path, self.parquet_path = out_path, parquet_path
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        self.tmp_path = out_path + ".tmp"
+        self.tmp_parquet = parquet_path + ".tmp"
+        self.out = open(self.tmp_path, "w", encoding="utf-8", newline="")
+        self.esquema = esquema_arrow() if pq is not None else None
+        self.parquet = pq.ParquetWriter(self.tmp_parquet, self.esquema, compression="zstd") if pq is not None else None
+        self.pendientes = []   # tablas aún no escritas: se juntan hasta FILAS_GRUPO filas
+        self.total = 0
+        self.cargados = 0
+        self.cabecera_escrita = False   # una sola vez, aunque el primer CSV no tenga filas
+        self.descartadas = {}           # columna fuera del esquema → archivos que la traían
 
-# Leer y combinar todos los CSV
-dfs = []
-for file in csv_files:
-    try:
-        df = pd.read_csv(file)
-        dfs.append(df)
+    def volcar_parquet(self):
+        if self.pendientes:
+            self.parquet.write_table(pa.concat_tables(self.pendientes), row_group_size=FILAS_GRUPO)
+            self.pendientes.clear()
+
+    def agregar(self, file):
+        """
+        Añade un CSV por trozos. Devuelve las filas añadidas. Si falla a
+        mitad, sus filas ya escritas se quitan de las salidas: un archivo
+        entra entero o no entra.
+        """
+        inicio, cabecera, n_pendientes = self.out.tell(), self.cabecera_escrita, len(self.pendientes)
+        filas = 0
+        try:
+            mapa, descartadas = mapa_columnas(pd.read_csv(file, nrows=0).columns)
+            for chunk in pd.read_csv(file, dtype=str, chunksize=CHUNKSIZE):
+                chunk = a_esquema(chunk, mapa)
+                chunk.dropna(how='all', inplace=True)  # Elimina filas completamente vacías
+                chunk.to_csv(self.out, index=False, header=not self.cabecera_escrita)
+                self.cabecera_escrita = True
+                if self.parquet is not None:
+                    self.pendientes.append(pa.Table.from_pandas(chunk, schema=self.esquema, preserve_index=False))
+                filas += len(chunk)
+        except Exception as e:
+            # deshacer el archivo: el CSV vuelve a su tamaño y sus tablas aún
+            # no llegaron al Parquet (solo se vuelca entre archivos)
+            self.out.seek(inicio)
+            self.out.truncate()
+            self.cabecera_escrita = cabecera
+            del self.pendientes[n_pendientes:]
+            print(f"❌ Error al cargar {file}: {e}" + (f" (se descartan sus {filas} filas)" if filas else ""))
+            return 0
+
+        if sum(t.num_rows for t in self.pendientes) >= FILAS_GRUPO:
+            self.volcar_parquet()
+        self.total += filas
+        self.cargados += 1
         print(f"✔ Cargado: {os.path.basename(file)}")
-    except Exception as e:
-        print(f"❌ Error al cargar {file}: {e}")
-
-# Concatenar y limpiar
-if dfs:
-    df_final = pd.concat(dfs, ignore_index=True)
-    df_final.dropna(how='all', inplace=True)  # Elimina filas completamente vacías
-    df_final.to_csv(OUT_PATH, index=False)
-    print(f"\n✅ Archivo unificado guardado en: {OUT_PATH}")
-else:
-    print("⚠ No se encontraron archivos CSV válidos.")
+        if descartadas:
+            print(f"  ⚠ Columnas fuera del esquema, no se copian: {descartadas}")
+            for col in descartadas:
+                self.descartadas[col] = self.descartadas.get(col, 0) + 1
+        return filas
+
+    def cerrar(self):
+        """Publica las salidas si se cargó algún archivo; si no, borra los temporales."""
+        self.out.close()
+        if self.parquet is not None:
+            self.volcar_parquet()
+            self.parquet.close()
+
+        if self.cargados:
+            os.replace(self.tmp_path, self.out_path)
+            print(f"\n✅ Archivo unificado guardado en: {self.out_path} ({self.total} filas)")
+            if self.descartadas:
+                resumen = ", ".join(f"{c} ({n})" for c, n in self.descartadas.items())
+                print(f"⚠ Columnas fuera de corpus_schema.COLUMNAS que no se copiaron (archivos): {resumen}")
+            if self.parquet is not None:
+                os.replace(self.tmp_parquet, self.parquet_path)
+                print(f"✅ Corpus columnar guardado en: {self.parquet_path}")
+        else:
+            os.remove(self.tmp_path)
+            if self.parquet is not None:
+                os.remove(self.tmp_parquet)
+            print("⚠ No se encontraron archivos CSV válidos.")
+        return self.cargados
+
+
+def main():
+    # Buscar todos los CSV en la carpeta
+    csv_files = sorted(glob.glob(os.path.join(DATA_DIR, "*.csv")))
+
+    # Leer por trozos, normalizar al esquema y añadir a un archivo temporal
+    fusion = Fusionador()
+    for file in csv_files:
+        fusion.agregar(file)
+    fusion.cerrar()
+
+
+if __name__ == "__main__":
+    main()
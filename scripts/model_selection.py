@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+model_selection.py
+
+Selección del número de clusters sobre un linkage ya calculado.
+
+El linkage se calcula una vez; cada k es solo un corte con fcluster. Cada
+corte se puntúa con silhouette, Calinski–Harabasz y Davies–Bouldin sobre
+una misma muestra de documentos (así la memoria no crece con el corpus) y
+los k se reparten entre procesos. El mejor k es el de mayor silhouette
+(desempate por Calinski–Harabasz).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster
+from sklearn.metrics import silhouette_score, calinski_harabasz_score, davies_bouldin_score
+
+MUESTRA = 5000
+SEMILLA = 42
+
+
+def rango_k(texto):
+    """'2-10' → [2, ..., 10]; '5' → [5]. Para argparse."""
+    inicio, _, fin = texto.partition("-")
+    return list(range(int(inicio), int(fin or inicio) + 1))
+
+def valor_k(texto):
+    """'auto' o un entero. Para argparse."""
+    return texto if texto == "auto" else int(texto)
+
+
+# === PUNTUACIÓN EN PROCESOS ===
+_estado = None
+
+def _iniciar(L, vectores, asignacion):
+    global _estado
+    _estado = (L, vectores, asignacion)
+
+def _puntuar(k):
+    L, vectores, asignacion = _estado
+    etiquetas = fcluster(L, k, criterion="maxclust")[asignacion]
+    fila = {"k": k, "clusters": len(np.unique(etiquetas))}
+    if 1 < fila["clusters"] < len(etiquetas):
+        fila["silueta"] = silhouette_score(vectores, etiquetas)
+        fila["calinski_harabasz"] = calinski_harabasz_score(vectores, etiquetas)
+        fila["davies_bouldin"] = davies_bouldin_score(vectores, etiquetas)
+    else:
+        fila.update(silueta=np.nan, calinski_harabasz=np.nan, davies_bouldin=np.nan)
+    return fila
+
+
+def barrido_k(L, vectores, ks, asignacion=None, muestra=MUESTRA, workers=None, semilla=SEMILLA):
+    """
+    Tabla de puntuaciones de cada k en `ks` para el linkage L.
+    `vectores` (denso, n × d) son las coordenadas con que se puntúa;
+    `asignacion` lleva cada documento a su hoja de L (None = una hoja por
+    documento). Con más de `muestra` documentos se puntúa sobre una muestra
+    aleatoria fija.
+    """
+    n = len(vectores)
+    asignacion = np.arange(n) if asignacion is None else np.asarray(asignacion)
+    if n > muestra:
+        idx = np.sort(np.random.RandomState(semilla).choice(n, muestra, replace=False))
+        vectores, asignacion = vectores[idx], asignacion[idx]
+    vectores = np.asarray(vectores)
+
+    workers = min(workers or os.cpu_count() or 1, len(ks))
+    if workers <= 1:
+        _iniciar(L, vectores, asignacion)
+        filas = [_puntuar(k) for k in ks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar,
+                                 initargs=(L, vectores, asignacion)) as pool:
+            filas = list(pool.map(_puntuar, ks))
+    return pd.DataFrame(filas)
+
+
+def mejor_k(tabla):
+    """k con mayor silhouette; en empate, mayor Calinski–Harabasz."""
+    validas = tabla.dropna(subset=["silueta"])
+    if validas.empty:
+        return int(tabla["k"].iloc[0])
+    return int(validas.sort_values(["silueta", "calinski_harabasz"], ascending=False)["k"].iloc[0])
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+network_render.py
+
+Dibujo de redes grandes (co-ocurrencia de términos, coautoría) sin que el
+layout ni el render dominen el tiempo de ejecución.
+
+El grafo completo se exporta aparte (GraphML/CSV para Gephi); aquí solo
+se dibuja un resumen:
+  1. backbone: top-k aristas por nodo o filtro de disparidad,
+  2. presupuesto: como máximo `max_nodos` nodos y `max_aristas` aristas,
+  3. layout con semilla fija, cacheado en disco mientras el grafo no cambie.
+
+El layout spring de networkx es O(n²) por iteración: sirve para el grafo ya
+reducido (MAX_NODOS) pero no para miles de nodos. Por encima de
+MAX_NODOS_SPRING se usa sfdp de Graphviz (multinivel, Barnes–Hut) si está
+instalado; si no, spring con menos iteraciones, que sigue siendo cuadrático.
+"""
+import os
+import json
+import glob
+import shlex
+import shutil
+import hashlib
+import subprocess
+
+import numpy as np
+import networkx as nx
+import matplotlib.pyplot as plt
+
+MAX_NODOS = 150
+MAX_ARISTAS = 600
+MAX_ETIQUETAS = 60
+MAX_NODOS_SPRING = 1000   # por encima: sfdp si existe, si no spring con menos iteraciones
+MAX_CACHE = 50            # layouts guardados en cache_dir; se borran los más viejos
+SEMILLA = 42
+
+
+# === BACKBONE ===
+def backbone_topk(G, k=5, peso="weight"):
+    """Subgrafo con las k aristas más pesadas de cada nodo (unión sobre ambos extremos)."""
+    conservar = set()
+    for nodo in G:
+        vecinas = sorted(G[nodo].items(), key=lambda x: x[1].get(peso, 1), reverse=True)[:k]
+        conservar.update(frozenset((nodo, v)) for v, _ in vecinas)
+    H = G.edge_subgraph(tuple(e) for e in conservar).copy()
+    H.add_nodes_from(G.nodes(data=True))
+    return H
+
+def filtro_disparidad(G, alfa=0.05, peso="weight"):
+    """
+    Backbone por filtro de disparidad (Serrano, Boguñá y Vespignani, 2009):
+    se conserva una arista si es significativa para alguno de sus extremos,
+    es decir, si (1 - w/s)^(k-1) < alfa siendo s la fuerza y k el grado del
+    nodo. Solo se consideran aristas de peso positivo.
+    """
+    fuerza, grado = {}, {}
+    for nodo in G:
+        pesos = [d.get(peso, 1) for d in G[nodo].values() if d.get(peso, 1) > 0]
+        fuerza[nodo], grado[nodo] = sum(pesos), len(pesos)
+
+    def significativa(nodo, w):
+        if grado[nodo] <= 1:
+            return True
+        return (1 - w / fuerza[nodo]) ** (grado[nodo] - 1) < alfa
+
+    H = nx.Graph()
+    H.add_nodes_from(G.nodes(data=True))
+    H.add_edges_from((u, v, d) for u, v, d in G.edges(data=True)
+                     if d.get(peso, 1) > 0 and (significativa(u, d.get(peso, 1)) or significativa(v, d.get(peso, 1))))
+    return H
+
+
+# === PRESUPUESTO ===
+def limitar(G, max_nodos=MAX_NODOS, max_aristas=MAX_ARISTAS, peso="weight"):
+    """
+    Subgrafo con las aristas más pesadas que caben en el presupuesto: se
+    recorren de mayor a menor peso y se toma cada una mientras no se pase de
+    `max_nodos` nodos ni de `max_aristas` aristas. No quedan nodos aislados.
+    """
+    R = nx.Graph()
+    for u, v, d in sorted(G.edges(data=True), key=lambda e: e[2].get(peso, 1), reverse=True):
+        if R.number_of_edges() >= max_aristas:
+            break
+        nuevos = (u not in R) + (v not in R)
+        if R.number_of_nodes() + nuevos > max_nodos:
+            continue
+        R.add_edge(u, v, **d)
+    nx.set_node_attributes(R, {n: G.nodes[n] for n in R})
+    return R
+
+
+# === LAYOUT ===
+def huella_grafo(G, *params):
+    """Hash estable de nodos, aristas, pesos y parámetros del layout."""
+    h = hashlib.sha1(json.dumps(params).encode("utf-8"))
+    for nodo in sorted(map(str, G)):
+        h.update(nodo.encode("utf-8") + b"\0")
+    aristas = sorted((*sorted((str(u), str(v))), round(float(d.get("weight", 1)), 6))
+                     for u, v, d in G.edges(data=True))
+    h.update(json.dumps(aristas).encode("utf-8"))
+    return h.hexdigest()
+
+def _sfdp(G, semilla):
+    """Posiciones calculadas por sfdp de Graphviz, o None si no está instalado o falla."""
+    sfdp = shutil.which("sfdp")
+    if sfdp is None:
+        return None
+    nodos = list(G)
+    ids = {nodo: i for i, nodo in enumerate(nodos)}
+    dot = ["graph G {", f"  graph [start={semilla}, overlap=prism];"]
+    dot += [f"  n{i};" for i in range(len(nodos))]
+    dot += [f"  n{ids[u]} -- n{ids[v]};" for u, v in G.edges()]
+    dot.append("}")
+    try:
+        salida = subprocess.run([sfdp, "-Tplain"], input="\n".join(dot), capture_output=True,
+                                text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    pos = {}
+    for linea in salida.splitlines():
+        campos = shlex.split(linea)
+        if campos and campos[0] == "node":
+            pos[nodos[int(campos[1][1:])]] = np.array([float(campos[2]), float(campos[3])])
+    return pos if len(pos) == len(nodos) else None
+
+def _podar_cache(cache_dir, conservar):
+    """Deja en cache_dir solo los `conservar` layouts usados más recientemente."""
+    archivos = sorted(glob.glob(os.path.join(cache_dir, "layout_*.json")), key=os.path.getmtime, reverse=True)
+    for ruta in archivos[conservar:]:
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+def disposicion(G, semilla=SEMILLA, iteraciones=None, cache_dir=None):
+    """
+    Posiciones {nodo: (x, y)}. Hasta MAX_NODOS_SPRING nodos, spring
+    (Fruchterman–Reingold) partiendo del layout espectral; por encima, sfdp
+    si está instalado o spring con menos iteraciones. Si se da `cache_dir`,
+    el resultado se guarda ahí (como mucho MAX_CACHE archivos) y se
+    reutiliza mientras el grafo y los parámetros no cambien.
+    """
+    if G.number_of_nodes() == 0:
+        return {}
+    n = G.number_of_nodes()
+    if iteraciones is None:
+        iteraciones = 50 if n <= MAX_NODOS_SPRING else max(10, 50 * MAX_NODOS_SPRING // n)
+
+    ruta = None
+    if cache_dir:
+        ruta = os.path.join(cache_dir, f"layout_{huella_grafo(G, semilla, iteraciones)}.json")
+        if os.path.exists(ruta):
+            os.utime(ruta)   # usado ahora: la poda borra primero los demás
+            with open(ruta, encoding="utf-8") as fh:
+                guardadas = json.load(fh)
+            return {nodo: np.array(guardadas[str(nodo)]) for nodo in G}
+
+    pos = _sfdp(G, semilla) if n > MAX_NODOS_SPRING else None
+    if pos is None:
+        inicio = nx.spectral_layout(G) if n > 2 else None
+        pos = nx.spring_layout(G, pos=inicio, seed=semilla, iterations=iteraciones,
+                               k=1.5 / np.sqrt(n), weight=None)
+
+    if ruta:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as fh:
+            json.dump({str(nodo): list(map(float, xy)) for nodo, xy in pos.items()}, fh)
+        _podar_cache(cache_dir, MAX_CACHE)
+    return pos
+
+
+# === DIBUJO ===
+def dibujar_red(G, path, titulo, pos=None, atributo_color=None, atributo_tamano=None,
+                max_etiquetas=MAX_ETIQUETAS, peso="weight"):
+    """
+    Dibuja G (ya reducido) y lo guarda en `path`. Tamaño de nodo según
+    `atributo_tamano`, color según `atributo_color` y etiquetas solo para los
+    `max_etiquetas` nodos de mayor fuerza.
+    """
+    if G.number_of_nodes() == 0:
+        print(f"⚠ Red vacía tras la reducción, se omite {os.path.basename(path)}.")
+        return
+    pos = pos or disposicion(G)
+    fig, ax = plt.subplots(figsize=(18, 12))
+
+    pesos = np.array([max(d.get(peso, 1), 0) for _, _, d in G.edges(data=True)], dtype=float)
+    anchos = 0.3 + 3 * pesos / pesos.max() if len(pesos) and pesos.max() > 0 else 0.5
+    nx.draw_networkx_edges(G, pos, ax=ax, width=anchos, alpha=0.35, edge_color="gray")
+
+    tamanos = 30
+    if atributo_tamano:
+        valores = np.array([G.nodes[n].get(atributo_tamano, 1) for n in G], dtype=float)
+        tamanos = 20 + 600 * np.sqrt(valores / max(valores.max(), 1))
+    colores = "tab:blue"
+    if atributo_color:
+        grupos = [G.nodes[n].get(atributo_color, "") for n in G]
+        paleta = {g: plt.cm.tab10(i % 10) for i, g in enumerate(sorted(set(grupos)))}
+        colores = [paleta[g] for g in grupos]
+        for g, c in paleta.items():
+            ax.scatter([], [], color=c, label=g)
+        ax.legend(loc="lower left", fontsize=9, frameon=False)
+    nx.draw_networkx_nodes(G, pos, ax=ax, node_size=tamanos, node_color=colores, alpha=0.85)
+
+    fuerza = dict(G.degree(weight=peso))
+    etiquetados = sorted(G, key=lambda n: fuerza[n], reverse=True)[:max_etiquetas]
+    nx.draw_networkx_labels(G, pos, labels={n: n for n in etiquetados}, ax=ax, font_size=8)
+
+    ax.set_title(titulo)
+    ax.axis("off")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
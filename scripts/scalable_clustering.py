@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scalable_clustering.py
+
+Clustering jerárquico de todo el corpus sin matrices n × n.
+
+  1. LSA: TruncatedSVD de la matriz TF-IDF y normalización a norma 1, así
+     la distancia euclidiana entre documentos refleja la de coseno.
+  2. Opcional, para n muy grande: pre-clustering con MiniBatchKMeans o
+     BIRCH en unos miles de micro-clusters.
+  3. Ward sobre los vectores (documentos o centroides de micro-clusters,
+     ponderados por su tamaño) con nearest-neighbor chain: memoria O(n) y
+     la misma matriz de linkage que scipy. Si fastcluster está instalado y
+     no hay pesos se usa su linkage_vector.
+"""
+import numpy as np
+from scipy.cluster.hierarchy import linkage, fcluster
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+from sklearn.cluster import MiniBatchKMeans, Birch, AgglomerativeClustering
+
+try:
+    import fastcluster
+except ImportError:  # fastcluster es opcional: se usa ward_lineal
+    fastcluster = None
+
+COMPONENTES = 100       # dimensiones LSA
+MICROCLUSTERS = 2000    # centroides del pre-clustering
+MAX_DIRECTO = 10000     # documentos por encima de los cuales se pre-agrupa
+MAX_PDIST = 10000       # observaciones máximas para linkages que necesitan pdist
+UMBRAL_BIRCH = 0.5      # radio de los subclusters BIRCH (vectores de norma 1)
+SEMILLA = 42
+
+
+# === REDUCCIÓN ===
+def reducir_lsa(X, componentes=COMPONENTES, semilla=SEMILLA):
+    """Proyección LSA de X (dispersa) a `componentes` dimensiones, filas de norma 1."""
+    componentes = min(componentes, X.shape[1] - 1, X.shape[0] - 1)
+    svd = TruncatedSVD(n_components=componentes, random_state=semilla)
+    Z = normalize(svd.fit_transform(X))
+    return Z.astype(np.float64), svd
+
+
+# === PRE-CLUSTERING ===
+def preagrupar(Z, metodo="minibatch", microclusters=MICROCLUSTERS, semilla=SEMILLA):
+    """
+    Micro-clusters de Z. Devuelve (centroides, tamaños, asignación de cada
+    documento a su micro-cluster). Los micro-clusters vacíos se descartan.
+    """
+    microclusters = min(microclusters, len(Z))
+    if metodo == "birch":
+        modelo = Birch(threshold=UMBRAL_BIRCH, n_clusters=None).fit(Z)
+        asignacion = modelo.predict(Z)
+    elif metodo == "minibatch":
+        modelo = MiniBatchKMeans(n_clusters=microclusters, batch_size=4096, n_init=1,
+                                 random_state=semilla).fit(Z)
+        asignacion = modelo.labels_
+    else:
+        raise ValueError("metodo debe ser 'minibatch' o 'birch'")
+
+    usados, asignacion = np.unique(asignacion, return_inverse=True)
+    tamanos = np.bincount(asignacion).astype(np.float64)
+    centroides = np.zeros((len(usados), Z.shape[1]))
+    np.add.at(centroides, asignacion, Z)
+    centroides /= tamanos[:, None]
+    return centroides, tamanos, asignacion
+
+
+# === WARD ===
+def ward_lineal(Z, pesos=None):
+    """
+    Linkage Ward (formato scipy) de las filas de Z, cada una con el peso
+    dado (número de documentos que representa; influye en las alturas y el
+    orden de fusión). Nearest-neighbor chain: O(n) memoria y O(n²·d)
+    tiempo. Con todos los pesos a 1 coincide con
+    scipy.cluster.hierarchy.linkage(Z, 'ward').
+    """
+    n = len(Z)
+    if pesos is None and fastcluster is not None:
+        return fastcluster.linkage_vector(Z, method="ward")
+    if n < 2:
+        return np.zeros((0, 4))
+
+    centros = np.array(Z, dtype=np.float64)
+    normas = np.einsum("ij,ij->i", centros, centros)
+    tam = np.ones(n) if pesos is None else np.asarray(pesos, dtype=np.float64).copy()
+    activos = np.ones(n, dtype=bool)
+    fusiones = []   # (representante a, representante b, altura)
+    cadena = []
+
+    while len(fusiones) < n - 1:
+        if not cadena:
+            cadena.append(int(np.flatnonzero(activos)[0]))
+        a = cadena[-1]
+        d2 = np.maximum(normas + normas[a] - 2 * (centros @ centros[a]), 0)
+        costo = tam * tam[a] / (tam + tam[a]) * d2
+        costo[~activos] = np.inf
+        costo[a] = np.inf
+        b = int(np.argmin(costo))
+        minimo = costo[b]
+        # desempate: si el anterior de la cadena está a la misma distancia, se elige él
+        if len(cadena) > 1:
+            previo = cadena[-2]
+            d2p = max(normas[previo] + normas[a] - 2 * (centros[previo] @ centros[a]), 0)
+            if tam[previo] * tam[a] / (tam[previo] + tam[a]) * d2p <= minimo:
+                b, minimo = previo, tam[previo] * tam[a] / (tam[previo] + tam[a]) * d2p
+
+        if len(cadena) > 1 and b == cadena[-2]:
+            cadena.pop()
+            cadena.pop()
+            fusiones.append((a, b, np.sqrt(2 * minimo)))
+            # el cluster fusionado queda en el hueco de a
+            total = tam[a] + tam[b]
+            centros[a] = (tam[a] * centros[a] + tam[b] * centros[b]) / total
+            normas[a] = centros[a] @ centros[a]
+            tam[a] = total
+            activos[b] = False
+        else:
+            cadena.append(b)
+
+    return _a_linkage(fusiones, n)
+
+
+def _a_linkage(fusiones, n):
+    """
+    Ordena las fusiones por altura y les asigna los ids de cluster de scipy.
+    La cuarta columna cuenta hojas (no pesos), como exige scipy.
+    """
+    fusiones.sort(key=lambda f: f[2])
+    padre = list(range(n))
+    etiqueta = list(range(n))
+    tam = [1] * n
+
+    def raiz(x):
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    L = np.zeros((n - 1, 4))
+    for paso, (a, b, altura) in enumerate(fusiones):
+        ra, rb = raiz(a), raiz(b)
+        ea, eb = sorted((etiqueta[ra], etiqueta[rb]))
+        padre[rb] = ra
+        tam[ra] += tam[rb]
+        etiqueta[ra] = n + paso
+        L[paso] = (ea, eb, altura, tam[ra])
+    return L
+
+
+def ward_conectividad(Z, conectividad):
+    """
+    Ward restringido a un grafo (p. ej. el kNN de sparse_similarity): solo
+    se fusionan clusters conectados, así que el costo depende de las aristas
+    y no de n². Devuelve la matriz de linkage en formato scipy.
+
+    Con la restricción una fusión puede quedar más baja que la anterior
+    (inversión); cada altura se lleva al máximo de las previas para que el
+    árbol sea monótono y fcluster/dendrogram lo corten bien. El orden de
+    las fusiones no cambia.
+    """
+    n = len(Z)
+    conectividad = conectividad.maximum(conectividad.T)
+    modelo = AgglomerativeClustering(n_clusters=1, linkage="ward", connectivity=conectividad,
+                                     compute_full_tree=True, compute_distances=True).fit(Z)
+    hijos = modelo.children_
+    tam = np.ones(2 * n - 1)
+    for paso, (a, b) in enumerate(hijos):
+        tam[n + paso] = tam[a] + tam[b]
+    alturas = np.maximum.accumulate(modelo.distances_)
+    return np.column_stack([hijos, alturas, tam[n:]]).astype(np.float64)
+
+
+# === PIPELINE ===
+class ClusteringEscalable:
+    """
+    LSA + (pre-clustering) + linkage. `asignacion` lleva cada documento a
+    una hoja del linkage (él mismo o su micro-cluster), así que
+    etiquetas(L, k) devuelve el cluster de cada documento.
+    """
+
+    def __init__(self, componentes=COMPONENTES, precluster="auto", microclusters=MICROCLUSTERS,
+                 max_directo=MAX_DIRECTO, semilla=SEMILLA):
+        self.componentes = componentes
+        self.precluster = precluster
+        self.microclusters = microclusters
+        self.max_directo = max_directo
+        self.semilla = semilla
+
+    def ajustar(self, X):
+        self.Z, self.svd = reducir_lsa(X, self.componentes, self.semilla)
+        metodo = self.precluster
+        if metodo == "auto":
+            metodo = "minibatch" if len(self.Z) > self.max_directo else "ninguno"
+        if metodo == "ninguno":
+            self.hojas = self.Z
+            self.pesos = None
+            self.asignacion = np.arange(len(self.Z))
+        else:
+            self.hojas, self.pesos, self.asignacion = preagrupar(
+                self.Z, metodo, self.microclusters, self.semilla)
+        self.metodo_precluster = metodo
+        return self
+
+    def linkage(self, metodo="ward"):
+        """Linkage sobre las hojas: Ward en O(n) memoria; otros métodos vía scipy (pdist)."""
+        if metodo == "ward":
+            return ward_lineal(self.hojas, self.pesos)
+        if len(self.hojas) > MAX_PDIST:
+            raise MemoryError(
+                f"linkage '{metodo}' necesita pdist sobre {len(self.hojas)} hojas; usa pre-clustering")
+        return linkage(self.hojas, method=metodo)
+
+    def etiquetas(self, L, k):
+        """Cluster (1..k) de cada documento al cortar L en k clusters."""
+        return fcluster(L, k, criterion="maxclust")[self.asignacion]
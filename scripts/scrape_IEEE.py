@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import glob
-import os, time, json, re
-import shutil
+import os, json, re
+import asyncio
+from functools import partial
+from urllib.parse import urlencode, urlsplit
 
 from selenium import webdriver
 from selenium.common import NoSuchElementException, TimeoutException
@@ -16,10 +17,16 @@ import bibtexparser
 from bibtexparser.bwriter import BibTexWriter
 from bibtexparser.bibdatabase import BibDatabase
 
+from scrape_waits import Esperas, RegistroLatencias, LATENCIAS_CSV
+from export_client import ClienteExport, SesionCaducada, cookies_driver, CONEXIONES
+from ingest_queue import ColaIngesta, informe
+from scrape_checkpoint import PuntoControl, recorrer_paginas, correr_reanudable
+
 # — Parámetros —
 QUERY = "Computational Thinking"
 LIMIT = 10
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'outputs')
+CHECKPOINT = os.path.join(OUT_DIR, "checkpoint_ieee.json")   # páginas ya descargadas, para reanudar
 
 GOOGLE_USER = os.getenv("GOOGLE_USER")
 GOOGLE_PASS = os.getenv("GOOGLE_PASS")
@@ -28,10 +35,24 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 DATA_DIR     = os.path.join(BASE_DIR, "data")
 ARTICLES_DIR = os.path.join(BASE_DIR, "articles")
 
-def init_driver():
+URL_IEEE = "https://ieeexplore.ieee.org"
+POR_PAGINA = 100
+# Petición que hace el botón Export → CSV (confírmala en la pestaña Network si IEEE la cambia)
+RUTA_EXPORT = "/rest/search/export"
+
+# Rutas de la página de resultados de IEEE
+XP_LISTA = "/html/body/div[5]/div/div/div[3]/div/xpl-root/main/div/xpl-search-results/div/div[1]/div[1]/ul"
+RESULTADO = (By.CLASS_NAME, "List-results-items")
+# aviso de búsqueda sin resultados (p. ej. una página más allá de la última)
+SIN_RESULTADOS = (By.XPATH, "//*[contains(text(), 'No results found') or contains(text(), \"couldn't find any results\")]")
+# cabecera "Showing 1-100 of 2,345 results for ..." (scrape_scheduler.py reparte las páginas con ella)
+TOTAL = (By.CLASS_NAME, "Dashboard-header")
+
+def init_driver(headless=False):
     options = webdriver.ChromeOptions()
-    # mientras depuras, comenta la siguiente línea para VER el navegador
-    # options.add_argument("--headless=new")
+    # mientras depuras, deja headless=False para VER el navegador
+    if headless:
+        options.add_argument("--headless=new")
     options.add_argument("--window-size=1920,1080")
     service = Service(ChromeDriverManager().install())
     return webdriver.Chrome(service=service, options=options)
@@ -50,34 +71,18 @@ def set_download_dir(driver, path):
     )
 
 
-def renombrar_zip_descargado(download_dir, nombre_destino):
+def renombrar_zip_descargado(esperas, download_dir, nombre_destino, pedido):
     """
-    Espera a que un archivo .zip se descargue completamente en `download_dir`,
-    y luego lo renombra como `nombre_destino`.
+    Espera el .zip del `pedido` (hecho con esperas.pedir_descarga antes del
+    clic) y lo renombra como `nombre_destino` en `download_dir`.
     """
-    timeout = 90
-    zip_file = None
-
     print(f"⏳ Esperando archivo .zip en: {os.path.abspath(download_dir)}")
-
-    for _ in range(timeout):
-        # Listo archivo zip que no estén en proceso de descarga
-        archivos_zip = glob.glob(os.path.join(download_dir, "*.zip"))
-        archivos_ok = [f for f in archivos_zip if not os.path.exists(f + ".crdownload")]
-
-        if archivos_ok:
-            # Toma el más reciente (por fecha de modificación)
-            zip_file = max(archivos_ok, key=os.path.getmtime)
-            break
-        time.sleep(1)
-
-    if not zip_file:
+    try:
+        nuevo_nombre = esperas.descarga(pedido, "descarga zip", os.path.join(download_dir, nombre_destino))
+    except TimeoutException:
         raise TimeoutError("⚠️ No se encontró un archivo .zip descargado completamente en el tiempo esperado.")
-
-    # Renombrar
-    nuevo_nombre = os.path.join(download_dir, nombre_destino)
-    shutil.move(zip_file, nuevo_nombre)
-    print(f"✔ Archivo renombrado: {os.path.basename(zip_file)} → {nombre_destino}")
+    print(f"✔ Archivo renombrado: {os.path.basename(pedido.ruta)} → {nombre_destino}")
+    return nuevo_nombre
 
 
 def login_uni(driver):
@@ -85,7 +90,6 @@ def login_uni(driver):
 
     # 1) CRAI/databases
     driver.get("https://library.uniquindio.edu.co/databases")
-    time.sleep(3)
 
     # 2) Desplegar Facultad de Ingeniería
     eng = wait.until(EC.element_to_be_clickable((
@@ -94,7 +98,6 @@ def login_uni(driver):
         "/div[1]/div[5]/div/details[7]/summary"
     )))
     eng.click()
-    time.sleep(1)
 
     # 3) Clic en IEEE Xplore
     ieee = wait.until(EC.element_to_be_clickable((
@@ -103,7 +106,6 @@ def login_uni(driver):
         "/div[1]/div[5]/div/details[7]/div/article[7]/div/div/h3/a/span"
     )))
     ieee.click()
-    time.sleep(2)
 
     # 4) Botón Google SSO
     google_btn = wait.until(EC.element_to_be_clickable((By.ID, "btn-google")))
@@ -130,85 +132,264 @@ def login_uni(driver):
     print("✔ CRAI listo en pestaña secundaria")
 
 
-def scrape_ieee(driver):
+def url_resultados(pagina, base=URL_IEEE, query=QUERY, por_pagina=POR_PAGINA):
+    """URL de la página `pagina` de resultados: permite abrirla directamente sin pulsar next-btn."""
+    return f"{base}/search/searchresult.jsp?" + urlencode(
+        {"queryText": query, "rowsPerPage": por_pagina, "pageNumber": pagina})
+
+
+def url_export(pagina, query=QUERY, por_pagina=POR_PAGINA, ruta=RUTA_EXPORT):
+    """(ruta, parámetros) de la exportación CSV de la página `pagina`, para export_client."""
+    return ruta, {"queryText": query, "rowsPerPage": por_pagina, "pageNumber": pagina, "format": "csv"}
+
+
+def filas_csv(ruta):
+    """Filas de datos (sin la cabecera) de un CSV exportado."""
+    with open(ruta, encoding="utf-8", errors="ignore") as fh:
+        return max(0, sum(1 for linea in fh if linea.strip()) - 1)
+
+
+def exportar_http(base, cookies, data_dir=DATA_DIR, desde=1, ruta=RUTA_EXPORT, conexiones=CONEXIONES, **opciones):
+    """
+    Backend de exportación por HTTP: pide los CSV de las páginas de
+    resultados directamente con las cookies de la sesión, `conexiones`
+    páginas a la vez, y los escribe como ieee_page_<i>.csv en `data_dir`.
+    Avanza por bloques hasta la primera página sin filas. Solo CSV: los
+    PDF siguen saliendo por el navegador. Devuelve las rutas escritas.
+    """
+    async def correr():
+        cliente = ClienteExport(base, cookies, conexiones=conexiones, **opciones)
+        rutas, pagina = [], desde
+        try:
+            while True:
+                paginas = list(range(pagina, pagina + conexiones))
+                resultados = await cliente.exportar_paginas(
+                    paginas, lambda p: url_export(p, ruta=ruta),
+                    lambda p: os.path.join(data_dir, f"ieee_page_{p}.csv"))
+                fallidas, fin = 0, False
+                for p in paginas:
+                    r = resultados[p]
+                    if isinstance(r, Exception):
+                        print(f"❌ Página {p}: {r}")
+                        fallidas += 1
+                    elif filas_csv(r) == 0:   # más allá de la última página (se borran todas las del bloque)
+                        os.remove(r)
+                        fin = True
+                    else:
+                        rutas.append(r)
+                if fin:
+                    return rutas
+                if fallidas == len(paginas):
+                    print("⚠️ Falló un bloque entero de páginas, se detiene la exportación.")
+                    return rutas
+                pagina += conexiones
+        finally:
+            await cliente.cerrar()
+            e = cliente.estadisticas
+            print(f"→ Exportación HTTP: {e['peticiones']} peticiones, {e['reintentos']} reintentos, "
+                  f"{e['bytes'] / 1e6:.1f} MB")
+
+    os.makedirs(data_dir, exist_ok=True)
+    return asyncio.run(correr())
+
+
+def iniciar_sesion(driver):
+    """Login (login_uni) y URL base (esquema y host) de IEEE tras el SSO, que puede ser un proxy."""
+    login_uni(driver)
+    driver.switch_to.window(driver.window_handles[0])
+    partes = urlsplit(driver.current_url)
+    return f"{partes.scheme}://{partes.netloc}"
+
+
+def descargar_pagina(driver, esperas, i, data_dir=DATA_DIR, articles_dir=ARTICLES_DIR):
+    """
+    En la página de resultados abierta descarga los PDF como
+    ieee_page_<i>.zip en `articles_dir` y el CSV como ieee_page_<i>.csv en
+    `data_dir`. Devuelve las rutas descargadas.
+    """
+    rutas = []
+    driver.execute_script("window.scrollBy(0, 500);")
+    #Se descargan los articulos
+    set_download_dir(driver, articles_dir)
+    esperas.click((By.CLASS_NAME, "results-actions-selectall-checkbox"), "seleccionar todo")
+    pdf_button = esperas.presente((By.XPATH, XP_LISTA + "/li[1]/xpl-download-pdf/button"), "botón PDF")
+    if pdf_button.is_enabled():
+        pedido = esperas.pedir_descarga(articles_dir, "*.zip")
+        pdf_button.click()
+        esperas.click((By.XPATH, "/html/body/ngb-modal-window/div/div/div/section[2]/div/button[2]/span"),
+                      "confirmar descarga")
+        try:
+            esperas.click((By.CLASS_NAME, "modal-close"), "cerrar modal")
+        except TimeoutException:
+            print("⚠️ No apareció el botón para cerrar el modal.")
+        rutas.append(renombrar_zip_descargado(esperas, articles_dir, f"ieee_page_{i}.zip", pedido))
+    else:
+        print("⚠️ El botón de descarga de artículos está deshabilitado en esta página.")
+
+    # Esperar a que desaparezca el modal si sigue visible
+    try:
+        esperas.invisible((By.CLASS_NAME, "modal-content"), "cierre del modal")
+    except TimeoutException:
+        print("⚠️ El modal aún está visible, intentando de todos modos.")
+
+    #Se descargan los CSV
+    set_download_dir(driver, data_dir)
+    pedido = esperas.pedir_descarga(data_dir, "*.csv")
+    esperas.click((By.XPATH, XP_LISTA + "/li[3]/xpl-export-search-results/button"), "exportar")
+    esperas.click((By.XPATH, "/html/body/ngb-modal-window/div/div/div[2]/div/div[3]/button[2]"),
+                  "confirmar exportación")
+    rutas.append(esperas.descarga(pedido, "descarga CSV", os.path.join(data_dir, f"ieee_page_{i}.csv")))
+    return rutas
+
+
+def scrape_ieee(driver, data_dir=DATA_DIR, articles_dir=ARTICLES_DIR, ingesta=None, control=None, url_pagina=None,
+                latencias_csv=LATENCIAS_CSV):
     """
     1) Navega a la página de resultados de la búsqueda en IEEE.
+    2) En cada página descarga los PDF (zip) y el CSV de los resultados.
+    Si se pasa `ingesta` (ingest_queue.ColaIngesta), cada archivo descargado
+    se pone en ella en cuanto termina la página.
+    Con `url_pagina` (página → URL de resultados) las páginas se abren por
+    URL desde la primera que el `control` (scrape_checkpoint.PuntoControl)
+    no tenga completada, sin buscar ni pulsar 'siguiente'. Las latencias
+    por página se añaden a `latencias_csv`.
     """
-    wait = WebDriverWait(driver, 20)
+    registro = RegistroLatencias("IEEE", latencias_csv)
+    esperas = Esperas(driver, registro)
+    if url_pagina is not None:
+        try:
+            recorrer_paginas(driver, esperas, url_pagina, RESULTADO, SIN_RESULTADOS,
+                             lambda i: descargar_pagina(driver, esperas, i, data_dir, articles_dir),
+                             control, ingesta)
+        finally:
+            esperas.cerrar()
+            registro.resumen()
+        return
 
     # 1) Cambiar a la pestaña IEEE (índice 0) y lanzar la búsqueda
     driver.switch_to.window(driver.window_handles[0])
-    driver.find_element(By.CLASS_NAME, "Typeahead-input").send_keys(QUERY)
-    driver.find_element(By.CLASS_NAME, "fa-search").click()
-    # driver.get(search_url)
-    time.sleep(5)
-    driver.find_element(By.ID, "dropdownPerPageLabel").click()
-    wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/div/div/div[3]/div/xpl-root/main/div/xpl-search-results/div/div[1]/div[1]/ul/li[2]/xpl-rows-per-page-drop-down/div/div/button[1]"))).click()
-
-    i = 1
-
-    while True:
-        driver.execute_script("window.scrollBy(0, 500);")
-        time.sleep(1)
-        #Se descargan los articulos
-        set_download_dir(driver, "articles")
-        driver.find_element(By.CLASS_NAME, "results-actions-selectall-checkbox").click()
-        pdf_button = driver.find_element(By.XPATH,
-                                         "/html/body/div[5]/div/div/div[3]/div/xpl-root/main/div/xpl-search-results/div/div[1]/div[1]/ul/li[1]/xpl-download-pdf/button")
-        if pdf_button.is_enabled():
-            pdf_button.click()
-            time.sleep(2)
-            driver.find_element(By.XPATH,
-                                "/html/body/ngb-modal-window/div/div/div/section[2]/div/button[2]/span").click()
-            try:
-                close_btn = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "modal-close")))
-                close_btn.click()
-            except TimeoutException:
-                print("⚠️ No apareció el botón para cerrar el modal.")
-        else:
-            print("⚠️ El botón de descarga de artículos está deshabilitado en esta página.")
-
-        nombre_zip = f"ieee_page_{i}.zip"
-        renombrar_zip_descargado("articles", nombre_zip)
-
-        # Esperar a que desaparezca el modal si sigue visible
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.invisibility_of_element_located((By.CLASS_NAME, "modal-content"))
-            )
-        except TimeoutException:
-            print("⚠️ El modal aún está visible después de 10 segundos, intentando de todos modos.")
-
-        #Se descargan los CSV
-        set_download_dir(driver, "data")
-        wait.until(EC.element_to_be_clickable ((By.XPATH,
-                            "/html/body/div[5]/div/div/div[3]/div/xpl-root/main/div/xpl-search-results/div/div[1]/div[1]/ul/li[3]/xpl-export-search-results/button"))).click()
-        time.sleep(2)
-        driver.find_element(By.XPATH,"/html/body/ngb-modal-window/div/div/div[2]/div/div[3]/button[2]").click()
-        time.sleep(5)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)
+    esperas.escribir((By.CLASS_NAME, "Typeahead-input"), QUERY, "campo de búsqueda")
+    esperas.click((By.CLASS_NAME, "fa-search"), "buscar")
+    primero = esperas.presente(RESULTADO, "resultados", "pagina")
+    esperas.click((By.ID, "dropdownPerPageLabel"), "menú por página")
+    esperas.click((By.XPATH, XP_LISTA + "/li[2]/xpl-rows-per-page-drop-down/div/div/button[1]"), "resultados por página")
+    esperas.recargada(primero, "recarga por página")
+
+    try:
+        i = 1
+
+        while True:
+            with registro.pagina(i):
+                esperas.presente(RESULTADO, "resultados", "pagina")
+                rutas = descargar_pagina(driver, esperas, i, data_dir, articles_dir)
+                if ingesta is not None:   # se procesa mientras se descarga la página siguiente
+                    ingesta.poner(*rutas)
+
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                try:
+                    next_btn = driver.find_element(By.CLASS_NAME,"next-btn")
+                    if not next_btn.is_enabled() or "disabled" in next_btn.get_attribute("class"):
+                        break
+                    primero = driver.find_element(*RESULTADO)
+                    next_btn.click()
+                    esperas.recargada(primero, "siguiente página")
+                    i += 1
+                except NoSuchElementException:
+                    break
+    finally:
+        esperas.cerrar()
+        registro.resumen()
+
+def scrape_fixture(paginas=3, lat=300, export="navegador", ingestar=True):
+    """
+    Recorre las páginas de prueba locales (scripts/fixtures/ieee) en un
+    navegador headless, o con export="http" exporta sus CSV del servidor de
+    exportación falso. Con `ingestar` los CSV se fusionan en <salida>/outputs
+    mientras se descargan.
+    """
+    import tempfile
+    from scrape_fixtures import servir, url_busqueda
+
+    salida = tempfile.mkdtemp(prefix="ieee_fixture_")
+    data_dir, articles_dir = os.path.join(salida, "data"), os.path.join(salida, "articles")
+    os.makedirs(data_dir)
+    os.makedirs(articles_dir)
+    if export == "http":
+        from scrape_fixtures import servir_export, COOKIE_EXPORT
+        servidor, url_base = servir_export(paginas=paginas, lat=lat)
         try:
-            next_btn = driver.find_element(By.CLASS_NAME,"next-btn")
-            if not next_btn.is_enabled() or "disabled" in next_btn.get_attribute("class"):
-                break
-            next_btn.click()
-            time.sleep(5)
-            i += 1
-        except NoSuchElementException:
-            break
-
-def main():
+            rutas = exportar_http(url_base, [COOKIE_EXPORT], data_dir, por_segundo=20)
+        finally:
+            servidor.shutdown()
+        print(f"✔ Fixture IEEE (HTTP): {len(rutas)} CSV en {data_dir}")
+        return
+
+    servidor, url_base = servir()
+    driver = init_driver(headless=True)
+    ingesta = ColaIngesta(data_dir, os.path.join(salida, "outputs")) if ingestar else None
+    try:
+        driver.get(url_busqueda(url_base, "ieee", paginas, lat))
+        scrape_ieee(driver, data_dir, articles_dir, ingesta,
+                    latencias_csv=os.path.join(salida, "scrape_latencias.csv"))
+    finally:
+        driver.quit()
+        servidor.shutdown()
+        if ingesta is not None:
+            print(informe(ingesta.cerrar()))
+    print(f"✔ Fixture IEEE: {len(os.listdir(data_dir))} CSV y {len(os.listdir(articles_dir))} zip en {salida}")
+
+def main(export="navegador", ruta_export=RUTA_EXPORT, ingestar=True, checkpoint=CHECKPOINT, desde_cero=False):
     os.makedirs(OUT_DIR, exist_ok=True)
-    driver = init_driver()
-
-    login_uni(driver)
-
-    # Scraping en cada base
-    todos = []
-    todos += scrape_ieee(driver)
 
+    if export == "http":
+        # el navegador solo se usa para el login; las exportaciones van por HTTP
+        driver = init_driver()
+        try:
+            base = iniciar_sesion(driver)
+            cookies = cookies_driver(driver)
+        finally:
+            driver.quit()
+        try:
+            rutas = exportar_http(base, cookies, ruta=ruta_export)
+        except SesionCaducada as e:
+            print(f"❌ IEEE rechazó las cookies de la sesión ({e}); vuelve a ejecutar para iniciar sesión.")
+            return
+        print(f"✔ {len(rutas)} CSV exportados por HTTP en {DATA_DIR}")
+        return
+
+    # Scraping reanudable: las páginas del punto de control se saltan y, si
+    # Chrome se cae o la sesión caduca, se inicia sesión otra vez y se sigue
+    # en la primera pendiente. Con `ingestar` merge/unify procesan cada
+    # página mientras se descarga la siguiente.
+    if desde_cero and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    control = PuntoControl(checkpoint, "ieee", QUERY)
+    ingesta = ColaIngesta() if ingestar else None
+    try:
+        correr_reanudable(init_driver, iniciar_sesion,
+                          lambda driver, base: scrape_ieee(driver, ingesta=ingesta, control=control,
+                                                           url_pagina=partial(url_resultados, base=base)))
+    finally:
+        if ingesta is not None:
+            print(informe(ingesta.cerrar()))
 
 
 if __name__ == '__main__':
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Descarga PDFs y CSV de resultados de IEEE Xplore.")
+    parser.add_argument("--fixture", action="store_true",
+                        help="recorre las páginas de prueba locales (sin login ni red) y muestra las latencias")
+    parser.add_argument("--paginas", type=int, default=3, help="páginas de resultados del fixture")
+    parser.add_argument("--lat", type=int, default=300, help="latencia máxima simulada del fixture (ms)")
+    parser.add_argument("--export", choices=["navegador", "http"], default="navegador",
+                        help="http: tras el login pide los CSV directamente, varias páginas a la vez (sin PDF)")
+    parser.add_argument("--ruta-export", default=RUTA_EXPORT, help="ruta de la petición de exportación CSV")
+    parser.add_argument("--sin-ingesta", action="store_true",
+                        help="no fusiona/unifica mientras descarga (correr merge_csvs.py y unify_entries.py después)")
+    parser.add_argument("--checkpoint", default=CHECKPOINT, help="punto de control para reanudar la corrida")
+    parser.add_argument("--desde-cero", action="store_true", help="ignora el punto de control y empieza en la página 1")
+    args = parser.parse_args()
+    if args.fixture:
+        scrape_fixture(args.paginas, args.lat, args.export, not args.sin_ingesta)
+    else:
+        main(args.export, args.ruta_export, not args.sin_ingesta, args.checkpoint, args.desde_cero)
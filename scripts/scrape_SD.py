@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, time, json, re
-import shutil
+import os, json, re
+from functools import partial
+from urllib.parse import urlencode, urlsplit
 
 from selenium import webdriver
 from selenium.common import NoSuchElementException, TimeoutException
@@ -16,10 +17,15 @@ import bibtexparser
 from bibtexparser.bwriter import BibTexWriter
 from bibtexparser.bibdatabase import BibDatabase
 
+from scrape_waits import Esperas, RegistroLatencias, LATENCIAS_CSV
+from ingest_queue import ColaIngesta, informe
+from scrape_checkpoint import PuntoControl, recorrer_paginas, correr_reanudable
+
 # — Parámetros —
 QUERY = "Computational Thinking"
 LIMIT = 10
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'outputs')
+CHECKPOINT = os.path.join(OUT_DIR, "checkpoint_sd.json")   # páginas ya descargadas, para reanudar
 
 GOOGLE_USER = os.getenv("GOOGLE_USER")
 GOOGLE_PASS = os.getenv("GOOGLE_PASS")
@@ -28,10 +34,22 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 DATA_DIR     = os.path.join(BASE_DIR, "data")
 ARTICLES_DIR = os.path.join(BASE_DIR, "articles")
 
-def init_driver():
+URL_SD = "https://www.sciencedirect.com"
+POR_PAGINA = 100
+
+# Rutas de la página de resultados de ScienceDirect
+XP_RESULTADOS = "/html/body/div[1]/div/div/div[2]/div/div/div/section/div/div[2]/div[3]/div[1]/div[2]"
+RESULTADO = (By.CLASS_NAME, "ResultItem")
+# aviso de búsqueda sin resultados (p. ej. una página más allá de la última)
+SIN_RESULTADOS = (By.XPATH, "//*[contains(text(), 'No results found') or contains(text(), \"couldn't find any results\")]")
+# "2,345 results" sobre la lista (scrape_scheduler.py reparte las páginas con él)
+TOTAL = (By.CLASS_NAME, "search-body-results-text")
+
+def init_driver(headless=False):
     options = webdriver.ChromeOptions()
-    # mientras depuras, comenta la siguiente línea para VER el navegador
-    # options.add_argument("--headless=new")
+    # mientras depuras, deja headless=False para VER el navegador
+    if headless:
+        options.add_argument("--headless=new")
     options.add_argument("--window-size=1920,1080")
     service = Service(ChromeDriverManager().install())
     return webdriver.Chrome(service=service, options=options)
@@ -50,22 +68,15 @@ def set_download_dir(driver, path):
     )
 
 
-def renombrar_zip_descargado(download_dir, nombre_destino):
-    zip_path = os.path.join(download_dir, "bulk-download.zip")
-    nuevo_nombre = os.path.join(download_dir, nombre_destino)
-
-        # Esperar a que se descargue completamente
+def renombrar_zip_descargado(esperas, download_dir, nombre_destino, pedido):
+    """
+    Espera el zip (bulk-download.zip) del `pedido` hecho antes del clic y lo
+    renombra como `nombre_destino` en `download_dir`.
+    """
     try:
-        for _ in range(30):  # Máximo 30 segundos
-            if os.path.exists(zip_path) and not os.path.exists(zip_path + ".crdownload"):
-                break
-            time.sleep(1)
-        else:
-            raise TimeoutError("El archivo bulk-download.zip no terminó de descargarse.")
+        return esperas.descarga(pedido, "descarga zip", os.path.join(download_dir, nombre_destino))
     except TimeoutException:
-        print("El archivo bulk-download.zip no terminó de descargarse.")
-    # Renombrar (o mover a otra carpeta también sirve)
-    shutil.move(zip_path, nuevo_nombre)
+        raise TimeoutError("El archivo bulk-download.zip no terminó de descargarse.")
 
 
 def login_uni(driver):
@@ -73,7 +84,6 @@ def login_uni(driver):
 
     # 1) CRAI/databases
     driver.get("https://library.uniquindio.edu.co/databases")
-    time.sleep(3)
 
     # 2) Desplegar Facultad de Ingeniería
     eng = wait.until(EC.element_to_be_clickable((
@@ -82,7 +92,6 @@ def login_uni(driver):
         "/div[1]/div[5]/div/details[7]/summary"
     )))
     eng.click()
-    time.sleep(1)
 
     # 3) Clic en Science Direct (DESCUBRIDOR)
     sd = wait.until(EC.element_to_be_clickable((
@@ -90,13 +99,11 @@ def login_uni(driver):
         "/html/body/div[3]/div[2]/div[3]/div/div[2]/div/main/div[1]/div[5]/div/details[7]/div/article[16]/div/div/h3/a/span"
     )))
     sd.click()
-    time.sleep(2)
 
     # 4) Botón Google SSO
     google_btn = wait.until(EC.element_to_be_clickable((By.ID, "btn-google")))
     google_btn.click()
 
-    time.sleep(3)
     # 5) Credenciales de Google
     wait.until(EC.element_to_be_clickable((By.ID, "identifierId"))).send_keys(GOOGLE_USER)
     driver.find_element(By.ID, "identifierNext").click()
@@ -111,61 +118,163 @@ def login_uni(driver):
     print("✔ Login en Science Direct completado")
 
 
-def scrape_sd(driver):
+def url_resultados(pagina, base=URL_SD, query=QUERY, por_pagina=POR_PAGINA):
+    """URL de la página `pagina` de resultados: permite abrirla directamente sin pulsar 'next'."""
+    return f"{base}/search?" + urlencode({"qs": query, "show": por_pagina, "offset": (pagina - 1) * por_pagina})
+
+
+def iniciar_sesion(driver):
+    """Login (login_uni) y URL base (esquema y host) de ScienceDirect tras el SSO, que puede ser un proxy."""
+    login_uni(driver)
+    partes = urlsplit(driver.current_url)
+    return f"{partes.scheme}://{partes.netloc}"
+
+
+def descargar_pagina(driver, esperas, i, data_dir=DATA_DIR, articles_dir=ARTICLES_DIR):
+    """
+    En la página de resultados abierta descarga los artículos como
+    sd_page_<i>.zip en `articles_dir` y exporta las citas como
+    sd_page_<i>.<ext> en `data_dir`. Devuelve las rutas descargadas.
+    """
+    esperas.click((By.XPATH, XP_RESULTADOS + "/div[1]/div[1]/span/span[1]/span[1]/div/div/label/span[1]"),
+                  "seleccionar todo")
+    set_download_dir(driver, articles_dir)
+    pedido = esperas.pedir_descarga(articles_dir, "*.zip")
+    esperas.click((By.CLASS_NAME, "download-all-link-text"), "descargar artículos")
+    # el clic va al botón: un XPath que termina en /svg no encuentra el icono en un documento HTML
+    esperas.click((By.XPATH, "/html/body/div[4]/div/div/div/button"), "confirmar descarga")
+    rutas = [renombrar_zip_descargado(esperas, articles_dir, f"sd_page_{i}.zip", pedido)]
+    esperas.click((By.CLASS_NAME, "modal-close-button-icon"), "cerrar modal")
+    esperas.invisible((By.CLASS_NAME, "modal-close-button-icon"), "cierre del modal")
+
+    esperas.click((By.CLASS_NAME, "export-all-link-text"), "exportar")
+    set_download_dir(driver, data_dir)
+    pedido = esperas.pedir_descarga(data_dir)
+    esperas.click((By.XPATH, "/html/body/div[5]/div/div/div/p/div/div/button[3]/span/span"),
+                  "formato de exportación")
+    # la extensión (.ris/.bib) depende del formato elegido: se conserva la del archivo descargado
+    rutas.append(esperas.descarga(pedido, "descarga de citas",
+                                  lambda citas: os.path.join(data_dir, f"sd_page_{i}" + os.path.splitext(citas)[1])))
+    return rutas
+
+
+def scrape_sd(driver, data_dir=DATA_DIR, articles_dir=ARTICLES_DIR, ingesta=None, control=None, url_pagina=None,
+              latencias_csv=LATENCIAS_CSV):
     """
     1) Navega a la página de resultados de la búsqueda en Science Direct.
+    2) En cada página descarga los artículos (zip) y exporta las citas.
+    Si se pasa `ingesta` (ingest_queue.ColaIngesta), cada archivo descargado
+    se pone en ella en cuanto termina la página.
+    Con `url_pagina` (página → URL de resultados) las páginas se abren por
+    URL desde la primera que el `control` (scrape_checkpoint.PuntoControl)
+    no tenga completada, sin buscar ni pulsar 'siguiente'. Las latencias
+    por página se añaden a `latencias_csv`.
     """
-    wait = WebDriverWait(driver, 20)
+    registro = RegistroLatencias("ScienceDirect", latencias_csv)
+    esperas = Esperas(driver, registro)
+    if url_pagina is not None:
+        try:
+            recorrer_paginas(driver, esperas, url_pagina, RESULTADO, SIN_RESULTADOS,
+                             lambda i: descargar_pagina(driver, esperas, i, data_dir, articles_dir),
+                             control, ingesta)
+        finally:
+            esperas.cerrar()
+            registro.resumen()
+        return
 
-    driver.find_element(By.ID, "qs").send_keys(QUERY)
-    driver.find_element(By.XPATH, "/html/body/div/div/div[1]/div[2]/div[2]/div/div/form/div[2]/button").click()
+    esperas.escribir((By.ID, "qs"), QUERY, "campo de búsqueda")
+    esperas.click((By.XPATH, "/html/body/div/div/div[1]/div[2]/div[2]/div/div/form/div[2]/button"), "buscar")
+    primero = esperas.presente(RESULTADO, "resultados", "pagina")
     driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(1)
-    driver.find_element(By.XPATH, "/html/body/div[1]/div/div/div[2]/div/div/div/section/div/div[2]/div[3]/div[1]/div[2]/div[3]/div[1]/ol/li[3]/a").click()
-    time.sleep(1)
-
-    # i = 1
-
-    while True:
-        driver.find_element(By.XPATH, "/html/body/div[1]/div/div/div[2]/div/div/div/section/div/div[2]/div[3]/div[1]/div[2]/div[1]/div[1]/span/span[1]/span[1]/div/div/label/span[1]").click()
-        time.sleep(1)
-        driver.find_element(By.CLASS_NAME,"download-all-link-text").click()
-        time.sleep(2)
-        driver.find_element(By.XPATH, "/html/body/div[4]/div/div/div/button/svg").click()
-        time.sleep(5)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)
-        driver.find_element(By.CLASS_NAME, "modal-close-button-icon").click()
-        time.sleep(1)
-        driver.find_element(By.CLASS_NAME, "export-all-link-text").click()
-        time.sleep(1)
-        set_download_dir(driver, "data")
-        driver.find_element(By.XPATH, "/html/body/div[5]/div/div/div/p/div/div/button[3]/span/span").click()
-        time.sleep(1)
-
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)
-        try:
-            next_btn = driver.find_element(By.XPATH,"/html/body/div[1]/div/div/div[2]/div/div/div/section/div/div[2]/div[3]/div[1]/div[2]/div[3]/div[2]/div/ol/li[3]/a/span")
-            if not next_btn.is_enabled() or "disabled" in next_btn.get_attribute("class"):
-                break
-            next_btn.click()
-            time.sleep(5)
-            # i += 1
-        except NoSuchElementException:
-            break
-
-def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    driver = init_driver()
+    esperas.click((By.XPATH, XP_RESULTADOS + "/div[3]/div[1]/ol/li[3]/a"), "resultados por página")
+    esperas.recargada(primero, "recarga por página")
 
-    login_uni(driver)
+    try:
+        i = 1
 
-    # Scraping en cada base
-    todos = []
-    todos += scrape_sd(driver)
+        while True:
+            with registro.pagina(i):
+                esperas.presente(RESULTADO, "resultados", "pagina")
+                rutas = descargar_pagina(driver, esperas, i, data_dir, articles_dir)
+                if ingesta is not None:   # se procesa mientras se descarga la página siguiente
+                    ingesta.poner(*rutas)
 
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                try:
+                    next_btn = driver.find_element(By.XPATH, XP_RESULTADOS + "/div[3]/div[2]/div/ol/li[3]/a/span")
+                    if not next_btn.is_enabled() or "disabled" in next_btn.get_attribute("class"):
+                        break
+                    primero = driver.find_element(*RESULTADO)
+                    next_btn.click()
+                    esperas.recargada(primero, "siguiente página")
+                    i += 1
+                except NoSuchElementException:
+                    break
+    finally:
+        esperas.cerrar()
+        registro.resumen()
+
+def scrape_fixture(paginas=3, lat=300, ingestar=True):
+    """
+    Recorre las páginas de prueba locales (scripts/fixtures/sd) en un
+    navegador headless. Con `ingestar` las citas se unifican en
+    <salida>/outputs mientras se descargan.
+    """
+    import tempfile
+    from scrape_fixtures import servir, url_busqueda
+
+    servidor, url_base = servir()
+    salida = tempfile.mkdtemp(prefix="sd_fixture_")
+    data_dir, articles_dir = os.path.join(salida, "data"), os.path.join(salida, "articles")
+    os.makedirs(data_dir)
+    os.makedirs(articles_dir)
+    driver = init_driver(headless=True)
+    ingesta = ColaIngesta(data_dir, os.path.join(salida, "outputs")) if ingestar else None
+    try:
+        driver.get(url_busqueda(url_base, "sd", paginas, lat))
+        scrape_sd(driver, data_dir, articles_dir, ingesta,
+                  latencias_csv=os.path.join(salida, "scrape_latencias.csv"))
+    finally:
+        driver.quit()
+        servidor.shutdown()
+        if ingesta is not None:
+            print(informe(ingesta.cerrar()))
+    print(f"✔ Fixture ScienceDirect: {len(os.listdir(data_dir))} exportaciones y "
+          f"{len(os.listdir(articles_dir))} zip en {salida}")
+
+def main(ingestar=True, checkpoint=CHECKPOINT, desde_cero=False):
+    os.makedirs(OUT_DIR, exist_ok=True)
+
+    # Scraping reanudable: las páginas del punto de control se saltan y, si
+    # Chrome se cae o la sesión caduca, se inicia sesión otra vez y se sigue
+    # en la primera pendiente. Con `ingestar` merge/unify procesan cada
+    # página mientras se descarga la siguiente.
+    if desde_cero and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    control = PuntoControl(checkpoint, "sd", QUERY)
+    ingesta = ColaIngesta() if ingestar else None
+    try:
+        correr_reanudable(init_driver, iniciar_sesion,
+                          lambda driver, base: scrape_sd(driver, ingesta=ingesta, control=control,
+                                                         url_pagina=partial(url_resultados, base=base)))
+    finally:
+        if ingesta is not None:
+            print(informe(ingesta.cerrar()))
 
 
 if __name__ == '__main__':
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Descarga artículos y citas de resultados de ScienceDirect.")
+    parser.add_argument("--fixture", action="store_true",
+                        help="recorre las páginas de prueba locales (sin login ni red) y muestra las latencias")
+    parser.add_argument("--paginas", type=int, default=3, help="páginas de resultados del fixture")
+    parser.add_argument("--lat", type=int, default=300, help="latencia máxima simulada del fixture (ms)")
+    parser.add_argument("--sin-ingesta", action="store_true",
+                        help="no fusiona/unifica mientras descarga (correr merge_csvs.py y unify_entries.py después)")
+    parser.add_argument("--checkpoint", default=CHECKPOINT, help="punto de control para reanudar la corrida")
+    parser.add_argument("--desde-cero", action="store_true", help="ignora el punto de control y empieza en la página 1")
+    args = parser.parse_args()
+    if args.fixture:
+        scrape_fixture(args.paginas, args.lat, not args.sin_ingesta)
+    else:
+        main(not args.sin_ingesta, args.checkpoint, args.desde_cero)
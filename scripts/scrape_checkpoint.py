@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scrape_checkpoint.py
+
+Punto de control de una corrida de scraping, para reanudarla si Chrome se
+cae o la sesión SSO caduca a mitad: un JSON con el sitio, la búsqueda, las
+páginas completadas y el hash SHA-256 de cada archivo que descargaron.
+
+    {"sitio": "ieee", "query": "...", "fin": null,
+     "paginas": {"1": {".../articles/ieee_page_1.zip": "<sha256>",
+                       ".../data/ieee_page_1.csv": "<sha256>"}, ...}}
+
+Una página cuenta como hecha solo si sus archivos siguen en disco con el
+mismo hash; si alguno falta o cambió se vuelve a descargar. Si la búsqueda
+es otra, el punto de control se descarta. Cada cambio se escribe en un
+.tmp y se publica con os.replace, así un corte a mitad no lo corrompe.
+
+recorrer_paginas() abre cada página por URL (pageNumber/offset) en vez de
+ir pulsando 'siguiente', de modo que una corrida reanudada va directo a
+la primera página pendiente; correr_reanudable() abre otro navegador e
+inicia sesión de nuevo cuando Chrome se cae o el SSO caduca.
+"""
+import os
+import json
+import threading
+from urllib.parse import urlsplit
+
+from selenium.common import TimeoutException, WebDriverException
+
+from key_index import hash_archivo
+
+
+class PuntoControl:
+    """Páginas completadas de `sitio` para la búsqueda `query`, guardadas en `ruta`."""
+
+    def __init__(self, ruta, sitio, query):
+        self.ruta = ruta
+        self.sitio, self.query = sitio, query
+        self.candado = threading.Lock()   # lo comparten los workers de scrape_scheduler.py
+        self.paginas = {}                 # página → {ruta absoluta: sha256}
+        self.fin = None                   # primera página sin resultados, si ya se vio
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as fh:
+                datos = json.load(fh)
+            if (datos.get("sitio"), datos.get("query")) == (sitio, query):
+                self.paginas = {int(p): archivos for p, archivos in datos["paginas"].items()}
+                self.fin = datos.get("fin")
+            else:
+                print(f"⚠️ {os.path.basename(ruta)} es de otra búsqueda ({datos.get('query')!r}); se empieza de cero.")
+        self.en_disco = {}                # página → bool, verificado una vez por corrida
+
+    def completada(self, pagina):
+        """True si la página se marcó y todos sus archivos siguen en disco con el mismo hash."""
+        with self.candado:
+            if pagina not in self.paginas:
+                return False
+            if pagina not in self.en_disco:
+                self.en_disco[pagina] = all(os.path.exists(r) and hash_archivo(r) == h
+                                            for r, h in self.paginas[pagina].items())
+                if not self.en_disco[pagina]:
+                    print(f"⚠️ {self.sitio} página {pagina}: faltan archivos o cambiaron, se descarga de nuevo.")
+            return self.en_disco[pagina]
+
+    def primera_pendiente(self, desde=1):
+        """Primera página a partir de `desde` que no está completada."""
+        pagina = desde
+        while self.completada(pagina):
+            pagina += 1
+        return pagina
+
+    def agotado(self, pagina):
+        """True si ya se sabe que `pagina` está más allá de la última con resultados."""
+        return self.fin is not None and pagina >= self.fin
+
+    def marcar(self, pagina, rutas):
+        """Registra la página como completada con el hash de sus archivos descargados."""
+        hashes = {os.path.abspath(r): hash_archivo(r) for r in rutas}
+        with self.candado:
+            self.paginas[pagina] = hashes
+            self.en_disco[pagina] = True
+            self._guardar()
+
+    def marcar_fin(self, pagina):
+        """`pagina` ya no tiene resultados: las corridas siguientes no pasan de ahí."""
+        with self.candado:
+            self.fin = pagina if self.fin is None else min(self.fin, pagina)
+            self._guardar()
+
+    def _guardar(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+        datos = {"sitio": self.sitio, "query": self.query, "fin": self.fin,
+                 "paginas": {str(p): h for p, h in sorted(self.paginas.items())}}
+        tmp = self.ruta + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(datos, fh, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.ruta)
+
+
+# === RECORRIDO REANUDABLE ===
+REINICIOS = 3   # veces que se abre otro navegador e inicia sesión antes de rendirse
+
+
+class SesionPerdida(Exception):
+    """La página de resultados redirigió fuera del sitio (al login del SSO)."""
+
+
+def recorrer_paginas(driver, esperas, url_pagina, resultado, vacio, descargar, control=None, ingesta=None,
+                     desde=1):
+    """
+    Recorre las páginas abriéndolas por URL (url_pagina(i)), empezando en
+    la primera que el `control` no tenga completada. descargar(i) baja la
+    página abierta y devuelve sus rutas, que se marcan en el control y se
+    ponen en la `ingesta`. Termina en la primera página que muestra el
+    aviso `vacio` (sin resultados), la única que se guarda como fin. Si la
+    espera se agota en otro sitio lanza SesionPerdida; en el mismo sitio
+    propaga el TimeoutException, que correr_reanudable reintenta.
+    """
+    registro = esperas.registro
+    i = control.primera_pendiente(desde) if control else desde
+    if i > desde:
+        print(f"↻ Páginas {desde}–{i - 1} ya descargadas; se sigue en la {i}.")
+    while not (control and control.agotado(i)):
+        if control and control.completada(i):
+            i += 1
+            continue
+        url = url_pagina(i)
+        driver.get(url)
+        try:
+            hay = esperas.resultados(resultado, vacio)
+        except TimeoutException:
+            if urlsplit(driver.current_url).netloc != urlsplit(url).netloc:
+                raise SesionPerdida(f"la página {i} redirigió a {driver.current_url}")
+            raise   # página lenta o caída momentánea: no es el final
+        if not hay:
+            if control:
+                control.marcar_fin(i)
+            break
+        with registro.pagina(i):
+            rutas = descargar(i)
+        if control:
+            control.marcar(i, rutas)
+        if ingesta is not None:   # se procesa mientras se descarga la página siguiente
+            ingesta.poner(*rutas)
+        i += 1
+
+
+def correr_reanudable(crear_driver, iniciar_sesion, scrape, reinicios=REINICIOS):
+    """
+    scrape(driver, base) con un navegador recién abierto y la sesión
+    iniciada (iniciar_sesion(driver) → URL base). Si el navegador se cae o
+    la sesión caduca, lo cierra, abre otro, vuelve a iniciar sesión y repite:
+    el punto de control hace que scrape siga en la primera página pendiente.
+    """
+    for intento in range(reinicios + 1):
+        driver = crear_driver()
+        try:
+            return scrape(driver, iniciar_sesion(driver))
+        except (SesionPerdida, WebDriverException) as e:
+            motivo = e if isinstance(e, SesionPerdida) else (e.msg or type(e).__name__)
+            if intento == reinicios:
+                raise
+            print(f"⚠️ Se perdió la sesión o el navegador ({motivo}); "
+                  f"reintento {intento + 1}/{reinicios} desde el punto de control.")
+        finally:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass   # Chrome ya no estaba
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scrape_fixtures.py
+
+Servidor HTTP local con páginas de prueba que imitan las de resultados de
+IEEE Xplore y ScienceDirect (scripts/fixtures/). Reproducen los
+elementos y rutas XPath que usan los scrapers, con latencia aleatoria y
+descargas simuladas, para probar el flujo sin login ni red:
+
+    python scrape_IEEE.py --fixture
+    python scrape_SD.py --fixture
+
+Parámetros de las páginas (en la URL): paginas (número de páginas de
+resultados, 3 por defecto) y lat (latencia máxima simulada en ms, 300).
+
+servir_export() arranca además un servidor de exportación falso para
+export_client.py: devuelve el CSV de la página pageNumber solo si llega la
+cookie de sesión, y contesta 429/503 al azar para ejercitar los reintentos.
+"""
+import os
+import time
+import random
+import threading
+from functools import partial
+from urllib.parse import urlencode, urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler, BaseHTTPRequestHandler
+
+DIR_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# cookie que exige el servidor de exportación falso (formato de Selenium/CDP)
+COOKIE_EXPORT = {"name": "ERIGHTS", "value": "fixture", "domain": "127.0.0.1", "path": "/"}
+
+
+class _Silencioso(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def servir(directorio=DIR_FIXTURES, puerto=0):
+    """Arranca el servidor en un hilo. Devuelve (servidor, url_base); cerrar con servidor.shutdown()."""
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), partial(_Silencioso, directory=directorio))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def url_busqueda(url_base, sitio, paginas=3, lat=300):
+    """URL de la página de búsqueda de prueba de `sitio` ('ieee' o 'sd')."""
+    return f"{url_base}/{sitio}/search.html?" + urlencode({"paginas": paginas, "lat": lat})
+
+
+def url_resultados(url_base, sitio, pagina, paginas=3, lat=300):
+    """URL de la página `pagina` de resultados de prueba de `sitio`, abierta directamente."""
+    return f"{url_base}/{sitio}/results.html?" + urlencode({"page": pagina, "paginas": paginas, "lat": lat})
+
+
+# === SERVIDOR DE EXPORTACIÓN FALSO ===
+def csv_resultados(pagina, filas):
+    """Mismo CSV que csvResultados() de fixtures/fixture.js."""
+    lineas = ['"Document Title","Authors","Abstract","Publication Year","DOI"']
+    for i in range(1, filas + 1):
+        lineas.append(f'"Fixture result {pagina}-{i}","Autor {i}","Abstract of result {i} on page {pagina}.",'
+                      f'"2024","10.0000/fixture.{pagina}.{i}"')
+    return "\n".join(lineas) + "\n"
+
+
+class _Export(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, para comprobar el pool de conexiones
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, estado, cuerpo=b"", cabeceras=None):
+        self.send_response(estado)
+        for k, v in (cabeceras or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        s = self.server
+        with s.candado:
+            s.peticiones += 1
+            s.activas += 1
+            s.max_simultaneas = max(s.max_simultaneas, s.activas)
+            s.conexiones.add(self.client_address)
+        try:
+            time.sleep(random.uniform(0, s.lat / 1000))
+            cookie = f"{COOKIE_EXPORT['name']}={COOKIE_EXPORT['value']}"
+            if cookie not in self.headers.get("Cookie", ""):
+                return self._responder(401, b"sesion requerida")
+            with s.candado:
+                forzado = s.errores.pop(0) if s.errores else None
+            if forzado or random.random() < s.fallos:
+                return self._responder(forzado or random.choice((429, 503)), b"", {"Retry-After": "0"})
+            params = parse_qs(urlsplit(self.path).query)
+            pagina = int(params.get("pageNumber", ["1"])[0])
+            filas = s.filas if pagina <= s.paginas else 0   # más allá de la última página: solo cabecera
+            self._responder(200, csv_resultados(pagina, filas).encode("utf-8"), {"Content-Type": "text/csv"})
+        finally:
+            with s.candado:
+                s.activas -= 1
+
+
+def servir_export(paginas=20, filas=25, fallos=0.2, lat=200, puerto=0, errores=()):
+    """
+    Servidor de exportación falso en un hilo. Devuelve (servidor, url_base).
+    Además de la fracción `fallos` de 429/503 al azar, contesta con los
+    estados de `errores` (p. ej. (429, 503)) a las primeras peticiones con
+    cookie, para pruebas deterministas. El servidor cuenta peticiones,
+    conexiones distintas y el máximo de peticiones simultáneas (max_simultaneas).
+    """
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), _Export)
+    servidor.daemon_threads = True
+    servidor.paginas, servidor.filas, servidor.fallos, servidor.lat = paginas, filas, fallos, lat
+    servidor.errores = list(errores)
+    servidor.candado = threading.Lock()
+    servidor.peticiones = servidor.activas = servidor.max_simultaneas = 0
+    servidor.conexiones = set()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
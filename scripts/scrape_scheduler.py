@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scrape_scheduler.py
+
+Scraping concurrente de IEEE Xplore y ScienceDirect con varias sesiones
+de navegador autenticadas.
+
+  1. Se inicia sesión una sola vez (login_uni de cada sitio) en un
+     navegador visible y se copian todas sus cookies.
+  2. N workers, cada uno con su Chrome headless, reciben esas cookies y su
+     propia carpeta de descargas (no se pisan los archivos de otro worker).
+  3. Los workers toman tareas de una cola: un rango de páginas de un sitio
+     o un sitio entero. En un sitio entero, la primera página que se abre
+     dice cuántos resultados hay (TOTAL del scraper); el resto de páginas
+     se reparte entonces en tareas de --bloque páginas para todos los
+     workers. Si no se puede leer el total, el sitio se recorre en orden
+     con un solo worker. Cada página se abre directamente por URL (sin ir
+     pulsando 'siguiente'), se descarga con descargar_pagina() del
+     scraper y sus archivos se mueven a data/ y articles/; de ahí pasan
+     a la cola de ingesta (ingest_queue.py), que fusiona y unifica cada
+     página mientras los workers siguen descargando (--sin-ingesta lo omite).
+     Las páginas que ya están en el punto de control de cada sitio
+     (scrape_checkpoint.py) se saltan, así una corrida cortada se reanuda.
+  4. Los workers no cargan imágenes, hojas de estilo ni fuentes.
+
+Al final se informa el rendimiento en páginas por minuto, total y por
+worker. Con --mock todo corre contra las páginas de prueba locales
+(scrape_fixtures), sin login ni red:
+
+    python scrape_scheduler.py --sitios ieee sd --workers 3 --paginas 1-40 --bloque 5
+    python scrape_scheduler.py --mock --workers 3 --paginas 1-12
+"""
+import os
+import re
+import math
+import time
+import queue
+import shutil
+import argparse
+import threading
+from functools import partial
+
+from selenium import webdriver
+from selenium.common import TimeoutException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+import scrape_IEEE
+import scrape_SD
+from scrape_waits import Esperas, RegistroLatencias, LATENCIAS_CSV
+from export_client import cookies_driver
+from ingest_queue import ColaIngesta, informe
+from scrape_checkpoint import PuntoControl
+
+SITIOS = {"ieee": scrape_IEEE, "sd": scrape_SD}
+WORKERS = 3
+BLOQUE = 5   # páginas por tarea al repartir un rango
+REINTENTOS_PAGINA = 2   # veces que se vuelve a encolar una página cuya espera de resultados se agotó
+MAX_SIN_RESPUESTA = 3   # timeouts seguidos que cortan una tarea sin fin conocido (hasta=None)
+ESPERA_COLA = 0.2       # s entre miradas a la cola vacía mientras otro worker puede encolar más
+
+# recursos que los workers no descargan
+BLOQUEADOS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+              "*.css", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+
+# campos que admite Network.setCookies
+CAMPOS_COOKIE = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+_TOTAL = re.compile(r"(\d[\d,.]*)\s+results?\b", re.IGNORECASE)
+
+_ruta_driver = None
+_candado_driver = threading.Lock()
+
+
+# === NAVEGADORES ===
+def crear_driver(headless=True, bloquear=True):
+    """Chrome (headless por defecto) que no carga imágenes, CSS ni fuentes."""
+    global _ruta_driver
+    with _candado_driver:   # ChromeDriverManager una sola vez para todos los workers
+        if _ruta_driver is None:
+            _ruta_driver = ChromeDriverManager().install()
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    if bloquear:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    driver = webdriver.Chrome(service=Service(_ruta_driver), options=options)
+    if bloquear:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOQUEADOS})
+    return driver
+
+
+def cookies_sesion(driver):
+    """Todas las cookies del navegador (de todos los dominios), listas para cargar_cookies()."""
+    limpias = []
+    for c in cookies_driver(driver):
+        limpia = {k: c[k] for k in CAMPOS_COOKIE if k in c}
+        if c.get("session"):
+            limpia.pop("expires", None)
+        limpias.append(limpia)
+    return limpias
+
+
+def cargar_cookies(driver, cookies):
+    if cookies:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
+
+def iniciar_sesiones(sitios):
+    """
+    Login en un navegador visible para cada sitio. Devuelve (cookies,
+    {sitio: url base}); la URL base es la del sitio tras el SSO.
+    """
+    driver = scrape_IEEE.init_driver()
+    bases = {}
+    try:
+        for n, sitio in enumerate(sitios):
+            if n:
+                driver.switch_to.new_window("tab")
+            bases[sitio] = SITIOS[sitio].iniciar_sesion(driver)
+            print(f"✔ Sesión iniciada en {sitio}: {bases[sitio]}")
+        return cookies_sesion(driver), bases
+    finally:
+        driver.quit()
+
+
+def paginas_totales(driver, modulo):
+    """
+    Páginas de resultados de la búsqueda abierta, a partir del total que
+    muestra el sitio (modulo.TOTAL, "… of 2,345 results") y de los
+    resultados de esta página. None si no se encuentra el total.
+    """
+    textos = " ".join(e.text for e in driver.find_elements(*modulo.TOTAL))
+    encontrados = _TOTAL.findall(textos)
+    filas = len(driver.find_elements(*modulo.RESULTADO))
+    if not encontrados or not filas:
+        return None
+    total = int(re.sub(r"[,.]", "", encontrados[-1]))
+    return max(1, math.ceil(total / filas))
+
+
+# === PLANIFICADOR ===
+class Planificador:
+    """
+    Cola de tareas (sitio, desde, hasta) y N workers. `urls` da, por sitio,
+    la función página → URL de resultados. hasta=None recorre el sitio
+    hasta la primera página sin resultados, o hasta su última página según
+    el total, repartiendo las que siguen en tareas de `bloque` páginas. Con `ingesta` (ColaIngesta) los
+    archivos de cada página se ponen en ella al moverlos. `controles` da,
+    por sitio, su PuntoControl: las páginas completadas se saltan y las
+    nuevas se marcan en él. Las latencias por página van a `latencias_csv`.
+    """
+
+    def __init__(self, urls, workers=WORKERS, cookies=None, data_dir=scrape_IEEE.DATA_DIR,
+                 articles_dir=scrape_IEEE.ARTICLES_DIR, headless=True, ingesta=None, controles=None,
+                 latencias_csv=LATENCIAS_CSV, bloque=BLOQUE):
+        self.urls = urls
+        self.workers = workers
+        self.bloque = bloque
+        self.cookies = cookies
+        self.data_dir = data_dir
+        self.articles_dir = articles_dir
+        self.headless = headless
+        self.ingesta = ingesta
+        self.controles = controles or {}
+        self.latencias_csv = latencias_csv
+        self.tareas = queue.Queue()
+        self.fin = {}                 # sitio → primera página sin resultados
+        self.candado = threading.Lock()
+        self.paginas = {}             # worker → páginas descargadas
+        self.fallidas = []            # (sitio, página, error)
+        self.intentos = {}            # (sitio, página) → reintentos encolados
+        self.en_curso = 0             # tareas tomadas y sin terminar (pueden encolar más)
+
+    def agregar_rango(self, sitio, desde, hasta, bloque=None):
+        """Reparte las páginas desde..hasta de `sitio` en tareas de `bloque` páginas."""
+        bloque = bloque or self.bloque
+        for inicio in range(desde, hasta + 1, bloque):
+            self.tareas.put((sitio, inicio, min(inicio + bloque - 1, hasta)))
+
+    def agregar_sitio(self, sitio, desde=1):
+        """Una tarea para `sitio` entero; se reparte en cuanto su primera página da el total."""
+        self.tareas.put((sitio, desde, None))
+
+    def _tomar(self):
+        """
+        Siguiente tarea, o None cuando la cola está vacía y ningún worker
+        tiene una en curso (un sitio entero que se reparte o una página que
+        se reintenta todavía pueden encolar más).
+        """
+        while True:
+            with self.candado:
+                try:
+                    tarea = self.tareas.get_nowait()
+                    self.en_curso += 1
+                    return tarea
+                except queue.Empty:
+                    if not self.en_curso:
+                        return None
+            time.sleep(ESPERA_COLA)
+
+    def _agotado(self, sitio, pagina):
+        control = self.controles.get(sitio)
+        if control and control.agotado(pagina):
+            return True
+        with self.candado:
+            return sitio in self.fin and pagina >= self.fin[sitio]
+
+    def _marcar_fin(self, sitio, pagina):
+        with self.candado:
+            self.fin[sitio] = min(pagina, self.fin.get(sitio, pagina))
+        if sitio in self.controles:
+            self.controles[sitio].marcar_fin(pagina)
+
+    def _reintentar(self, sitio, pagina, error):
+        """Anota la página como fallida y, si le quedan reintentos, la vuelve a encolar sola."""
+        with self.candado:
+            self.fallidas.append((sitio, pagina, error))
+            n = self.intentos.get((sitio, pagina), 0)
+            if n >= REINTENTOS_PAGINA:
+                return
+            self.intentos[(sitio, pagina)] = n + 1
+        self.tareas.put((sitio, pagina, pagina))
+
+    def _recuperada(self, sitio, pagina):
+        """Una página reintentada se descargó: deja de contar como fallida."""
+        with self.candado:
+            if (sitio, pagina) in self.intentos:
+                self.fallidas = [f for f in self.fallidas if f[:2] != (sitio, pagina)]
+
+    def _repartir(self, driver, sitio, pagina):
+        """
+        Con la página `pagina` de un sitio entero abierta, encola las
+        siguientes hasta la última según el total y devuelve `pagina` (la
+        tarea actual solo hace esa). None si el sitio no muestra el total.
+        """
+        ultima = paginas_totales(driver, SITIOS[sitio])
+        if ultima is None:
+            print(f"⚠️ {sitio}: no se encontró el total de resultados; se recorre con un solo worker.")
+            return None
+        print(f"→ {sitio}: {ultima} páginas; se reparten las {pagina + 1}–{ultima} entre los workers.")
+        if ultima > pagina:
+            self.agregar_rango(sitio, pagina + 1, ultima)
+        return pagina
+
+    def _mover(self, rutas):
+        """Lleva los archivos del worker a articles/ (zip) o data/ (el resto) y los pasa a la ingesta."""
+        movidos = []
+        for ruta in rutas:
+            destino = self.articles_dir if ruta.endswith(".zip") else self.data_dir
+            os.makedirs(destino, exist_ok=True)
+            movidos.append(shutil.move(ruta, os.path.join(destino, os.path.basename(ruta))))
+        if self.ingesta is not None:
+            self.ingesta.poner(*movidos)
+        return movidos
+
+    def _worker(self, k):
+        base = os.path.join(self.data_dir, f".worker_{k}")
+        data_dir, articles_dir = os.path.join(base, "data"), os.path.join(base, "articles")
+        os.makedirs(data_dir, exist_ok=True)
+        os.makedirs(articles_dir, exist_ok=True)
+        driver = crear_driver(self.headless)
+        self.paginas[k] = 0
+        esperas_sitio = {}   # por sitio, así los timeouts adaptativos aprenden entre tareas
+        try:
+            cargar_cookies(driver, self.cookies)
+            while True:
+                tarea = self._tomar()
+                if tarea is None:
+                    break
+                try:
+                    self._tarea(k, driver, esperas_sitio, *tarea, data_dir, articles_dir)
+                finally:
+                    with self.candado:
+                        self.en_curso -= 1
+        finally:
+            for esperas in esperas_sitio.values():
+                esperas.cerrar()
+                esperas.registro.resumen()
+            driver.quit()
+            shutil.rmtree(base, ignore_errors=True)
+
+    def _tarea(self, k, driver, esperas_sitio, sitio, desde, hasta, data_dir, articles_dir):
+        """Páginas desde..hasta de `sitio` con el navegador del worker k (hasta=None: sitio entero)."""
+        modulo = SITIOS[sitio]
+        if sitio not in esperas_sitio:
+            esperas_sitio[sitio] = Esperas(driver, RegistroLatencias(f"{sitio} w{k}", self.latencias_csv))
+        esperas = esperas_sitio[sitio]
+        registro = esperas.registro
+        control = self.controles.get(sitio)
+        pagina = desde
+        sin_respuesta = 0
+        while (hasta is None or pagina <= hasta) and not self._agotado(sitio, pagina):
+            if control and control.completada(pagina):
+                pagina += 1
+                continue
+            driver.get(self.urls[sitio](pagina))
+            try:
+                hay = esperas.resultados(modulo.RESULTADO, modulo.SIN_RESULTADOS)
+            except TimeoutException as e:
+                # lenta o caída, no necesariamente el final: se reintenta más tarde
+                print(f"⚠️ {sitio} página {pagina} (worker {k}): sin respuesta, se reintentará")
+                self._reintentar(sitio, pagina, str(e))
+                sin_respuesta += 1
+                if hasta is None and sin_respuesta >= MAX_SIN_RESPUESTA:
+                    break
+                pagina += 1
+                continue
+            sin_respuesta = 0
+            if not hay:   # la página dice que no hay resultados: este sí es el final
+                self._marcar_fin(sitio, pagina)
+                break
+            if hasta is None:
+                hasta = self._repartir(driver, sitio, pagina)
+            try:
+                with registro.pagina(pagina):
+                    rutas = self._mover(modulo.descargar_pagina(driver, esperas, pagina,
+                                                                data_dir, articles_dir))
+                if control:
+                    control.marcar(pagina, rutas)
+                self.paginas[k] += 1
+                self._recuperada(sitio, pagina)
+            except Exception as e:   # una página fallida no detiene al worker
+                print(f"❌ {sitio} página {pagina} (worker {k}): {e}")
+                with self.candado:
+                    self.fallidas.append((sitio, pagina, str(e)))
+            pagina += 1
+
+    def ejecutar(self):
+        """Lanza los workers y espera a que se vacíe la cola. Devuelve el resumen."""
+        t0 = time.perf_counter()
+        hilos = [threading.Thread(target=self._worker, args=(k,), name=f"worker-{k}")
+                 for k in range(self.workers)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        minutos = (time.perf_counter() - t0) / 60
+        total = sum(self.paginas.values())
+        return {
+            "paginas": total,
+            "minutos": minutos,
+            "paginas_min": total / minutos if minutos else 0.0,
+            "por_worker": dict(self.paginas),
+            # una entrada por página (con su último error), aunque se haya reintentado
+            "fallidas": [(s, p, e) for (s, p), e in {f[:2]: f[2] for f in self.fallidas}.items()],
+        }
+
+
+def rango_paginas(texto):
+    """'1-40' → (1, 40); '7' → (7, 7). Para argparse."""
+    desde, _, hasta = texto.partition("-")
+    return int(desde), int(hasta or desde)
+
+
+# === PROGRAMA PRINCIPAL ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraping concurrente de IEEE y ScienceDirect.")
+    parser.add_argument("--sitios", nargs="+", choices=list(SITIOS), default=list(SITIOS))
+    parser.add_argument("--workers", type=int, default=WORKERS, help="navegadores headless en paralelo")
+    parser.add_argument("--paginas", type=rango_paginas, default=None,
+                        help="rango de páginas (p. ej. 1-40) repartido en tareas de --bloque páginas; "
+                             "sin él, cada sitio se reparte igual según el total de su primera página")
+    parser.add_argument("--bloque", type=int, default=BLOQUE, help="páginas por tarea")
+    parser.add_argument("--mock", action="store_true",
+                        help="usa el servidor local de páginas de prueba (sin login) para medir páginas/min")
+    parser.add_argument("--mock-paginas", type=int, default=12, help="páginas de resultados del mock")
+    parser.add_argument("--lat", type=int, default=300, help="latencia máxima simulada del mock (ms)")
+    parser.add_argument("--sin-ingesta", action="store_true",
+                        help="no fusiona/unifica mientras descarga (correr merge_csvs.py y unify_entries.py después)")
+    parser.add_argument("--desde-cero", action="store_true",
+                        help="ignora los puntos de control de los sitios y descarga todas las páginas")
+    args = parser.parse_args()
+
+    if args.mock:
+        import tempfile
+        from scrape_fixtures import servir, url_resultados
+
+        servidor, url_base = servir()
+        urls = {s: partial(url_resultados, url_base, s, paginas=args.mock_paginas, lat=args.lat)
+                for s in args.sitios}
+        salida = tempfile.mkdtemp(prefix="scheduler_mock_")
+        data_dir = os.path.join(salida, "data")
+        ingesta = None if args.sin_ingesta else ColaIngesta(data_dir, os.path.join(salida, "outputs"))
+        controles = {s: PuntoControl(os.path.join(salida, f"checkpoint_{s}.json"), s, SITIOS[s].QUERY)
+                     for s in args.sitios}
+        planificador = Planificador(urls, args.workers, data_dir=data_dir,
+                                    articles_dir=os.path.join(salida, "articles"), ingesta=ingesta,
+                                    controles=controles, bloque=args.bloque,
+                                    latencias_csv=os.path.join(salida, "scrape_latencias.csv"))
+    else:
+        cookies, bases = iniciar_sesiones(args.sitios)
+        urls = {s: partial(SITIOS[s].url_resultados, base=bases[s]) for s in args.sitios}
+        ingesta = None if args.sin_ingesta else ColaIngesta()
+        controles = {}
+        for s in args.sitios:
+            if args.desde_cero and os.path.exists(SITIOS[s].CHECKPOINT):
+                os.remove(SITIOS[s].CHECKPOINT)
+            controles[s] = PuntoControl(SITIOS[s].CHECKPOINT, s, SITIOS[s].QUERY)
+        planificador = Planificador(urls, args.workers, cookies, ingesta=ingesta, controles=controles,
+                                    bloque=args.bloque)
+
+    for sitio in args.sitios:
+        if args.paginas:
+            planificador.agregar_rango(sitio, *args.paginas)
+        else:
+            planificador.agregar_sitio(sitio)
+
+    resumen = planificador.ejecutar()
+    if ingesta is not None:
+        print(informe(ingesta.cerrar()))
+    if args.mock:
+        servidor.shutdown()
+        print(f"→ Descargas del mock en {salida}")
+    print(f"✔ {resumen['paginas']} páginas en {resumen['minutos']:.2f} min "
+          f"→ {resumen['paginas_min']:.1f} páginas/min con {args.workers} workers")
+    for k, n in sorted(resumen["por_worker"].items()):
+        print(f"  worker {k}: {n} páginas ({n / resumen['minutos']:.1f}/min)")
+    if resumen["fallidas"]:
+        print(f"⚠️ {len(resumen['fallidas'])} páginas fallidas: "
+              + ", ".join(f"{s} {p}" for s, p, _ in resumen["fallidas"]))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scrape_waits.py
+
+Esperas por condición para los scrapers (scrape_IEEE.py, scrape_SD.py),
+en lugar de time.sleep fijos: cada paso espera exactamente a que la página
+esté lista (elemento presente o clicable, modal cerrado, descarga
+terminada) y nada más.
+
+Todos los tiempos están en TIEMPOS y se pueden cambiar sin tocar código
+con variables de entorno SCRAPE_<CLAVE> (p. ej. SCRAPE_DESCARGA=180).
+Los timeouts son adaptativos: tras unas cuantas esperas de un mismo tipo
+el límite pasa a ser `factor` veces la mayor latencia reciente (con un
+suelo de `minimo` segundos y el valor de TIEMPOS como techo); si una espera
+agota ese límite ajustado se concede una vez el resto hasta el techo antes
+de fallar.
+
+Las descargas no se sondean: download_watcher.VigilanteDescargas avisa en
+cuanto el archivo está completo y lo asocia con el pedido de la página que
+lo inició (pedir_descarga() antes del clic, descarga() después).
+
+RegistroLatencias mide cada paso de cada página de resultados, lo imprime
+y lo añade a outputs/scrape_latencias.csv para ver en qué se va el tiempo;
+al terminar resume los percentiles p50/p90/p99 de cada paso.
+"""
+import os
+import csv
+import time
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from selenium.common import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from download_watcher import VigilanteDescargas
+
+# — Tiempos (segundos) —
+TIEMPOS = {
+    "elemento": 20,   # aparición o clic de un elemento
+    "pagina": 30,     # resultados tras buscar o cambiar de página
+    "modal": 10,      # cierre de un modal
+    "descarga": 90,   # archivo descargado por completo
+    "sondeo": 0.2,    # intervalo entre comprobaciones
+    "minimo": 2,      # suelo del timeout adaptativo
+    "factor": 3,      # timeout adaptativo = factor × mayor latencia reciente
+}
+for _clave in TIEMPOS:
+    if os.getenv(f"SCRAPE_{_clave.upper()}"):
+        TIEMPOS[_clave] = float(os.environ[f"SCRAPE_{_clave.upper()}"])
+
+VENTANA = 20          # latencias recientes que cuentan para el timeout adaptativo
+MIN_OBSERVACIONES = 3 # esperas de un tipo antes de empezar a ajustar su timeout
+LATENCIAS_CSV = os.path.join(os.path.dirname(__file__), "outputs", "scrape_latencias.csv")
+PERCENTILES = (50, 90, 99)
+
+
+# === REGISTRO DE LATENCIAS ===
+class RegistroLatencias:
+    """Duración de cada paso, agrupada por página de resultados."""
+
+    _candado = threading.Lock()   # varios workers escriben el mismo CSV
+
+    def __init__(self, sitio, ruta_csv=LATENCIAS_CSV):
+        self.sitio = sitio
+        self.ruta_csv = ruta_csv
+        self.pasos = None
+        self.historial = defaultdict(list)   # paso → segundos de todas las páginas ("total" incluido)
+
+    def paso(self, nombre, segundos):
+        if self.pasos is not None:
+            self.pasos.append((nombre, segundos))
+
+    @contextmanager
+    def pagina(self, numero):
+        self.pasos = []
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            total = time.perf_counter() - t0
+            lentos = sorted(self.pasos, key=lambda p: p[1], reverse=True)[:3]
+            detalle = ", ".join(f"{n} {s:.1f}s" for n, s in lentos)
+            print(f"⏱ {self.sitio} página {numero}: {total:.1f}s ({detalle})")
+            self._guardar(numero, total)
+            for nombre, segundos in self.pasos + [("total", total)]:
+                self.historial[nombre].append(segundos)
+            self.pasos = None
+
+    def percentiles(self, ps=PERCENTILES):
+        """{paso: {p: segundos}} sobre las páginas medidas (interpolación lineal, como numpy)."""
+        return {nombre: dict(zip(ps, np.percentile(segundos, ps).tolist()))
+                for nombre, segundos in self.historial.items()}
+
+    def resumen(self, ps=PERCENTILES):
+        """Imprime los percentiles de cada paso, del más lento (según el mayor percentil) al más rápido."""
+        tabla = self.percentiles(ps)
+        if not tabla:
+            return
+        print(f"⏱ {self.sitio}, {len(self.historial['total'])} página(s):")
+        for nombre, valores in sorted(tabla.items(), key=lambda x: -x[1][ps[-1]]):
+            print(f"   {nombre:<24} " + " ".join(f"p{p} {v:.1f}s" for p, v in valores.items()))
+
+    def _guardar(self, numero, total):
+        if not self.ruta_csv:
+            return
+        os.makedirs(os.path.dirname(self.ruta_csv) or ".", exist_ok=True)
+        with self._candado, open(self.ruta_csv, "a", newline="", encoding="utf-8") as fh:
+            nuevo = fh.tell() == 0
+            w = csv.writer(fh)
+            if nuevo:
+                w.writerow(["fecha", "sitio", "pagina", "paso", "segundos"])
+            fecha = time.strftime("%Y-%m-%d %H:%M:%S")
+            for nombre, segundos in self.pasos:
+                w.writerow([fecha, self.sitio, numero, nombre, f"{segundos:.3f}"])
+            w.writerow([fecha, self.sitio, numero, "total", f"{total:.3f}"])
+
+
+# === ESPERAS ===
+class Esperas:
+    """Esperas explícitas sobre un driver con timeouts adaptativos por tipo."""
+
+    def __init__(self, driver, registro=None, tiempos=None):
+        self.driver = driver
+        self.registro = registro
+        self.tiempos = dict(TIEMPOS, **(tiempos or {}))
+        self.observadas = defaultdict(lambda: deque(maxlen=VENTANA))
+        self.vigilantes = {}   # carpeta de descargas → VigilanteDescargas
+
+    def timeout(self, tipo):
+        techo = self.tiempos[tipo]
+        vistas = self.observadas[tipo]
+        if len(vistas) < MIN_OBSERVACIONES:
+            return techo
+        return min(techo, max(self.tiempos["minimo"], self.tiempos["factor"] * max(vistas)))
+
+    def _medir(self, hasta, paso, tipo):
+        """
+        Llama a hasta(segundos), que debe lanzar TimeoutException si se le
+        acaba el tiempo, con el timeout adaptativo de `tipo`; registra cuánto tardó.
+        """
+        t0 = time.perf_counter()
+        limite = self.timeout(tipo)
+        try:
+            resultado = hasta(limite)
+        except TimeoutException:
+            resto = self.tiempos[tipo] - limite
+            if resto <= 0:
+                raise TimeoutException(f"{paso}: sin respuesta en {limite:.0f}s")
+            print(f"⚠️ {paso}: más lento de lo habitual (> {limite:.1f}s), esperando hasta {self.tiempos[tipo]:.0f}s")
+            resultado = hasta(resto)
+        segundos = time.perf_counter() - t0
+        self.observadas[tipo].append(segundos)
+        if self.registro:
+            self.registro.paso(paso, segundos)
+        return resultado
+
+    def esperar(self, condicion, paso, tipo="elemento"):
+        """Espera `condicion` (callable que recibe el driver) y registra cuánto tardó."""
+        sondeo = self.tiempos["sondeo"]
+        return self._medir(lambda s: WebDriverWait(self.driver, s, poll_frequency=sondeo).until(condicion),
+                           paso, tipo)
+
+    # --- atajos ---
+    def presente(self, localizador, paso, tipo="elemento"):
+        return self.esperar(EC.presence_of_element_located(localizador), paso, tipo)
+
+    def clicable(self, localizador, paso, tipo="elemento"):
+        return self.esperar(EC.element_to_be_clickable(localizador), paso, tipo)
+
+    def click(self, localizador, paso, tipo="elemento"):
+        elemento = self.clicable(localizador, paso, tipo)
+        elemento.click()
+        return elemento
+
+    def escribir(self, localizador, texto, paso):
+        elemento = self.clicable(localizador, paso)
+        elemento.send_keys(texto)
+        return elemento
+
+    def invisible(self, localizador, paso):
+        return self.esperar(EC.invisibility_of_element_located(localizador), paso, "modal")
+
+    def resultados(self, resultado, vacio, paso="resultados"):
+        """
+        Espera a que la página muestre `resultado` o el aviso `vacio` de que
+        no hay resultados. True si hay resultados, False si la página está
+        vacía; un timeout no dice nada sobre el final y se propaga.
+        """
+        self.esperar(EC.any_of(EC.presence_of_element_located(resultado),
+                               EC.presence_of_element_located(vacio)), paso, "pagina")
+        return bool(self.driver.find_elements(*resultado))
+
+    def recargada(self, elemento, paso):
+        """La página (o la lista de resultados) se volvió a pintar: `elemento` ya no está en el DOM."""
+        return self.esperar(EC.staleness_of(elemento), paso, "pagina")
+
+    # --- descargas ---
+    def pedir_descarga(self, directorio, patron="*"):
+        """Pedido de la próxima descarga completa en `directorio`. Llamar ANTES del clic que la inicia."""
+        directorio = os.path.abspath(directorio)
+        if directorio not in self.vigilantes:
+            self.vigilantes[directorio] = VigilanteDescargas(directorio)
+        return self.vigilantes[directorio].pedir(patron)
+
+    def descarga(self, pedido, paso, destino):
+        """
+        Espera el archivo del `pedido` y lo renombra atómicamente a `destino`
+        (una ruta o una función de la ruta descargada). Devuelve la ruta final.
+        """
+        def hasta(segundos):
+            if pedido.esperar(segundos) is None:
+                raise TimeoutException(f"{paso}: la descarga no terminó en {segundos:.0f}s")
+        try:
+            self._medir(hasta, paso, "descarga")
+        except TimeoutException:
+            pedido.vigilante.cancelar(pedido)   # si llega tarde no se asigna a otra página
+            raise
+        if callable(destino):
+            destino = destino(pedido.ruta)
+        return pedido.vigilante.entregar(pedido, destino)
+
+    def cerrar(self):
+        """Detiene los vigilantes de descargas."""
+        for vigilante in self.vigilantes.values():
+            vigilante.cerrar()
+        self.vigilantes.clear()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sparse_similarity.py
+
+Similitudes entre documentos calculadas directamente sobre matrices
+dispersas (CSR), por bloques de filas para acotar la memoria pico.
+
+Coseno: grafo kNN disperso (los k vecinos más similares de cada documento
+o los que superan un umbral), calculado por bloques en un pool de
+procesos; la matriz n × n completa solo se materializa si se pide, y
+entonces en un memmap en disco.
+
+Jaccard exacto: intersecciones con el producto disperso B·Bᵀ del bloque y
+uniones con el número de términos de cada fila; nunca se densifica la
+matriz documentos × vocabulario. Devuelve la forma condensada de scipy
+(la que espera `linkage`), opcionalmente en un memmap en disco.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+BLOQUE = 2000       # filas por bloque
+K_VECINOS = 20      # vecinos por documento en el grafo kNN
+SEMILLA = 1
+
+
+# === UTILIDADES ===
+def binaria(X):
+    """CSR con 1 en cada posición no nula de X."""
+    B = sparse.csr_matrix(X, dtype=np.float32, copy=True)
+    B.eliminate_zeros()
+    B.data[:] = 1
+    return B
+
+def _inicio_fila(i, n):
+    """Posición en la forma condensada del par (i, i + 1)."""
+    return i * n - i * (i + 1) // 2
+
+def vector_condensado(n, ruta_memmap=None, dtype=np.float64):
+    """Vector para n·(n-1)/2 distancias, en memoria o en un memmap en `ruta_memmap`."""
+    m = n * (n - 1) // 2
+    if ruta_memmap:
+        return np.memmap(ruta_memmap, dtype=dtype, mode="w+", shape=(m,))
+    return np.empty(m, dtype=dtype)
+
+def _volcar_bloque(salida, D, i0, n):
+    """Copia el triángulo superior (j > i) de un bloque de filas i0.. ya recortado a columnas i0..n."""
+    for f in range(D.shape[0]):
+        i = i0 + f
+        ini = _inicio_fila(i, n)
+        salida[ini:ini + n - i - 1] = D[f, f + 1:]
+
+
+# === COSENO: GRAFO kNN ===
+_X = None
+
+def _iniciar(X):
+    global _X
+    _X = X
+
+def _vecinos_bloque(i0, i1, k, umbral):
+    """(filas, columnas, similitudes) de los vecinos de las filas i0..i1 de _X."""
+    S = (_X[i0:i1] @ _X.T).toarray()
+    S[np.arange(i1 - i0), np.arange(i0, i1)] = -np.inf   # sin la propia fila
+    if k is not None and k < S.shape[1]:
+        cols = np.argpartition(-S, k - 1, axis=1)[:, :k]
+        vals = np.take_along_axis(S, cols, axis=1)
+    else:
+        cols = np.broadcast_to(np.arange(S.shape[1]), S.shape)
+        vals = S
+    filas = np.broadcast_to(np.arange(i0, i1)[:, None], cols.shape)
+    validos = vals > (0 if umbral is None else umbral - 1e-12)
+    return filas[validos], cols[validos], vals[validos].astype(np.float32)
+
+def knn_coseno(X, k=K_VECINOS, umbral=None, bloque=BLOQUE, workers=None):
+    """
+    Grafo kNN de similitud coseno entre las filas de X como CSR n × n: en
+    cada fila, los `k` documentos más similares (k=None: todos) con
+    similitud positiva y, si se da, al menos `umbral`. Las filas se
+    normalizan a norma 1. Los bloques de filas se reparten entre `workers`
+    procesos; la memoria pico por proceso es un bloque × n.
+    """
+    X = normalize(sparse.csr_matrix(X, dtype=np.float32))
+    n = X.shape[0]
+    workers = workers or os.cpu_count() or 1
+    tramos = [(i0, min(i0 + bloque, n)) for i0 in range(0, n, bloque)]
+    if workers == 1 or len(tramos) == 1:
+        _iniciar(X)
+        partes = [_vecinos_bloque(i0, i1, k, umbral) for i0, i1 in tramos]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar, initargs=(X,)) as pool:
+            futuros = [pool.submit(_vecinos_bloque, i0, i1, k, umbral) for i0, i1 in tramos]
+            partes = [f.result() for f in futuros]
+    filas = np.concatenate([p[0] for p in partes])
+    cols = np.concatenate([p[1] for p in partes])
+    vals = np.concatenate([p[2] for p in partes])
+    return sparse.csr_matrix((vals, (filas, cols)), shape=(n, n))
+
+def similares(grafo, i, top=10):
+    """Los `top` vecinos de la fila i del grafo kNN como [(índice, similitud)], de mayor a menor."""
+    fila = grafo.getrow(i)
+    orden = np.argsort(-fila.data)[:top]
+    return list(zip(fila.indices[orden].tolist(), fila.data[orden].tolist()))
+
+def matriz_coseno_memmap(X, ruta, bloque=BLOQUE, dtype=np.float32):
+    """
+    Matriz n × n completa de similitud coseno escrita por bloques en un
+    memmap en `ruta`, para los casos que de verdad la necesitan. La memoria
+    pico es un bloque; el resto vive en disco.
+    """
+    X = normalize(sparse.csr_matrix(X, dtype=np.float32))
+    n = X.shape[0]
+    S = np.memmap(ruta, dtype=dtype, mode="w+", shape=(n, n))
+    XT = X.T.tocsc()
+    for i0 in range(0, n, bloque):
+        i1 = min(i0 + bloque, n)
+        S[i0:i1] = (X[i0:i1] @ XT).toarray()
+    S.flush()
+    return S
+
+
+# === JACCARD EXACTO ===
+def distancias_jaccard(X, bloque=BLOQUE, ruta_memmap=None):
+    """
+    Distancias de Jaccard entre las filas de X (se binariza) en forma
+    condensada. Memoria pico: un bloque de `bloque` × n además del resultado.
+    Dos filas vacías tienen distancia 0, como en scipy.
+    """
+    B = binaria(X)
+    n = B.shape[0]
+    tamanos = np.diff(B.indptr).astype(np.float64)
+    salida = vector_condensado(n, ruta_memmap)
+    BT = B.T.tocsc()
+    for i0 in range(0, n, bloque):
+        i1 = min(i0 + bloque, n)
+        inter = (B[i0:i1] @ BT[:, i0:]).toarray()
+        union = tamanos[i0:i1, None] + tamanos[None, i0:] - inter
+        with np.errstate(divide="ignore", invalid="ignore"):
+            D = np.where(union > 0, 1.0 - inter / union, 0.0)
+        _volcar_bloque(salida, D, i0, n)
+    return salida
+
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+text_preprocessing.py
+
+Preprocesamiento compartido de abstracts para los scripts de clustering:
+minúsculas, solo letras, sin stopwords (NLTK, inglés) y lematizado con
+WordNet.
+
+  - Los lemas se cachean en memoria (LRU), así cada palabra distinta se
+    lematiza una sola vez por proceso.
+  - Los documentos se reparten entre procesos.
+  - Los tokens limpios se guardan en outputs/token_cache.sqlite con una
+    huella del texto y de la configuración; en la siguiente ejecución (o en
+    otro script) solo se procesan los abstracts nuevos o modificados.
+"""
+import os
+import re
+import json
+import sqlite3
+import hashlib
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+
+CACHE_TOKENS = "outputs/token_cache.sqlite"
+VERSION = 1            # súbela si cambia preprocess(): invalida la caché
+TAM_LRU = 200000       # lemas distintos en memoria por proceso
+DOCS_POR_TAREA = 500
+MIN_PARALELO = 2000    # por debajo de esto no compensa lanzar procesos
+
+_NO_LETRAS = re.compile(r'[^a-z\s]')
+
+_stop_words = None
+_lemmatizer = None
+
+
+def _recursos():
+    """Descarga stopwords y wordnet solo si no están ya instalados."""
+    for recurso, ruta in (('stopwords', 'corpora/stopwords'), ('wordnet', 'corpora/wordnet')):
+        try:
+            nltk.data.find(ruta)
+        except LookupError:
+            nltk.download(recurso)
+
+def _iniciar():
+    global _stop_words, _lemmatizer
+    if _lemmatizer is None:
+        _recursos()
+        _stop_words = frozenset(stopwords.words('english'))
+        _lemmatizer = WordNetLemmatizer()
+
+@lru_cache(maxsize=TAM_LRU)
+def lematizar(palabra):
+    return _lemmatizer.lemmatize(palabra)
+
+
+def preprocess(text):
+    """Texto limpio: tokens lematizados separados por espacios."""
+    _iniciar()
+    text = _NO_LETRAS.sub('', str(text).lower())
+    return ' '.join(lematizar(word) for word in text.split() if word not in _stop_words)
+
+def _preprocesar_lote(textos):
+    return [preprocess(t) for t in textos]
+
+
+def huella_config():
+    """Identifica la configuración: si cambia, las huellas de la caché dejan de coincidir."""
+    _iniciar()
+    config = {'version': VERSION, 'stopwords': sorted(_stop_words), 'lematizar': 'wordnet'}
+    return hashlib.sha1(json.dumps(config).encode('utf-8')).hexdigest()
+
+def huella(texto, config):
+    return hashlib.sha1(f"{config}\0{texto}".encode('utf-8')).hexdigest()
+
+
+class CacheTokens:
+    """Tokens limpios por huella de (configuración, abstract) en SQLite."""
+
+    def __init__(self, ruta=CACHE_TOKENS):
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        self.con = sqlite3.connect(ruta)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.execute("CREATE TABLE IF NOT EXISTS tokens (huella TEXT PRIMARY KEY, limpio TEXT) WITHOUT ROWID")
+
+    def obtener(self, huellas, lote=900):
+        """{huella: texto limpio} de las huellas que ya están en la caché."""
+        huellas = list(huellas)
+        encontrados = {}
+        for i in range(0, len(huellas), lote):
+            trozo = huellas[i:i + lote]
+            marcas = ",".join("?" * len(trozo))
+            filas = self.con.execute(f"SELECT huella, limpio FROM tokens WHERE huella IN ({marcas})", trozo)
+            encontrados.update(filas)
+        return encontrados
+
+    def guardar(self, pares):
+        self.con.executemany("INSERT OR REPLACE INTO tokens (huella, limpio) VALUES (?, ?)", pares)
+        self.con.commit()
+
+    def close(self):
+        self.con.close()
+
+
+def preprocesar_corpus(textos, cache=CACHE_TOKENS, workers=None):
+    """
+    preprocess() de cada texto, en orden. Con `cache` (ruta SQLite; None
+    para desactivarla) reutiliza los resultados guardados y solo procesa los
+    textos que faltan, repartidos entre `workers` procesos.
+    """
+    textos = [str(t) for t in textos]
+    guardados = {}
+    if cache:
+        config = huella_config()
+        claves = [huella(t, config) for t in textos]
+        almacen = CacheTokens(cache)
+        guardados = almacen.obtener(set(claves))
+    else:
+        claves = list(range(len(textos)))
+
+    en_cache = sum(clave in guardados for clave in claves)
+
+    # textos sin resultado guardado, sin repetir los abstracts idénticos
+    faltan = {}
+    for clave, t in zip(claves, textos):
+        if clave not in guardados:
+            faltan.setdefault(clave, t)
+    pendientes = list(faltan.values())
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pendientes) < MIN_PARALELO:
+        limpios = _preprocesar_lote(pendientes)
+    else:
+        lotes = [pendientes[i:i + DOCS_POR_TAREA] for i in range(0, len(pendientes), DOCS_POR_TAREA)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            limpios = [l for lote in pool.map(_preprocesar_lote, lotes) for l in lote]
+
+    nuevos = dict(zip(faltan, limpios))
+    if cache:
+        almacen.guardar(nuevos.items())
+        almacen.close()
+        print(f"→ Preprocesamiento: {en_cache} abstracts desde caché, {len(nuevos)} procesados")
+    guardados.update(nuevos)
+    return [guardados[clave] for clave in claves]
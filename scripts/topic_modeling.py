@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+topic_modeling.py
+
+Tópicos de los abstracts con NMF o LDA entrenados en línea (partial_fit),
+leyendo outputs/unified.csv por lotes: el corpus nunca está entero en
+memoria.
+
+  - Los términos van a un espacio fijo con HashingVectorizer, así un lote
+    nuevo no cambia las dimensiones del modelo. Para mostrar los términos
+    de cada tópico se guarda el conteo de cada término y, por columna, el
+    más frecuente de los que caen en ella.
+  - El modelo y el estado se guardan en outputs/topics/ tras cada lote.
+    En la siguiente ejecución solo se entrenan los abstracts que no se
+    habían visto (por huella del texto preprocesado), así un nuevo lote de
+    scraping actualiza el modelo sin reentrenarlo desde cero.
+  - Se escriben los pesos de tópico de cada documento, los términos
+    principales de cada tópico y, por lote, el rendimiento (abstracts/s) y
+    la memoria residente.
+
+Uso:
+    python topic_modeling.py --modelo nmf --topicos 10
+    python topic_modeling.py --modelo lda --topicos 15 --lote 5000
+    python topic_modeling.py --reiniciar      # descarta el modelo guardado
+"""
+import os
+import time
+import shutil
+import sqlite3
+import argparse
+import resource
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.decomposition import MiniBatchNMF, LatentDirichletAllocation
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from corpus import CORPUS_CSV
+from feature_store import huella_texto
+from text_preprocessing import preprocesar_corpus, CACHE_TOKENS
+
+DIR_TOPICOS = "outputs/topics"
+MODELOS = ("nmf", "lda")
+TOPICOS = 10
+N_FEATURES = 2 ** 16
+TAM_LOTE = 2000
+TOP_TERMINOS = 15
+SEMILLA = 42
+
+
+def memoria_mb():
+    """Memoria residente actual del proceso en MB (pico si no hay /proc)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def leer_lotes(csv=CORPUS_CSV, tam_lote=TAM_LOTE):
+    """(filas, abstracts) por lote; `filas` es la posición de cada abstract en el CSV."""
+    inicio = 0
+    for trozo in pd.read_csv(csv, usecols=["Abstract"], dtype=str, chunksize=tam_lote):
+        trozo.index = np.arange(inicio, inicio + len(trozo))
+        inicio += len(trozo)
+        trozo = trozo.dropna(subset=["Abstract"])
+        if len(trozo):
+            yield trozo.index.to_numpy(), trozo["Abstract"].tolist()
+
+
+class ModeloTopicos:
+    """
+    NMF (MiniBatchNMF) o LDA en línea sobre términos hasheados, persistido
+    en `directorio`: modelo.joblib (modelo, configuración y conteo de
+    términos) y entrenados.sqlite (huellas de los abstracts ya usados).
+    """
+
+    def __init__(self, directorio=DIR_TOPICOS, modelo="nmf", topicos=TOPICOS,
+                 n_features=N_FEATURES, semilla=SEMILLA):
+        self.directorio = directorio
+        self.config = {"modelo": modelo, "topicos": topicos, "n_features": n_features}
+        self.vectorizador = HashingVectorizer(n_features=n_features, alternate_sign=False,
+                                              norm="l2" if modelo == "nmf" else None)
+        self._analizar = self.vectorizador.build_analyzer()
+        ruta = os.path.join(directorio, "modelo.joblib")
+        if os.path.exists(ruta):
+            estado = joblib.load(ruta)
+            if estado["config"] != self.config:
+                raise ValueError(f"El modelo guardado en {directorio} usa {estado['config']}; "
+                                 "usa los mismos parámetros o --reiniciar")
+            self.modelo, self.terminos, self.documentos = estado["modelo"], estado["terminos"], estado["documentos"]
+        else:
+            if modelo == "nmf":
+                self.modelo = MiniBatchNMF(n_components=topicos, init="nndsvda", random_state=semilla)
+            else:
+                self.modelo = LatentDirichletAllocation(n_components=topicos, learning_method="online",
+                                                        random_state=semilla)
+            self.terminos = Counter()
+            self.documentos = 0
+
+        os.makedirs(directorio, exist_ok=True)
+        self.con = sqlite3.connect(os.path.join(directorio, "entrenados.sqlite"))
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("CREATE TABLE IF NOT EXISTS entrenados (huella TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    @property
+    def entrenado(self):
+        return self.documentos > 0
+
+    def pendientes(self, huellas, lote=900):
+        """Máscara de las huellas que aún no se usaron para entrenar."""
+        vistos = set()
+        unicas = list(set(huellas))
+        for i in range(0, len(unicas), lote):
+            trozo = unicas[i:i + lote]
+            marcas = ",".join("?" * len(trozo))
+            vistos.update(h for (h,) in self.con.execute(
+                f"SELECT huella FROM entrenados WHERE huella IN ({marcas})", trozo))
+        return np.array([h not in vistos for h in huellas], dtype=bool)
+
+    def entrenar(self, textos, huellas):
+        """partial_fit con textos preprocesados nuevos (sin repetir huellas) y guarda el estado."""
+        unicos = dict(zip(huellas, textos))
+        X = self.vectorizador.transform(unicos.values())
+        if (not self.entrenado and isinstance(self.modelo, MiniBatchNMF)
+                and X.shape[0] < self.modelo.n_components):
+            # nndsvda necesita al menos tantos documentos como tópicos en el primer lote
+            self.modelo.set_params(init="random")
+        self.modelo.partial_fit(X)
+        for t in unicos.values():
+            self.terminos.update(self._analizar(t))
+        self.documentos += len(unicos)
+        self._guardar()
+        self.con.executemany("INSERT OR IGNORE INTO entrenados (huella) VALUES (?)", ((h,) for h in unicos))
+        self.con.commit()
+
+    def _guardar(self):
+        ruta = os.path.join(self.directorio, "modelo.joblib")
+        estado = {"config": self.config, "modelo": self.modelo,
+                  "terminos": self.terminos, "documentos": self.documentos}
+        joblib.dump(estado, ruta + ".tmp")
+        os.replace(ruta + ".tmp", ruta)
+
+    def pesos(self, textos):
+        """Pesos de tópico (documentos × tópicos) normalizados a suma 1; fila a cero si no hay términos."""
+        W = self.modelo.transform(self.vectorizador.transform(textos))
+        suma = W.sum(axis=1, keepdims=True)
+        return np.divide(W, suma, out=np.zeros_like(W), where=suma > 0)
+
+    def terminos_top(self, n=TOP_TERMINOS):
+        """DataFrame (topico, rango, termino, peso) con los n términos de más peso de cada tópico."""
+        # término representante de cada columna: el más frecuente de los que caen en ella
+        vocab = [t for t, _ in self.terminos.most_common()]
+        columnas = self.vectorizador.transform(vocab).indices if vocab else []
+        representante = {}
+        for t, c in zip(vocab, columnas):
+            representante.setdefault(c, t)
+
+        filas = []
+        for k, componente in enumerate(self.modelo.components_):
+            orden = [c for c in np.argsort(-componente) if c in representante][:n]
+            for rango, c in enumerate(orden, 1):
+                filas.append({"topico": k, "rango": rango, "termino": representante[c],
+                              "peso": float(componente[c])})
+        return pd.DataFrame(filas)
+
+    def close(self):
+        self.con.close()
+
+
+# === PROGRAMA PRINCIPAL ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tópicos NMF/LDA en línea sobre outputs/unified.csv.")
+    parser.add_argument("--modelo", choices=MODELOS, default="nmf")
+    parser.add_argument("--topicos", type=int, default=TOPICOS)
+    parser.add_argument("--features", type=int, default=N_FEATURES,
+                        help="columnas del espacio de términos hasheado")
+    parser.add_argument("--lote", type=int, default=TAM_LOTE, help="abstracts por lote")
+    parser.add_argument("--top", type=int, default=TOP_TERMINOS, help="términos por tópico")
+    parser.add_argument("--csv", default=CORPUS_CSV)
+    parser.add_argument("--salida", default=DIR_TOPICOS)
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="descarta el modelo guardado y entrena desde cero")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos para el preprocesamiento (por defecto, uno por CPU)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help=f"no leer ni escribir los tokens de {CACHE_TOKENS}")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        print(f"❌ No existe {args.csv}: ejecuta antes merge_csvs.py")
+        exit(1)
+    if args.reiniciar:
+        shutil.rmtree(args.salida, ignore_errors=True)
+    try:
+        modelo = ModeloTopicos(args.salida, args.modelo, args.topicos, args.features)
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+    print(f"→ Modelo {args.modelo.upper()} con {args.topicos} tópicos "
+          f"({modelo.documentos} abstracts ya entrenados)")
+
+    # 1) entrenamiento: solo los abstracts nuevos de cada lote
+    registro = []
+    for i, (filas, abstracts) in enumerate(leer_lotes(args.csv, args.lote), 1):
+        t0 = time.perf_counter()
+        limpios = preprocesar_corpus(abstracts, cache=None if args.sin_cache else CACHE_TOKENS,
+                                     workers=args.workers)
+        huellas = [huella_texto(t) for t in limpios]
+        nuevos = modelo.pendientes(huellas)
+        if nuevos.any():
+            modelo.entrenar([t for t, m in zip(limpios, nuevos) if m],
+                            [h for h, m in zip(huellas, nuevos) if m])
+        segundos = time.perf_counter() - t0
+        registro.append({"lote": i, "abstracts": len(abstracts), "nuevos": int(nuevos.sum()),
+                         "segundos": round(segundos, 3), "abstracts_s": round(len(abstracts) / segundos, 1),
+                         "memoria_mb": round(memoria_mb(), 1)})
+        r = registro[-1]
+        print(f"  Lote {i}: {r['abstracts']} abstracts ({r['nuevos']} nuevos) en {r['segundos']:.2f}s · "
+              f"{r['abstracts_s']:.0f} abstracts/s · {r['memoria_mb']:.0f} MB")
+    pd.DataFrame(registro).to_csv(os.path.join(args.salida, "lotes.csv"), index=False)
+
+    if not modelo.entrenado:
+        print("⚠ No hay abstracts para entrenar.")
+        modelo.close()
+        exit()
+
+    # 2) pesos de tópico de cada documento con el modelo final, también por lotes
+    ruta_pesos = os.path.join(args.salida, "documentos_topicos.csv")
+    columnas = [f"topico_{k}" for k in range(args.topicos)]
+    with open(ruta_pesos + ".tmp", "w", encoding="utf-8", newline="") as fh:
+        cabecera = True
+        for filas, abstracts in leer_lotes(args.csv, args.lote):
+            limpios = preprocesar_corpus(abstracts, cache=None if args.sin_cache else CACHE_TOKENS,
+                                         workers=args.workers)
+            W = modelo.pesos(limpios)
+            tabla = pd.DataFrame(W.round(4), columns=columnas)
+            tabla.insert(0, "fila", filas)
+            tabla["topico"] = np.where(W.sum(axis=1) > 0, W.argmax(axis=1), -1)
+            tabla.to_csv(fh, index=False, header=cabecera)
+            cabecera = False
+    os.replace(ruta_pesos + ".tmp", ruta_pesos)
+
+    # 3) términos principales de cada tópico
+    terminos = modelo.terminos_top(args.top)
+    terminos.to_csv(os.path.join(args.salida, "terminos_topicos.csv"), index=False)
+    for k, grupo in terminos.groupby("topico"):
+        print(f"  Tópico {k}: {', '.join(grupo['termino'])}")
+
+    print(f"✔ {modelo.documentos} abstracts entrenados; resultados en {args.salida}/: "
+          "documentos_topicos.csv, terminos_topicos.csv, lotes.csv")
+    modelo.close()
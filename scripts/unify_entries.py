@@ -5,80 +5,227 @@ unify_entries.py
 
 Lee todos los .ris y .bib de data/raw/, unifica entradas únicas
 y extrae los duplicados en outputs/.
+
+Con --fuzzy también detecta duplicados aproximados (títulos casi iguales
+entre IEEE y ScienceDirect) mediante MinHash/LSH; ver fuzzy_dedup.py.
+
+Es incremental: outputs/unify_index.sqlite guarda las claves ya vistas y el
+hash de cada archivo, así que una nueva ejecución solo lee los archivos
+nuevos o modificados y añade al final de las salidas. --rebuild empieza de cero.
+
+El índice guarda también el tamaño de unified.bib y duplicates.bib en el
+mismo commit que marca cada archivo como procesado: si una ejecución se
+corta después de añadir pero antes del commit, la siguiente recorta las
+salidas a ese tamaño y vuelve a procesar el archivo, sin duplicar nada.
+Los registros que se quitan de un archivo ya procesado no se borran de las
+salidas (solo se añade); se avisa y hay que usar --rebuild para quitarlos.
+
+Los archivos se leen en paralelo (--workers procesos) y sus entradas pasan
+archivo por archivo, en orden, a la etapa de dedup: en memoria solo están
+los archivos en vuelo, no todo el corpus crudo.
 """
 import os
 import glob
-import rispy
-import bibtexparser
-from bibtexparser.bwriter import BibTexWriter
-from bibtexparser.bibdatabase import BibDatabase
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from bib_stream import iter_bib, iter_ris, write_bib
+from fuzzy_dedup import UMBRAL, NUM_PERM, BANDAS, K_SHINGLE
+from key_index import IndiceClaves, DetectorIndexado, params_guardados
 
 RAW_DIR     = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw')
 OUT_DIR     = os.path.join(os.path.dirname(__file__), '..', 'outputs')
 UNIFIED_FN  = os.path.join(OUT_DIR, 'unified.bib')
 DUPES_FN    = os.path.join(OUT_DIR, 'duplicates.bib')
+INDEX_FN    = os.path.join(OUT_DIR, 'unify_index.sqlite')
 
 def load_ris(path):
+    # iter_ris ya transforma claves RIS → BibTeX
     with open(path, encoding='utf-8') as fh:
-        entries = rispy.load(fh)
-    # transformar claves RIS → BibTeX
-    bibs = []
-    for e in entries:
-        bib = {
-            'ENTRYTYPE': e.get('type_of_reference', 'article'),
-            'ID'       : e.get('id', ''),
-            'title'    : ' '.join(e.get('title', [])),
-            'author'   : ' and '.join(e.get('authors', [])),
-            'year'     : e.get('year', ''),
-            'abstract' : e.get('abstract', ''),
-            'doi'      : e.get('doi', '')
-        }
-        bibs.append(bib)
-    return bibs
+        return list(iter_ris(fh))
 
 def load_bib(path):
     with open(path, encoding='utf-8') as fh:
-        db = bibtexparser.load(fh)
-    return db.entries
+        return list(iter_bib(fh))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Unifica .ris/.bib y separa duplicados.")
+    parser.add_argument('--fuzzy', action='store_true',
+                        help="detecta también títulos casi iguales (MinHash/LSH)")
+    parser.add_argument('--umbral', type=float, default=UMBRAL,
+                        help=f"Jaccard mínimo entre títulos en modo fuzzy (por defecto {UMBRAL})")
+    parser.add_argument('--num-perm', type=int, default=NUM_PERM,
+                        help=f"permutaciones MinHash (por defecto {NUM_PERM})")
+    parser.add_argument('--bandas', type=int, default=BANDAS,
+                        help=f"bandas LSH (por defecto {BANDAS})")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="ignora el índice y vuelve a unificar todo desde cero")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="procesos para leer archivos en paralelo (1 = sin pool)")
+    return parser.parse_args()
+
+def leer_archivo(loader, path):
+    """Ejecuta `loader` en un proceso del pool; devuelve (entradas, error)."""
+    try:
+        return loader(path), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def ingerir(pendientes, loaders, workers):
+    """
+    Lee en paralelo los archivos de `pendientes` ((ruta, firma)) y produce
+    (ruta, firma, entradas, error) en el mismo orden, para que los
+    cluster_id no dependan de qué proceso termina antes. Como mucho hay
+    2 × workers archivos leídos o en lectura a la vez.
+    """
+    if workers <= 1:
+        for fn, firma in pendientes:
+            yield (fn, firma) + leer_archivo(loaders[fn], fn)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        en_vuelo = deque()
+        for fn, firma in pendientes:
+            en_vuelo.append((fn, firma, pool.submit(leer_archivo, loaders[fn], fn)))
+            if len(en_vuelo) >= 2 * workers:
+                fn, firma, fut = en_vuelo.popleft()
+                yield (fn, firma) + fut.result()
+        while en_vuelo:
+            fn, firma, fut = en_vuelo.popleft()
+            yield (fn, firma) + fut.result()
+
+def append_bib(path, entries):
+    if not entries:
+        return
+    with open(path, 'a', encoding='utf-8') as fh:
+        write_bib(entries, fh)
+
+class Unificador:
+    """
+    Unificación incremental con el índice abierto: procesar() añade a las
+    salidas los archivos que reciba (todos de una vez, o de uno en uno a
+    medida que llegan, como hace ingest_queue.py) y cerrar() informa los totales.
+    """
+
+    def __init__(self, fuzzy=False, umbral=UMBRAL, num_perm=NUM_PERM, bandas=BANDAS,
+                 rebuild=False, workers=1, out_dir=OUT_DIR):
+        os.makedirs(out_dir, exist_ok=True)
+        self.workers = workers
+        self.unified_fn = os.path.join(out_dir, os.path.basename(UNIFIED_FN))
+        self.dupes_fn = os.path.join(out_dir, os.path.basename(DUPES_FN))
+
+        # 1) Índice persistente; si cambia la configuración se reconstruye solo
+        params = {'fuzzy': fuzzy}
+        if fuzzy:
+            params.update(umbral=umbral, num_perm=num_perm, bandas=bandas, k=K_SHINGLE)
+        self.indice = IndiceClaves(os.path.join(out_dir, os.path.basename(INDEX_FN)), params)
+        if rebuild or not (os.path.exists(self.unified_fn) and os.path.exists(self.dupes_fn)):
+            self.indice.reiniciar()
+        if self.indice.nuevo:
+            for fn in (self.unified_fn, self.dupes_fn):
+                open(fn, 'w', encoding='utf-8').close()
+        self._recortar_salidas()
+
+        self.detector = DetectorIndexado(self.indice, fuzzy=fuzzy, umbral=umbral,
+                                         num_perm=num_perm, bandas=bandas)
+        self.nuevos_u = self.nuevos_d = self.errores = 0
+
+    def _recortar_salidas(self):
+        """
+        Deja cada salida en el tamaño guardado en el índice, descartando lo
+        que se añadió sin llegar al commit. Índices anteriores a este dato
+        toman el tamaño actual.
+        """
+        for fn in (self.unified_fn, self.dupes_fn):
+            clave = 'bytes_' + os.path.basename(fn)
+            guardado, actual = self.indice.meta(clave), os.path.getsize(fn)
+            if guardado is None:
+                self.indice.set_meta(clave, actual)
+            elif actual > int(guardado):
+                print(f"⚠ {os.path.basename(fn)} tiene {actual - int(guardado)} bytes de una ejecución "
+                      f"interrumpida; se descartan y se vuelven a procesar sus archivos.")
+                with open(fn, 'r+b') as fh:
+                    fh.truncate(int(guardado))
+        self.indice.commit()
+
+    def procesar(self, loaders):
+        """
+        2) Solo archivos nuevos o modificados de `loaders` ({ruta: loader}):
+        cargar en paralelo, detectar duplicados (por DOI o título; en modo
+        fuzzy, también similares) y añadir.
+        """
+        indice = self.indice
+        for fn, firma, cargadas, error in ingerir(indice.pendientes(loaders), loaders, self.workers):
+            if error:
+                # no se marca como procesado: se reintenta en la próxima ejecución
+                print(f"❌ Error al leer {os.path.basename(fn)}: {error}")
+                self.errores += 1
+                continue
+            antes, total = indice.registros(fn), len(cargadas)
+            if antes is not None and total < antes:
+                print(f"⚠ {os.path.basename(fn)} tiene {antes - total} registro(s) menos que antes; "
+                      f"los quitados siguen en las salidas (usa --rebuild para quitarlos).")
+            entries = indice.filtrar_nuevos(fn, cargadas)
+            del cargadas
+            unique, duplicates = self.detector.procesar(entries)
+
+            # primero las salidas y después el commit con su nuevo tamaño: un
+            # corte entre ambos se deshace en _recortar_salidas()
+            append_bib(self.unified_fn, unique)
+            append_bib(self.dupes_fn, duplicates)
+            for salida in (self.unified_fn, self.dupes_fn):
+                indice.set_meta('bytes_' + os.path.basename(salida), os.path.getsize(salida))
+            indice.marcar_procesado(fn, firma, total)
+            indice.sumar('unicos', len(unique))
+            indice.sumar('duplicados', len(duplicates))
+            indice.commit()
+            self.nuevos_u += len(unique)
+            self.nuevos_d += len(duplicates)
+            print(f"→ {os.path.basename(fn)}: +{len(unique)} únicos, +{len(duplicates)} duplicados")
+
+    def cerrar(self):
+        indice = self.indice
+        print(f"✔ Unificados: {indice.contador('unicos')} registros (+{self.nuevos_u}) → {self.unified_fn}")
+        print(f"✔ Duplicados: {indice.contador('duplicados')} registros (+{self.nuevos_d}) → {self.dupes_fn}")
+        if self.errores:
+            print(f"⚠ {self.errores} archivo(s) con errores de lectura; se reintentarán en la próxima ejecución.")
+        indice.close()
+
+def opciones_guardadas(out_dir=OUT_DIR):
+    """
+    Opciones de Unificador con las que se construyó el índice de `out_dir`
+    ({} si todavía no hay índice), para seguir añadiendo sin que un cambio
+    de configuración lo reinicie y vacíe las salidas. ValueError si el
+    índice usa un tamaño de shingle distinto del de este código.
+    """
+    params = params_guardados(os.path.join(out_dir, os.path.basename(INDEX_FN)))
+    if not params:
+        return {}
+    opciones = {'fuzzy': params['fuzzy']}
+    if params['fuzzy']:
+        if params.get('k') != K_SHINGLE:
+            raise ValueError(f"el índice usa shingles de {params.get('k')} caracteres y este código de "
+                             f"{K_SHINGLE}; vuelve a correr unify_entries.py --fuzzy --rebuild")
+        opciones.update(umbral=params['umbral'], num_perm=params['num_perm'], bandas=params['bandas'])
+    return opciones
+
+def loaders_de(rutas):
+    """{ruta absoluta: loader} para los .ris/.bib de `rutas` (el resto se ignora)."""
+    loaders = {}
+    for fn in rutas:
+        ext = os.path.splitext(fn)[1].lower()
+        if ext in ('.ris', '.bib'):
+            loaders[os.path.abspath(fn)] = load_ris if ext == '.ris' else load_bib
+    return loaders
 
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-
-    # 1) Cargar todas las entradas
-    all_entries = []
-    for fn in glob.glob(os.path.join(RAW_DIR, '*.ris')):
-        all_entries.extend(load_ris(fn))
-    for fn in glob.glob(os.path.join(RAW_DIR, '*.bib')):
-        all_entries.extend(load_bib(fn))
-
-    # 2) Detectar duplicados (por DOI o título)
-    seen     = {}
-    duplicates = []
-    for entry in all_entries:
-        key = entry.get('doi','').lower().strip() or entry.get('title','').lower().strip()
-        if not key:
-            # si no hay DOI ni título, lo consideramos único igual
-            key = entry.get('ID','') + str(hash(frozenset(entry.items())))
-        if key in seen:
-            duplicates.append(entry)
-        else:
-            seen[key] = entry
-
-    # 3) Escribir unified.bib
-    db_u = BibDatabase()
-    db_u.entries = list(seen.values())
-    writer = BibTexWriter()
-    with open(UNIFIED_FN, 'w', encoding='utf-8') as fh:
-        fh.write(writer.write(db_u))
-
-    # 4) Escribir duplicates.bib
-    db_d = BibDatabase()
-    db_d.entries = duplicates
-    with open(DUPES_FN, 'w', encoding='utf-8') as fh:
-        fh.write(writer.write(db_d))
-
-    print(f"✔ Unificados: {len(db_u.entries)} registros → {UNIFIED_FN}")
-    print(f"✔ Duplicados: {len(db_d.entries)} registros → {DUPES_FN}")
+    args = parse_args()
+    unificador = Unificador(args.fuzzy, args.umbral, args.num_perm, args.bandas,
+                            args.rebuild, args.workers)
+    unificador.procesar(loaders_de(glob.glob(os.path.join(RAW_DIR, '*.ris'))
+                                   + glob.glob(os.path.join(RAW_DIR, '*.bib'))))
+    unificador.cerrar()
 
 if __name__ == '__main__':
     main()
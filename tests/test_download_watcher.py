@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de download_watcher.VigilanteDescargas: descargas solapadas en la
+misma carpeta llegan cada una a su pedido y se renombran a su página, con
+inotify y con el sondeo que se usa cuando inotify no está disponible.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import download_watcher   # noqa: E402
+from download_watcher import VigilanteDescargas   # noqa: E402
+
+ESPERA = 5
+
+
+@pytest.fixture(params=["inotify", "sondeo"])
+def vigilante(request, tmp_path, monkeypatch):
+    if request.param == "sondeo":
+        monkeypatch.setattr(download_watcher, "_libc_inotify", lambda: None)
+    elif download_watcher._libc_inotify() is None:
+        pytest.skip("inotify no disponible")
+    v = VigilanteDescargas(str(tmp_path / "descargas"), sondeo=0.05)
+    yield v
+    v.cerrar()
+
+
+def _descargar(carpeta, nombre, demora, contenido=b"x" * 1000):
+    """Como Chrome: escribe <nombre>.crdownload y al terminar lo renombra."""
+    time.sleep(demora)
+    parcial = os.path.join(carpeta, nombre + ".crdownload")
+    with open(parcial, "wb") as fh:
+        fh.write(contenido)
+    os.replace(parcial, os.path.join(carpeta, nombre))
+
+
+def _lanzar(carpeta, *descargas):
+    hilos = [threading.Thread(target=_descargar, args=(carpeta, *d)) for d in descargas]
+    for h in hilos:
+        h.start()
+    return hilos
+
+
+def test_modo(vigilante, request):
+    assert vigilante.modo == request.node.callspec.params["vigilante"]
+
+
+def test_descargas_solapadas_van_a_su_pagina(vigilante):
+    carpeta = vigilante.directorio
+    # página 1 pide su zip y su CSV; el CSV llega primero
+    zip_1, csv_1 = vigilante.pedir("*.zip"), vigilante.pedir("*.csv")
+    hilos = _lanzar(carpeta, ("bulk-download.zip", 0.3, b"zip 1"), ("export.csv", 0.05, b"csv 1"))
+
+    assert csv_1.esperar(ESPERA) == os.path.join(carpeta, "export.csv")
+    vigilante.entregar(csv_1, "ieee_page_1.csv")
+    # página 2 pide su CSV, que llega con el mismo nombre antes que el zip de la página 1
+    csv_2 = vigilante.pedir("*.csv")
+    hilos += _lanzar(carpeta, ("export.csv", 0.05, b"csv 2"))
+    assert csv_2.esperar(ESPERA) is not None
+    vigilante.entregar(csv_2, "ieee_page_2.csv")
+    assert zip_1.esperar(ESPERA) == os.path.join(carpeta, "bulk-download.zip")
+    vigilante.entregar(zip_1, "ieee_page_1.zip")
+    for h in hilos:
+        h.join()
+
+    contenido = {}
+    for nombre in os.listdir(carpeta):
+        with open(os.path.join(carpeta, nombre), "rb") as fh:
+            contenido[nombre] = fh.read()
+    assert contenido == {"ieee_page_1.csv": b"csv 1", "ieee_page_2.csv": b"csv 2", "ieee_page_1.zip": b"zip 1"}
+
+
+def test_mismo_patron_en_orden_de_pedido(vigilante):
+    primero, segundo = vigilante.pedir("*.csv"), vigilante.pedir("*.csv")
+    for h in _lanzar(vigilante.directorio, ("a.csv", 0.05), ("b.csv", 0.4)):
+        h.join()
+
+    assert os.path.basename(primero.esperar(ESPERA)) == "a.csv"
+    assert os.path.basename(segundo.esperar(ESPERA)) == "b.csv"
+
+
+def test_archivos_previos_e_incompletos_no_cuentan(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_watcher, "_libc_inotify", lambda: None)
+    carpeta = tmp_path / "descargas"
+    carpeta.mkdir()
+    (carpeta / "viejo.csv").write_text("de antes", encoding="utf-8")
+    v = VigilanteDescargas(str(carpeta), sondeo=0.05)
+    try:
+        pedido = v.pedir("*.csv")
+        (carpeta / "nuevo.csv.crdownload").write_text("a medias", encoding="utf-8")
+        assert pedido.esperar(0.3) is None
+
+        os.replace(carpeta / "nuevo.csv.crdownload", carpeta / "nuevo.csv")
+        assert os.path.basename(pedido.esperar(ESPERA)) == "nuevo.csv"
+    finally:
+        v.cerrar()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de export_client.py contra el servidor de exportación falso de
+scrape_fixtures.py (solo biblioteca estándar, sin red ni navegador).
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from export_client import exportar, SesionCaducada   # noqa: E402
+from scrape_fixtures import servir_export, COOKIE_EXPORT   # noqa: E402
+
+
+@pytest.fixture
+def servidor():
+    servidores = []
+
+    def arrancar(**opciones):
+        srv, url_base = servir_export(**opciones)
+        servidores.append(srv)
+        return srv, url_base
+
+    yield arrancar
+    for srv in servidores:
+        srv.shutdown()
+
+
+def _exportar(url_base, cookies, paginas, salida, **opciones):
+    return exportar(url_base, cookies, paginas,
+                    lambda p: ("/export", {"pageNumber": p}),
+                    lambda p: os.path.join(salida, f"ieee_page_{p}.csv"),
+                    **opciones)
+
+
+def test_reintenta_429_503_y_escribe_cada_pagina(servidor, tmp_path):
+    srv, url_base = servidor(paginas=8, filas=5, fallos=0, lat=20, errores=(429, 503, 503))
+    paginas = list(range(1, 9))
+
+    resultados, estadisticas = _exportar(url_base, [COOKIE_EXPORT], paginas, str(tmp_path),
+                                         conexiones=3, por_segundo=100)
+
+    assert all(not isinstance(r, Exception) for r in resultados.values())
+    assert estadisticas["reintentos"] == 3
+    assert srv.peticiones == len(paginas) + 3
+    assert sorted(os.listdir(tmp_path)) == sorted(f"ieee_page_{p}.csv" for p in paginas)
+    with open(tmp_path / "ieee_page_2.csv", encoding="utf-8") as fh:
+        assert len(fh.read().splitlines()) == 1 + 5   # cabecera + filas
+
+
+def test_no_supera_las_conexiones_simultaneas(servidor, tmp_path):
+    srv, url_base = servidor(paginas=12, filas=2, fallos=0, lat=50)
+
+    _exportar(url_base, [COOKIE_EXPORT], list(range(1, 13)), str(tmp_path), conexiones=2, por_segundo=100)
+
+    assert 1 <= srv.max_simultaneas <= 2
+    assert len(srv.conexiones) <= 2   # keep-alive: se reutilizan las del pool
+
+
+def test_sin_cookie_lanza_sesion_caducada(servidor, tmp_path):
+    _, url_base = servidor(paginas=3, fallos=0, lat=0)
+
+    with pytest.raises(SesionCaducada):
+        _exportar(url_base, [], [1, 2, 3], str(tmp_path), conexiones=2, por_segundo=100)
+    assert os.listdir(tmp_path) == []
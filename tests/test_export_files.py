@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de export_files.py: claves refN por fila del CSV de origen (como
+la versión original, también leyendo por trozos) y CSV sin las columnas
+esperadas que no se vuelven a leer en cada corrida.
+
+    python -m pytest -q tests
+"""
+import os
+import re
+import sys
+import subprocess
+
+import pandas as pd
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "export_files.py")
+sys.path.insert(0, os.path.dirname(SCRIPT))
+
+from export_files import COLUMNAS   # noqa: E402
+
+
+def _correr(directorio, *args):
+    salida = subprocess.run([sys.executable, SCRIPT, *args], cwd=directorio,
+                            capture_output=True, text=True, check=True)
+    return salida.stdout
+
+
+def _claves(ruta):
+    with open(ruta, encoding="utf-8") as fh:
+        return re.findall(r"@article\{(ref\d+),", fh.read())
+
+
+@pytest.fixture
+def datos(tmp_path):
+    (tmp_path / "data").mkdir()
+    filas = lambda titulos: [[t, "A. Uno; B. Dos", "x", "u", "k", "2020-01-01"] for t in titulos]
+    pd.DataFrame(filas(["T0", "T1", "T0", "T2", "T1"]), columns=COLUMNAS).to_csv(tmp_path / "data" / "a.csv", index=False)
+    pd.DataFrame(filas(["T3", "T2", "T4"]), columns=COLUMNAS).to_csv(tmp_path / "data" / "b.csv", index=False)
+    pd.DataFrame([["T9"]], columns=[COLUMNAS[0]]).to_csv(tmp_path / "data" / "c.csv", index=False)
+    return tmp_path
+
+
+@pytest.mark.parametrize("trozos", [[], ["--chunksize", "2"]])
+def test_claves_por_fila_del_csv(datos, trozos):
+    _correr(datos, *trozos)
+
+    assert sorted(_claves(datos / "outputs" / "unified.bib")) == sorted(["ref1", "ref2", "ref4", "ref1", "ref3"])
+    assert sorted(_claves(datos / "outputs" / "duplicates.bib")) == sorted(["ref3", "ref5", "ref2"])
+
+
+def test_csv_rechazado_no_se_relee(datos):
+    primera = _correr(datos)
+    segunda = _correr(datos)
+
+    assert "Faltan columnas en c.csv" in primera
+    assert "c.csv" not in segunda
+
+    # si el archivo cambia se vuelve a leer
+    pd.DataFrame([["T9", "A"]], columns=COLUMNAS[:2]).to_csv(datos / "data" / "c.csv", index=False)
+    assert "Faltan columnas en c.csv" in _correr(datos)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de fuzzy_dedup.py: recall y precisión del modo MinHash/LSH sobre
+casi duplicados inyectados con las mismas variantes que bench_fuzzy_dedup.py.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from fuzzy_dedup import DetectorDuplicados, normalizar_titulo, primer_autor   # noqa: E402
+from bench_fuzzy_dedup import generar, variante   # noqa: E402
+
+
+def _corpus(semilla, n=2000, n_variantes=300):
+    """Registros únicos seguidos de variantes casi iguales; devuelve (entradas, {ID variante: índice base})."""
+    rng = random.Random(semilla)
+    generadas, _ = generar(n, rng)
+    bases = [e for e in generadas if e["ID"].startswith("ref")]
+    esperado = {}
+    variantes = []
+    for j in range(n_variantes):
+        i = rng.randrange(len(bases))
+        variantes.append({"ENTRYTYPE": "article", "ID": f"var{j}",
+                          "title": variante(bases[i]["title"], rng), "author": bases[i]["author"]})
+        esperado[f"var{j}"] = i
+    return bases + variantes, esperado, len(bases)
+
+
+@pytest.mark.parametrize("semilla", [0, 1, 2])
+def test_recall_y_precision_en_casi_duplicados(semilla):
+    entradas, esperado, n_bases = _corpus(semilla)
+
+    unicos, duplicados = DetectorDuplicados(fuzzy=True).procesar(entradas)
+
+    por_id = {d["ID"]: d for d in duplicados}
+    encontrados = [v for v in esperado if v in por_id]
+    assert len(encontrados) / len(esperado) >= 0.95
+    # ninguna base se marca como duplicado de otra (títulos aleatorios distintos)
+    assert not any(i.startswith("ref") for i in por_id)
+    assert len(unicos) == n_bases + len(esperado) - len(encontrados)
+    # cluster_id apunta a la base de la que se generó la variante (o a otra variante de ella)
+    titulos_base = [normalizar_titulo(e["title"]) for e in entradas[:n_bases]]
+    for v in encontrados:
+        rep = int(por_id[v]["cluster_id"]) - 1
+        if rep < n_bases:
+            assert titulos_base[rep] == titulos_base[esperado[v]]
+
+
+def test_primer_autor_distinto_no_es_duplicado():
+    a = {"ID": "a", "title": "Computational thinking in primary school", "author": "X. Zhang and H. Zou"}
+    b = {"ID": "b", "title": "Computational Thinking in Primary Schools", "author": "Garcia, M."}
+    c = {"ID": "c", "title": "Computational thinking in primary schooling", "author": "Zhang, X."}
+
+    unicos, duplicados = DetectorDuplicados(fuzzy=True).procesar([a, b, c])
+
+    assert [e["ID"] for e in unicos] == ["a", "b"]
+    assert [(d["ID"], d["cluster_id"]) for d in duplicados] == [("c", "000001")]
+    assert duplicados[0]["match_reason"].startswith("minhash")
+    assert primer_autor("Zhang, X.") == primer_autor("X. Zhang and H. Zou") == "zhang"
+
+
+def test_modo_exacto_conserva_la_clave_original():
+    a = {"ID": "a", "title": "Same title", "doi": "10.1/X"}
+    b = {"ID": "b", "title": "Other title", "doi": "10.1/x"}
+    c = {"ID": "c", "title": "same title."}
+
+    unicos, duplicados = DetectorDuplicados(fuzzy=False).procesar([a, b, c])
+
+    assert [e["ID"] for e in unicos] == ["a", "c"]
+    assert [d["match_reason"] for d in duplicados] == ["clave exacta"]
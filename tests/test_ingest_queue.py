@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de ingest_queue.ColaIngesta: sigue el índice fuzzy que dejó
+unify_entries.py sin reiniciarlo y, al cerrar, añade los .csv/.bib/.ris de
+data/ que no pasaron por la cola.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from bib_stream import iter_bib, write_bib   # noqa: E402
+from key_index import params_guardados   # noqa: E402
+from ingest_queue import ColaIngesta   # noqa: E402
+from unify_entries import Unificador, loaders_de, INDEX_FN   # noqa: E402
+
+
+def _bib(ruta, entradas):
+    with open(ruta, "w", encoding="utf-8") as fh:
+        write_bib(entradas, fh)
+    return str(ruta)
+
+
+def _entrada(i, titulo=None):
+    return {"ENTRYTYPE": "article", "ID": f"ref{i}", "title": titulo or f"Paper number {i} on robotics",
+            "author": f"Autor{i}, A.", "doi": f"10.1000/{i}"}
+
+
+def _titulos(ruta):
+    with open(ruta, encoding="utf-8") as fh:
+        return [e["title"] for e in iter_bib(fh)]
+
+
+def test_no_reinicia_el_indice_fuzzy(tmp_path):
+    data, out = tmp_path / "data", tmp_path / "out"
+    data.mkdir()
+    a = _bib(data / "a.bib", [_entrada(i) for i in range(3)])
+    unificador = Unificador(fuzzy=True, out_dir=str(out))
+    unificador.procesar(loaders_de([a]))
+    unificador.cerrar()
+
+    # la página nueva trae un título casi igual a uno ya unificado (otro DOI) y uno nuevo
+    b = _bib(data / "b.bib", [_entrada(10, "Paper number 1 on robotics."), _entrada(11)])
+    cola = ColaIngesta(str(data), str(out), fusionar=False)
+    cola.poner(b)
+    resumen = cola.cerrar()
+
+    assert resumen["citas"] == 1 and resumen["errores"] == 0
+    assert params_guardados(os.path.join(out, os.path.basename(INDEX_FN)))["fuzzy"] is True
+    assert _titulos(out / "unified.bib") == [f"Paper number {i} on robotics" for i in (0, 1, 2, 11)]
+    assert _titulos(out / "duplicates.bib") == ["Paper number 1 on robotics."]
+
+
+def test_al_cerrar_anade_lo_que_no_paso_por_la_cola(tmp_path):
+    data, out = tmp_path / "data", tmp_path / "out"
+    data.mkdir()
+    # de una sesión anterior, nunca puestos en la cola
+    pd.DataFrame({"Document Title": ["viejo 1", "viejo 2"]}).to_csv(data / "ieee_page_1.csv", index=False)
+    _bib(data / "ieee_page_1.bib", [_entrada(1)])
+    (data / "sd_page_1.ris").write_text(
+        "TY  - JOUR\nTI  - Paper number 2 on robotics\nAU  - Autor2, A.\nDO  - 10.1000/2\nER  - \n", encoding="utf-8")
+    # de esta sesión
+    pd.DataFrame({"Document Title": ["nuevo"]}).to_csv(data / "ieee_page_2.csv", index=False)
+    nuevo_bib = _bib(data / "ieee_page_2.bib", [_entrada(3)])
+
+    cola = ColaIngesta(str(data), str(out))
+    cola.poner(str(data / "ieee_page_2.csv"), nuevo_bib)
+    resumen = cola.cerrar()
+
+    assert (resumen["csv"], resumen["citas"], resumen["errores"]) == (1, 1, 0)
+    unificado = pd.read_csv(out / "unified.csv", dtype=str)
+    assert sorted(unificado["Document Title"]) == ["nuevo", "viejo 1", "viejo 2"]
+    assert sorted(_titulos(out / "unified.bib")) == [f"Paper number {i} on robotics" for i in (1, 2, 3)]
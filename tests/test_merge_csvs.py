@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de merge_csvs.Fusionador: un CSV que falla a mitad no deja filas
+en las salidas y las columnas fuera del esquema se avisan.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import merge_csvs   # noqa: E402
+from corpus_schema import COLUMNAS   # noqa: E402
+
+
+def _csv(ruta, titulos, extra=None):
+    df = pd.DataFrame({"Document Title": titulos, "Authors": ["A"] * len(titulos)})
+    if extra:
+        df[extra] = "x"
+    df.to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def _fusionar(tmp_path, archivos):
+    fusion = merge_csvs.Fusionador(str(tmp_path / "out" / "unified.csv"), str(tmp_path / "out" / "unified.parquet"))
+    filas = [fusion.agregar(f) for f in archivos]
+    fusion.cerrar()
+    return filas
+
+
+def test_archivo_que_falla_a_mitad_no_deja_filas(tmp_path, monkeypatch):
+    monkeypatch.setattr(merge_csvs, "CHUNKSIZE", 2)
+    buenos = _csv(tmp_path / "a.csv", ["t1", "t2", "t3"])
+    roto = tmp_path / "b.csv"
+    roto.write_text("Document Title,Authors\nr1,A\nr2,A\nr3,A\nr4,A,sobra,otra\nr5,A\n", encoding="utf-8")
+    otros = _csv(tmp_path / "c.csv", ["t4"])
+
+    assert _fusionar(tmp_path, [str(roto), buenos, otros]) == [0, 3, 1]
+
+    unificado = pd.read_csv(tmp_path / "out" / "unified.csv", dtype=str)
+    assert list(unificado.columns) == COLUMNAS
+    assert unificado["Document Title"].tolist() == ["t1", "t2", "t3", "t4"]
+    if merge_csvs.pq is not None:
+        assert merge_csvs.pq.read_table(tmp_path / "out" / "unified.parquet").num_rows == 4
+
+
+def test_avisa_columnas_fuera_del_esquema(tmp_path, capsys):
+    a = _csv(tmp_path / "a.csv", ["t1"], extra="Columna Rara")
+    b = _csv(tmp_path / "b.csv", ["t2"], extra="Columna Rara")
+
+    _fusionar(tmp_path, [a, b])
+
+    salida = capsys.readouterr().out
+    assert salida.count("Columnas fuera del esquema, no se copian: ['Columna Rara']") == 2
+    assert "Columna Rara (2)" in salida
+
+
+@pytest.mark.parametrize("primero_roto", [True, False])
+def test_cabecera_una_sola_vez(tmp_path, primero_roto):
+    roto = tmp_path / "b.csv"
+    roto.write_text("Document Title,Authors\nr1,A\nr2,A,sobra\n", encoding="utf-8")
+    bueno = _csv(tmp_path / "a.csv", ["t1"])
+    archivos = [str(roto), bueno] if primero_roto else [bueno, str(roto)]
+
+    _fusionar(tmp_path, archivos)
+
+    with open(tmp_path / "out" / "unified.csv", encoding="utf-8") as fh:
+        lineas = fh.read().splitlines()
+    assert len(lineas) == 2 and lineas[0].startswith("Document Title,")
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de network_render.disposicion: sfdp para grafos grandes cuando
+está instalado, spring si no, y caché de layouts acotada.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import stat
+
+import networkx as nx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import network_render   # noqa: E402
+
+
+@pytest.fixture
+def sfdp_falso(tmp_path, monkeypatch):
+    """Un 'sfdp' que responde en formato -Tplain poniendo el nodo nK en (K, 2K)."""
+    ruta = tmp_path / "sfdp"
+    ruta.write_text(
+        "#!/bin/sh\n"
+        "echo 'graph 1 10 10'\n"
+        "grep -o '^  n[0-9]*;' | tr -d ' n;' | while read i; do echo \"node n$i $i $((2 * i)) 1 1 n$i solid ellipse black lightgrey\"; done\n"
+        "echo stop\n", encoding="utf-8")
+    ruta.chmod(ruta.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    return ruta
+
+
+def test_grafo_grande_usa_sfdp(sfdp_falso, monkeypatch):
+    monkeypatch.setattr(network_render, "MAX_NODOS_SPRING", 10)
+    G = nx.relabel_nodes(nx.path_graph(20), lambda i: f"término {i}")
+
+    pos = network_render.disposicion(G)
+
+    assert [tuple(pos[f"término {i}"]) for i in (0, 7)] == [(0.0, 0.0), (7.0, 14.0)]
+
+
+def test_sin_sfdp_usa_spring(monkeypatch):
+    monkeypatch.setattr(network_render, "MAX_NODOS_SPRING", 10)
+    monkeypatch.setattr(network_render.shutil, "which", lambda _: None)
+
+    pos = network_render.disposicion(nx.path_graph(20))
+
+    assert len(pos) == 20
+
+
+def test_cache_acotada_y_reutilizada(tmp_path, monkeypatch):
+    monkeypatch.setattr(network_render, "MAX_CACHE", 3)
+    cache = str(tmp_path / "layouts")
+
+    for n in range(5, 12):
+        ultimo = network_render.disposicion(nx.path_graph(n), cache_dir=cache)
+    assert len(os.listdir(cache)) == 3
+
+    def sin_calcular(*args, **kwargs):
+        raise AssertionError("debió salir de la caché")
+
+    monkeypatch.setattr(network_render.nx, "spring_layout", sin_calcular)
+    otra_vez = network_render.disposicion(nx.path_graph(11), cache_dir=cache)
+    assert all((ultimo[k] == otra_vez[k]).all() for k in ultimo)
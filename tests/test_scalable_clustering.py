@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de scalable_clustering.py: ward_lineal frente a
+scipy.cluster.hierarchy.linkage(X, 'ward'), con y sin pesos, y alturas
+monótonas de ward_conectividad.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy.cluster.hierarchy import linkage, fcluster, is_monotonic, is_valid_linkage
+from sklearn.neighbors import kneighbors_graph
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import scalable_clustering   # noqa: E402
+from scalable_clustering import ward_lineal, ward_conectividad   # noqa: E402
+
+
+@pytest.fixture
+def sin_fastcluster(monkeypatch):
+    # se prueba la cadena de vecinos más cercanos propia, no fastcluster
+    monkeypatch.setattr(scalable_clustering, "fastcluster", None)
+
+
+@pytest.mark.parametrize("semilla", [0, 1, 2])
+def test_ward_lineal_igual_que_scipy(sin_fastcluster, semilla):
+    X = np.random.default_rng(semilla).normal(size=(80, 6))
+
+    np.testing.assert_allclose(ward_lineal(X), linkage(X, "ward"))
+
+
+@pytest.mark.parametrize("semilla", [0, 1, 2])
+def test_ward_lineal_con_pesos_igual_que_puntos_repetidos(sin_fastcluster, semilla):
+    rng = np.random.default_rng(semilla)
+    X = rng.normal(size=(50, 6))
+    pesos = rng.integers(1, 5, size=len(X))
+
+    L = ward_lineal(X, pesos)
+
+    # scipy con cada fila repetida `peso` veces: primero fusiona las copias a
+    # altura 0 y después hace las mismas fusiones que el Ward ponderado
+    repetidos = linkage(np.repeat(X, pesos, axis=0), "ward")
+    np.testing.assert_allclose(L[:, 2], repetidos[-(len(X) - 1):, 2])
+    ultima_copia = np.cumsum(pesos) - 1
+    for k in (2, 5, 12):
+        a = fcluster(L, k, criterion="maxclust")
+        b = fcluster(repetidos, k, criterion="maxclust")[ultima_copia]
+        # misma partición, aunque los números de cluster cambien
+        assert len(set(zip(a, b))) == len(set(a)) == len(set(b))
+    assert L[-1, 3] == len(X)   # la cuarta columna cuenta hojas, no pesos
+
+
+def test_ward_lineal_con_fastcluster_igual_que_scipy():
+    if scalable_clustering.fastcluster is None:
+        pytest.skip("fastcluster no está instalado")
+    X = np.random.default_rng(0).normal(size=(80, 6))
+
+    np.testing.assert_allclose(ward_lineal(X), linkage(X, "ward"))
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_ward_conectividad_alturas_monotonas(semilla):
+    # con la semilla 1 el Ward restringido de scikit-learn tiene una inversión
+    X = np.random.default_rng(semilla).normal(size=(300, 5))
+    grafo = kneighbors_graph(X, 5)
+
+    L = ward_conectividad(X, grafo)
+
+    assert is_valid_linkage(L)
+    assert is_monotonic(L)
+    for k in (2, 7, 20):
+        assert len(np.unique(fcluster(L, k, criterion="maxclust"))) == k
+
+
+def test_ward_conectividad_grafo_completo_igual_que_ward():
+    X = np.random.default_rng(0).normal(size=(60, 4))
+    completo = kneighbors_graph(X, len(X) - 1)
+
+    np.testing.assert_allclose(ward_conectividad(X, completo)[:, 2], linkage(X, "ward")[:, 2])
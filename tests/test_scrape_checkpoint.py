@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de scrape_checkpoint.py con un navegador falso: una corrida
+cortada sigue en la primera página pendiente, un archivo que cambió de
+hash vuelve a descargar su página y una página sin respuesta se reintenta
+con otro navegador en vez de darse por el final del sitio.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+from selenium.common import TimeoutException, WebDriverException
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from scrape_checkpoint import PuntoControl, SesionPerdida, recorrer_paginas, correr_reanudable   # noqa: E402
+from scrape_waits import RegistroLatencias   # noqa: E402
+
+PAGINAS = 5
+BASE = "https://sitio.test"
+RESULTADO, VACIO = ("class name", "resultado"), ("xpath", "vacio")
+
+
+class DriverFalso:
+    """Páginas BASE/?page=N con resultados hasta PAGINAS; `login` manda las URL al SSO."""
+
+    def __init__(self, login=False):
+        self.url = None
+        self.login = login
+        self.cerrado = False
+
+    @property
+    def current_url(self):
+        return "https://sso.test/login" if self.login else self.url
+
+    def get(self, url):
+        self.url = url
+
+    def find_elements(self, by, valor):
+        pagina = int(self.url.rsplit("=", 1)[1])
+        return [object()] if valor == "resultado" and pagina <= PAGINAS else []
+
+    def quit(self):
+        self.cerrado = True
+
+
+class EsperasFalsas:
+    """Como Esperas.resultados; `lentas` da, por página, cuántas veces más no responde."""
+
+    def __init__(self, driver, lentas=None):
+        self.driver = driver
+        self.registro = RegistroLatencias("falso", None)
+        self.lentas = lentas if lentas is not None else {}
+
+    def resultados(self, resultado, vacio):
+        pagina = int(self.driver.url.rsplit("=", 1)[1])
+        if self.lentas.get(pagina, 0) > 0:
+            self.lentas[pagina] -= 1
+            raise TimeoutException(f"página {pagina}: sin respuesta")
+        return bool(self.driver.find_elements(*resultado))
+
+
+def url_pagina(i):
+    return f"{BASE}/?page={i}"
+
+
+@pytest.fixture
+def descargas(tmp_path):
+    """descargar(i) que escribe data/falso_page_i.csv; .hechas lista las páginas descargadas."""
+    data = tmp_path / "data"
+    data.mkdir()
+
+    def descargar(i, fallar=()):
+        if i in fallar:
+            fallar.remove(i)
+            raise WebDriverException("chrome not reachable")
+        descargar.hechas.append(i)
+        ruta = data / f"falso_page_{i}.csv"
+        ruta.write_text(f"Document Title\npágina {i}\n", encoding="utf-8")
+        return [str(ruta)]
+
+    descargar.hechas = []
+    return descargar
+
+
+def _recorrer(driver, control, descargar, lentas=None, fallar=()):
+    recorrer_paginas(driver, EsperasFalsas(driver, lentas), url_pagina, RESULTADO, VACIO,
+                     lambda i: descargar(i, fallar), control)
+
+
+def test_reanuda_en_la_primera_pendiente(tmp_path, descargas, capsys):
+    ruta = str(tmp_path / "checkpoint.json")
+    with pytest.raises(WebDriverException):   # Chrome se cae en la página 3
+        _recorrer(DriverFalso(), PuntoControl(ruta, "falso", "q"), descargas, fallar=[3])
+    assert descargas.hechas == [1, 2]
+
+    control = PuntoControl(ruta, "falso", "q")   # corrida nueva desde el JSON
+    _recorrer(DriverFalso(), control, descargas)
+
+    assert descargas.hechas == [1, 2, 3, 4, 5]
+    assert "Páginas 1–2 ya descargadas; se sigue en la 3." in capsys.readouterr().out
+    assert control.fin == PAGINAS + 1
+    assert PuntoControl(ruta, "falso", "otra búsqueda").paginas == {}
+
+
+def test_hash_distinto_vuelve_a_descargar(tmp_path, descargas):
+    ruta = str(tmp_path / "checkpoint.json")
+    _recorrer(DriverFalso(), PuntoControl(ruta, "falso", "q"), descargas)
+    (tmp_path / "data" / "falso_page_2.csv").write_text("Document Title\notra cosa\n", encoding="utf-8")
+    os.remove(tmp_path / "data" / "falso_page_4.csv")
+    descargas.hechas.clear()
+
+    control = PuntoControl(ruta, "falso", "q")
+    assert [control.completada(i) for i in range(1, PAGINAS + 1)] == [True, False, True, False, True]
+    _recorrer(DriverFalso(), control, descargas)
+
+    assert descargas.hechas == [2, 4]
+    assert all(PuntoControl(ruta, "falso", "q").completada(i) for i in range(1, PAGINAS + 1))
+
+
+def test_timeout_se_reintenta_y_no_marca_el_fin(tmp_path, descargas):
+    control = PuntoControl(str(tmp_path / "checkpoint.json"), "falso", "q")
+    lentas = {3: 1}
+    drivers = []
+
+    def crear_driver():
+        drivers.append(DriverFalso())
+        return drivers[-1]
+
+    correr_reanudable(crear_driver, lambda driver: BASE,
+                      lambda driver, base: _recorrer(driver, control, descargas, lentas))
+
+    assert descargas.hechas == [1, 2, 3, 4, 5]
+    assert control.fin == PAGINAS + 1
+    assert len(drivers) == 2 and all(d.cerrado for d in drivers)
+
+
+def test_timeout_en_el_login_es_sesion_perdida(tmp_path, descargas):
+    control = PuntoControl(str(tmp_path / "checkpoint.json"), "falso", "q")
+
+    with pytest.raises(SesionPerdida):
+        _recorrer(DriverFalso(login=True), control, descargas, lentas={1: 1})
+    assert control.fin is None
+
+    # sin reinicios que queden, el error llega a quien llamó
+    with pytest.raises(TimeoutException):
+        correr_reanudable(DriverFalso, lambda driver: BASE,
+                          lambda driver, base: _recorrer(driver, control, descargas, {1: 99}), reinicios=1)
+    assert control.fin is None and descargas.hechas == []
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de scrape_scheduler.Planificador con un navegador falso: un sitio
+entero se reparte entre los workers según el total de su primera página,
+cada worker descarga en su propia carpeta y las páginas sin respuesta se
+vuelven a encolar. La última corre contra el servidor de páginas de
+prueba en Chrome headless (se salta si no hay navegador).
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import time
+import shutil
+import threading
+from types import SimpleNamespace
+from functools import partial
+
+import pytest
+from selenium.common import TimeoutException
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import scrape_scheduler   # noqa: E402
+from scrape_scheduler import Planificador, paginas_totales   # noqa: E402
+
+NAVEGADORES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+PAGINAS, FILAS = 7, 2
+
+
+class DriverFalso:
+    """Páginas falso://N con FILAS resultados hasta PAGINAS y el total en la cabecera."""
+
+    def __init__(self, con_total=True):
+        self.url = None
+        self.con_total = con_total
+
+    @property
+    def pagina(self):
+        return int(self.url.rsplit("/", 1)[1])
+
+    def get(self, url):
+        self.url = url
+
+    def find_elements(self, by, valor):
+        if valor == "resultado":
+            return [object()] * (FILAS if self.pagina <= PAGINAS else 0)
+        if valor == "total" and self.con_total:
+            return [SimpleNamespace(text=f"Showing 1-{FILAS} of {PAGINAS * FILAS:,} results for \"x\"")]
+        return []
+
+    def quit(self):
+        pass
+
+
+class EsperasFalsas:
+    """Como Esperas; `lentas` da, por página, cuántas veces más no responde."""
+    lentas = {}
+
+    def __init__(self, driver, registro=None):
+        self.driver = driver
+        self.registro = registro
+
+    def resultados(self, resultado, vacio):
+        pagina = self.driver.pagina
+        if self.lentas.get(pagina, 0) > 0:
+            self.lentas[pagina] -= 1
+            raise TimeoutException(f"página {pagina}: sin respuesta")
+        return bool(self.driver.find_elements(*resultado))
+
+    def cerrar(self):
+        pass
+
+
+@pytest.fixture
+def sitio(monkeypatch):
+    """Sitio 'falso' en SITIOS; devuelve lo que vio descargar_pagina: página → (carpeta, hilo)."""
+    vistas = {}
+
+    def descargar_pagina(driver, esperas, i, data_dir, articles_dir):
+        time.sleep(0.05)
+        vistas.setdefault(i, []).append((data_dir, threading.current_thread().name))
+        ruta = os.path.join(data_dir, f"falso_page_{i}.csv")
+        with open(ruta, "w", encoding="utf-8") as fh:
+            fh.write("Document Title\nx\n")
+        return [ruta]
+
+    modulo = SimpleNamespace(RESULTADO=("class name", "resultado"), SIN_RESULTADOS=("xpath", "vacio"),
+                             TOTAL=("class name", "total"), descargar_pagina=descargar_pagina)
+    monkeypatch.setitem(scrape_scheduler.SITIOS, "falso", modulo)
+    monkeypatch.setattr(scrape_scheduler, "Esperas", EsperasFalsas)
+    monkeypatch.setattr(scrape_scheduler, "crear_driver", lambda headless=True: DriverFalso())
+    monkeypatch.setattr(scrape_scheduler, "ESPERA_COLA", 0.01)
+    monkeypatch.setattr(EsperasFalsas, "lentas", {})
+    return vistas
+
+
+def _planificador(tmp_path, workers=3):
+    return Planificador({"falso": lambda p: f"falso://{p}"}, workers, data_dir=str(tmp_path / "data"),
+                        articles_dir=str(tmp_path / "articles"), latencias_csv=str(tmp_path / "lat.csv"),
+                        bloque=1)
+
+
+def test_paginas_totales():
+    modulo = SimpleNamespace(RESULTADO=("class name", "resultado"), TOTAL=("class name", "total"))
+    con, sin = DriverFalso(), DriverFalso(con_total=False)
+    con.get("falso://1")
+    sin.get("falso://1")
+
+    assert paginas_totales(con, modulo) == PAGINAS
+    assert paginas_totales(sin, modulo) is None
+
+
+def test_sitio_entero_se_reparte_entre_workers(tmp_path, sitio):
+    planificador = _planificador(tmp_path)
+    planificador.agregar_sitio("falso")
+
+    resumen = planificador.ejecutar()
+
+    assert resumen["paginas"] == PAGINAS and resumen["fallidas"] == []
+    assert sum(1 for n in resumen["por_worker"].values() if n) > 1
+    assert sorted(os.listdir(tmp_path / "data")) == sorted(f"falso_page_{i}.csv" for i in range(1, PAGINAS + 1))
+    # cada página una sola vez, en la carpeta del worker que la descargó
+    for i, vistas in sitio.items():
+        assert len(vistas) == 1
+        carpeta, hilo = vistas[0]
+        assert carpeta == os.path.join(str(tmp_path / "data"), f".worker_{hilo.split('-')[1]}", "data")
+    assert not any(n.startswith(".worker_") for n in os.listdir(tmp_path / "data"))
+
+
+def test_sin_total_recorre_hasta_el_final(tmp_path, sitio, monkeypatch):
+    monkeypatch.setattr(scrape_scheduler, "crear_driver", lambda headless=True: DriverFalso(con_total=False))
+    planificador = _planificador(tmp_path, workers=2)
+    planificador.agregar_sitio("falso")
+
+    resumen = planificador.ejecutar()
+
+    assert resumen["paginas"] == PAGINAS
+    assert planificador.fin == {"falso": PAGINAS + 1}
+
+
+def test_pagina_sin_respuesta_se_reencola(tmp_path, sitio):
+    EsperasFalsas.lentas.update({3: 1, 5: 99})
+    planificador = _planificador(tmp_path, workers=2)
+    planificador.agregar_rango("falso", 1, PAGINAS)
+
+    resumen = planificador.ejecutar()
+
+    assert sorted(sitio) == [1, 2, 3, 4, 6, 7]
+    assert planificador.intentos == {("falso", 3): 1, ("falso", 5): scrape_scheduler.REINTENTOS_PAGINA}
+    assert [(s, p) for s, p, _ in resumen["fallidas"]] == [("falso", 5)]
+    assert EsperasFalsas.lentas[5] == 99 - 1 - scrape_scheduler.REINTENTOS_PAGINA
+
+
+def test_mock_en_chrome(tmp_path):
+    if not any(shutil.which(n) for n in NAVEGADORES):
+        pytest.skip("no hay Chrome/Chromium instalado")
+    from selenium.common import WebDriverException
+    from scrape_fixtures import servir, url_resultados
+
+    try:
+        scrape_scheduler.crear_driver().quit()
+    except WebDriverException as e:
+        pytest.skip(f"no se pudo abrir Chrome: {e.msg}")
+    servidor, url_base = servir()
+    try:
+        planificador = Planificador({"ieee": partial(url_resultados, url_base, "ieee", paginas=4, lat=50)}, 2,
+                                    data_dir=str(tmp_path / "data"), articles_dir=str(tmp_path / "articles"),
+                                    latencias_csv=str(tmp_path / "lat.csv"), bloque=1)
+        planificador.agregar_sitio("ieee")
+        resumen = planificador.ejecutar()
+    finally:
+        servidor.shutdown()
+
+    assert resumen["paginas"] == 4 and resumen["fallidas"] == []
+    assert sorted(os.listdir(tmp_path / "data")) == [f"ieee_page_{i}.csv" for i in range(1, 5)]
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de scrape_waits.py: percentiles de RegistroLatencias, TIEMPOS
+configurables con SCRAPE_<CLAVE> y el recorrido del fixture de IEEE en un
+Chrome headless (se salta si no hay navegador).
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import csv
+import shutil
+import importlib
+from functools import partial
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import scrape_waits   # noqa: E402
+from scrape_waits import Esperas, RegistroLatencias, TIEMPOS, MIN_OBSERVACIONES   # noqa: E402
+
+NAVEGADORES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+
+def test_percentiles_por_paso(tmp_path):
+    ruta = tmp_path / "latencias.csv"
+    registro = RegistroLatencias("IEEE", str(ruta))
+    for i in range(1, 11):
+        with registro.pagina(i):
+            registro.paso("descarga CSV", float(i))
+            registro.paso("resultados", 0.5)
+
+    p = registro.percentiles()
+
+    assert p["descarga CSV"] == pytest.approx({50: 5.5, 90: 9.1, 99: 9.91})
+    assert p["resultados"] == pytest.approx({50: 0.5, 90: 0.5, 99: 0.5})
+    assert set(p) == {"descarga CSV", "resultados", "total"}
+    assert registro.percentiles((25, 75))["descarga CSV"] == pytest.approx({25: 3.25, 75: 7.75})
+    with open(ruta, newline="", encoding="utf-8") as fh:
+        filas = list(csv.DictReader(fh))
+    assert len(filas) == 10 * 3   # dos pasos y el total por página
+    assert np.percentile([float(f["segundos"]) for f in filas if f["paso"] == "descarga CSV"], 90) == pytest.approx(9.1)
+
+
+def test_pasos_fuera_de_una_pagina_no_cuentan(tmp_path):
+    registro = RegistroLatencias("SD", None)
+    registro.paso("login", 3.0)
+
+    assert registro.percentiles() == {}
+    registro.resumen()   # sin páginas no imprime nada ni falla
+
+
+@pytest.fixture
+def recargar_tiempos(monkeypatch):
+    """Recarga scrape_waits con las variables de entorno que ponga la prueba y lo deja como estaba."""
+    def recargar(**variables):
+        for clave, valor in variables.items():
+            monkeypatch.setenv(clave, valor)
+        return importlib.reload(scrape_waits).TIEMPOS
+
+    yield recargar
+    for clave in list(os.environ):
+        if clave.startswith("SCRAPE_"):
+            monkeypatch.delenv(clave)
+    importlib.reload(scrape_waits)
+
+
+def test_tiempos_desde_variables_de_entorno(recargar_tiempos):
+    tiempos = recargar_tiempos(SCRAPE_DESCARGA="180", SCRAPE_SONDEO="0.05", SCRAPE_PAGINA="")
+
+    assert tiempos["descarga"] == 180.0
+    assert tiempos["sondeo"] == 0.05
+    assert tiempos["pagina"] == TIEMPOS["pagina"]   # vacía: se ignora
+    assert scrape_waits.Esperas(None).tiempos["descarga"] == 180.0
+
+
+def test_timeout_adaptativo():
+    esperas = Esperas(None, tiempos={"pagina": 30, "minimo": 2, "factor": 3})
+
+    assert esperas.timeout("pagina") == 30
+    esperas.observadas["pagina"].extend([0.2] * MIN_OBSERVACIONES)
+    assert esperas.timeout("pagina") == 2            # suelo
+    esperas.observadas["pagina"].append(4.0)
+    assert esperas.timeout("pagina") == 12           # factor × mayor latencia reciente
+    esperas.observadas["pagina"].append(20.0)
+    assert esperas.timeout("pagina") == 30           # techo
+
+
+def test_fixture_ieee_en_chrome(tmp_path):
+    if not any(shutil.which(n) for n in NAVEGADORES):
+        pytest.skip("no hay Chrome/Chromium instalado")
+    from selenium import webdriver
+    from selenium.common import WebDriverException
+    import scrape_IEEE
+    from scrape_fixtures import servir, url_resultados
+
+    opciones = webdriver.ChromeOptions()
+    opciones.add_argument("--headless=new")
+    opciones.add_argument("--window-size=1920,1080")
+    try:
+        driver = webdriver.Chrome(options=opciones)
+    except WebDriverException as e:
+        pytest.skip(f"no se pudo abrir Chrome: {e.msg}")
+    servidor, url_base = servir()
+    data_dir, articles_dir = tmp_path / "data", tmp_path / "articles"
+    data_dir.mkdir()
+    articles_dir.mkdir()
+    try:
+        scrape_IEEE.scrape_ieee(driver, str(data_dir), str(articles_dir),
+                                url_pagina=partial(url_resultados, url_base, "ieee", paginas=2, lat=50),
+                                latencias_csv=str(tmp_path / "latencias.csv"))
+    finally:
+        driver.quit()
+        servidor.shutdown()
+
+    assert sorted(os.listdir(data_dir)) == ["ieee_page_1.csv", "ieee_page_2.csv"]
+    assert sorted(os.listdir(articles_dir)) == ["ieee_page_1.zip", "ieee_page_2.zip"]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de sparse_similarity.py frente a los cálculos densos de scipy y
+scikit-learn que reemplaza.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+from scipy.spatial.distance import pdist
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from sparse_similarity import distancias_jaccard, knn_coseno   # noqa: E402
+
+
+def _matriz(n=120, m=300, densidad=0.05, semilla=0):
+    X = sparse.random(n, m, density=densidad, format="lil", random_state=semilla)
+    X[3] = 0   # una fila vacía
+    return X.tocsr()
+
+
+def test_jaccard_igual_que_pdist():
+    X = _matriz()
+
+    esperado = pdist(X.toarray() > 0, metric="jaccard")
+    np.testing.assert_allclose(distancias_jaccard(X, bloque=17), esperado)
+
+
+def test_knn_coseno_igual_que_denso():
+    X = _matriz()
+    S = cosine_similarity(X)
+    np.fill_diagonal(S, -np.inf)
+
+    grafo = knn_coseno(X, k=5, bloque=17, workers=1)
+
+    for i in (0, 1, 50, 119):
+        fila = grafo.getrow(i)
+        esperados = np.sort(S[i][S[i] > 0])[::-1][:5]
+        np.testing.assert_allclose(np.sort(fila.data)[::-1], esperados, rtol=1e-5)
+    assert grafo.getrow(3).nnz == 0
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de topic_modeling.ModeloTopicos: entrenamiento en línea cuando el
+primer lote tiene menos abstracts que tópicos, y reanudación desde disco.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from topic_modeling import ModeloTopicos   # noqa: E402
+
+TEXTOS = [
+    "computational thinking primary school students",
+    "robotics programming course university students",
+    "scratch game based learning children",
+    "teachers assessment computational thinking skills",
+    "data analysis model evaluation framework",
+    "educational robotics primary school teachers",
+]
+
+
+@pytest.mark.parametrize("modelo", ["nmf", "lda"])
+def test_primer_lote_con_menos_abstracts_que_topicos(tmp_path, modelo):
+    m = ModeloTopicos(str(tmp_path), modelo, topicos=5, n_features=2 ** 10)
+    m.entrenar(TEXTOS[:2], ["h0", "h1"])
+    m.entrenar(TEXTOS[2:], [f"h{i}" for i in range(2, len(TEXTOS))])
+
+    assert m.documentos == len(TEXTOS)
+    assert m.pesos(TEXTOS).shape == (len(TEXTOS), 5)
+    assert set(m.terminos_top(3)["topico"]) <= set(range(5))
+    m.close()
+
+    # se reanuda desde disco sin volver a entrenar lo visto
+    m = ModeloTopicos(str(tmp_path), modelo, topicos=5, n_features=2 ** 10)
+    assert m.documentos == len(TEXTOS)
+    assert m.pendientes(["h0", "h9"]).tolist() == [False, True]
+    m.close()
+
+
+def test_nmf_conserva_nndsvda_si_el_primer_lote_alcanza(tmp_path):
+    m = ModeloTopicos(str(tmp_path), "nmf", topicos=3, n_features=2 ** 10)
+    m.entrenar(TEXTOS, [f"h{i}" for i in range(len(TEXTOS))])
+
+    assert m.modelo.init == "nndsvda"
+    m.close()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la unificación incremental de unify_entries.py: volver a correr
+no añade nada, un archivo nuevo añade solo lo suyo y un corte entre la
+escritura y el commit del índice no duplica registros.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from bib_stream import iter_bib, write_bib   # noqa: E402
+from unify_entries import Unificador, loaders_de   # noqa: E402
+
+
+def _bib(ruta, entradas):
+    with open(ruta, "w", encoding="utf-8") as fh:
+        write_bib(entradas, fh)
+    return str(ruta)
+
+
+def _entrada(i, titulo=None, doi=None):
+    return {"ENTRYTYPE": "article", "ID": f"ref{i}", "title": titulo or f"Paper number {i} on robotics",
+            "author": f"Autor{i}, A.", "doi": doi or f"10.1000/{i}"}
+
+
+def _unificar(out_dir, rutas, **opciones):
+    unificador = Unificador(out_dir=str(out_dir), **opciones)
+    unificador.procesar(loaders_de(rutas))
+    nuevos = unificador.nuevos_u, unificador.nuevos_d
+    unificador.cerrar()
+    return nuevos
+
+
+def _ids(ruta):
+    with open(ruta, encoding="utf-8") as fh:
+        return [e["ID"] for e in iter_bib(fh)]
+
+
+@pytest.mark.parametrize("fuzzy", [False, True])
+def test_segunda_corrida_no_anade_y_archivo_nuevo_solo_lo_suyo(tmp_path, fuzzy):
+    raw, out = tmp_path / "raw", tmp_path / "out"
+    raw.mkdir()
+    a = _bib(raw / "a.bib", [_entrada(i) for i in range(5)])
+    b = _bib(raw / "b.bib", [_entrada(3), _entrada(5), _entrada(6)])
+
+    assert _unificar(out, [a, b], fuzzy=fuzzy) == (7, 1)
+    assert _unificar(out, [a, b], fuzzy=fuzzy) == (0, 0)
+
+    c = _bib(raw / "c.bib", [_entrada(6), _entrada(7), _entrada(8)])
+    assert _unificar(out, [a, b, c], fuzzy=fuzzy) == (2, 1)
+    assert _ids(out / "unified.bib") == [f"ref{i}" for i in range(9)]
+    assert _ids(out / "duplicates.bib") == ["ref3", "ref6"]
+
+
+def test_corte_antes_del_commit_no_duplica(tmp_path, monkeypatch):
+    raw, out = tmp_path / "raw", tmp_path / "out"
+    raw.mkdir()
+    a = _bib(raw / "a.bib", [_entrada(i) for i in range(3)])
+    _unificar(out, [a])
+    b = _bib(raw / "b.bib", [_entrada(3), _entrada(4)])
+
+    # el proceso muere justo después de añadir a las salidas, antes del commit
+    unificador = Unificador(out_dir=str(out))
+
+    def cortar():
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(unificador.indice, "commit", cortar)
+    with pytest.raises(KeyboardInterrupt):
+        unificador.procesar(loaders_de([a, b]))
+    unificador.indice.con.close()   # sin commit: SQLite descarta la transacción
+    assert _ids(out / "unified.bib") == [f"ref{i}" for i in range(5)]
+    monkeypatch.undo()
+
+    assert _unificar(out, [a, b]) == (2, 0)
+    assert _ids(out / "unified.bib") == [f"ref{i}" for i in range(5)]
+
+
+def test_avisa_si_un_archivo_pierde_registros(tmp_path, capsys):
+    raw, out = tmp_path / "raw", tmp_path / "out"
+    raw.mkdir()
+    a = _bib(raw / "a.bib", [_entrada(i) for i in range(4)])
+    _unificar(out, [a])
+
+    _bib(raw / "a.bib", [_entrada(0), _entrada(1), _entrada(9)])
+    assert _unificar(out, [a]) == (1, 0)
+
+    assert "1 registro(s) menos" in capsys.readouterr().out
+    assert _ids(out / "unified.bib") == ["ref0", "ref1", "ref2", "ref3", "ref9"]